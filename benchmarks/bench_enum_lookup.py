@@ -0,0 +1,66 @@
+"""元数据枚举按名称查找及模糊搜索的耗时
+
+对编入元数据目录的各枚举类, 以每个成员的名称调用`from_name`, 并与逐个比较名称的线性查找对照;
+若枚举类支持`search`, 则再以去掉末字的名称进行模糊搜索. 在改动前后的提交上分别运行以进行比较:
+
+    python benchmarks/bench_enum_lookup.py
+"""
+
+import os
+import sys
+import time
+
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from pyJianYingDraft import metadata
+
+ENUM_NAMES = ["FontType", "MaskType", "FilterType", "TransitionType",
+              "IntroType", "OutroType", "GroupAnimationType", "TextIntro", "TextOutro", "TextLoopAnim",
+              "AudioSceneEffectType", "ToneEffectType", "SpeechToSongType",
+              "VideoSceneEffectType", "VideoCharacterEffectType"]
+
+def normalize(name: str) -> str:
+    return name.lower().replace(" ", "").replace("_", "")
+
+def linear_lookup(enum_class, name: str) -> Optional[object]:
+    """逐个比较名称的查找, 即建立索引前`from_name`的做法"""
+    name = normalize(name)
+    for member in enum_class:
+        if normalize(member.name) == name:
+            return member
+    return None
+
+def main() -> None:
+    enums = [getattr(metadata, enum_name) for enum_name in ENUM_NAMES]
+    lookups = sum(len(enum_class) for enum_class in enums)
+
+    start = time.perf_counter()
+    for enum_class in enums:
+        for member in enum_class:
+            linear_lookup(enum_class, member.name)
+    linear = time.perf_counter() - start
+
+    # 首轮查找包含建立索引(若有)的耗时, 第二轮则为纯查找
+    timings = []
+    for _ in range(2):
+        start = time.perf_counter()
+        for enum_class in enums:
+            for member in enum_class:
+                enum_class.from_name(member.name)
+        timings.append(time.perf_counter() - start)
+
+    print("查找次数: %d" % lookups)
+    print("线性查找:          %8.2f us/次" % (linear / lookups * 1e6))
+    print("from_name(首轮):   %8.2f us/次" % (timings[0] / lookups * 1e6))
+    print("from_name(第二轮): %8.2f us/次" % (timings[1] / lookups * 1e6))
+
+    if all(hasattr(enum_class, "search") for enum_class in enums):
+        start = time.perf_counter()
+        for enum_class in enums:
+            for member in enum_class:
+                enum_class.search(member.name[:-1] or member.name)
+        print("search(含建立索引): %7.2f us/次" % ((time.perf_counter() - start) / lookups * 1e6))
+
+if __name__ == "__main__":
+    main()
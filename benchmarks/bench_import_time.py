@@ -0,0 +1,52 @@
+"""`import pyJianYingDraft`的耗时
+
+在新的子进程中以`python -X importtime`多次导入本包, 取`pyJianYingDraft`一项累计耗时的中位数.
+同时列出耗时最长的若干个本包模块. 在改动前后的提交上分别运行以进行比较:
+
+    python benchmarks/bench_import_time.py [--runs 7] [--top 10]
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+from typing import List, Dict, Tuple
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+def import_times() -> Dict[str, int]:
+    """在子进程中导入本包一次, 返回本包各模块的累计导入耗时, 单位为微秒"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import pyJianYingDraft"],
+                            cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    times: Dict[str, int] = {}
+    # 每行格式为 "import time: self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        module = fields[2].strip()
+        if module.startswith("pyJianYingDraft"):
+            times[module] = int(fields[1])
+    return times
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7, help="导入次数")
+    parser.add_argument("--top", type=int, default=10, help="列出耗时最长的模块数")
+    args = parser.parse_args()
+
+    runs: List[Dict[str, int]] = [import_times() for _ in range(args.runs)]
+    medians: List[Tuple[str, float]] = sorted(
+        ((module, statistics.median(run.get(module, 0) for run in runs)) for module in runs[-1]),
+        key=lambda item: item[1], reverse=True)
+
+    print("import pyJianYingDraft: %.1f ms (%d 次的中位数)" % (dict(medians)["pyJianYingDraft"] / 1000, args.runs))
+    for module, median in medians[1:args.top + 1]:
+        print("  %-45s %8.1f ms" % (module, median / 1000))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""从同一素材切出大量音视频片段的耗时与内存占用
+
+每个片段都引用同一个视频或音频素材. 在改动前后的提交上分别运行以进行比较:
+
+    python benchmarks/bench_shared_materials.py [--cuts 20000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import pyJianYingDraft as draft
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "readme_assets", "tutorial")
+
+def make_cuts(video: draft.VideoMaterial, audio: draft.AudioMaterial, cuts: int) -> list:
+    segments: list = [draft.VideoSegment(video, draft.Timerange(i * 1000, 1000)) for i in range(cuts)]
+    segments.extend(draft.AudioSegment(audio, draft.Timerange(i * 1000, 1000)) for i in range(cuts))
+    return segments
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cuts", type=int, default=20000, help="视频及音频片段各自的数量")
+    args = parser.parse_args()
+
+    video = draft.VideoMaterial(os.path.join(ASSET_DIR, "video.mp4"))
+    audio = draft.AudioMaterial(os.path.join(ASSET_DIR, "audio.mp3"))
+
+    # 计时与内存统计分开进行, 以免tracemalloc影响计时
+    start = time.perf_counter()
+    segments = make_cuts(video, audio, args.cuts)
+    elapsed = time.perf_counter() - start
+    del segments
+
+    tracemalloc.start()
+    segments = make_cuts(video, audio, args.cuts)
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print("视频及音频片段各 %d 个" % args.cuts)
+    print("耗时:     %.3fs" % elapsed)
+    print("内存占用: %.1f MB" % (traced / 2 ** 20))
+
+if __name__ == "__main__":
+    main()
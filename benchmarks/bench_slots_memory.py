@@ -0,0 +1,52 @@
+"""小型值对象的单个实例内存占用
+
+分别创建大量`Timerange`, `ClipSettings`, `Speed`, `Keyframe`, `CropSettings`及`EffectParamInstance`,
+以tracemalloc统计平均每个实例(含列表中的引用)占用的内存. 在改动前后的提交上分别运行以进行比较:
+
+    python benchmarks/bench_slots_memory.py [--count 100000]
+"""
+
+import gc
+import os
+import sys
+import argparse
+import tracemalloc
+
+from typing import Callable, Dict, Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from pyJianYingDraft.time_util import Timerange
+from pyJianYingDraft.segment import ClipSettings, Speed
+from pyJianYingDraft.keyframe import Keyframe
+from pyJianYingDraft.local_materials import CropSettings
+from pyJianYingDraft.metadata.effect_meta import EffectParam, EffectParamInstance
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000, help="每种对象的实例数")
+    args = parser.parse_args()
+
+    param = EffectParam("param", 0.5, 0.0, 1.0)
+    cases: Dict[str, Callable[[int], Any]] = {
+        "Timerange": lambda i: Timerange(i, 1000),
+        "ClipSettings": lambda i: ClipSettings(alpha=0.5),
+        "Speed": lambda i: Speed(1.0),
+        "Keyframe": lambda i: Keyframe(i, 0.5),
+        "CropSettings": lambda i: CropSettings(),
+        "EffectParamInstance": lambda i: EffectParamInstance(param, 0, 0.3),
+    }
+
+    total = 0
+    for name, factory in cases.items():
+        gc.collect()
+        tracemalloc.start()
+        objects = [factory(i) for i in range(args.count)]
+        traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del objects
+        total += traced
+        print("%-20s %6.1f B" % (name, traced / args.count))
+    print("合计(各 %d 个): %.1f MB" % (args.count, total / 2 ** 20))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""模板模式导入及导出大型草稿的耗时与内存峰值
+
+生成一个包含大量文本及视频片段的草稿, 再以模板模式加载并导出. 在改动前后的提交上分别运行以进行比较:
+
+    python benchmarks/bench_template_load.py [--segments 20000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import pyJianYingDraft as draft
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "readme_assets", "tutorial")
+
+def max_rss_mb() -> float:
+    """进程的内存峰值, 不支持的平台上返回NaN"""
+    try:
+        import resource
+    except ImportError:
+        return float("nan")
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def build_template(path: str, segments: int) -> None:
+    script = draft.ScriptFile(1920, 1080)
+    script.add_track(draft.TrackType.text).add_track(draft.TrackType.video)
+    material = draft.VideoMaterial(os.path.join(ASSET_DIR, "video.mp4"))
+    script.add_segments([draft.TextSegment("字幕%d" % i, draft.Timerange(i * 1000, 1000)) for i in range(segments)],
+                        presorted=True)
+    script.add_segments([draft.VideoSegment(material, draft.Timerange(i * 1000, 1000)) for i in range(segments)],
+                        presorted=True)
+    script.dump(path)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segments", type=int, default=20000, help="每条轨道上的片段数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "draft_content.json")
+        build_template(path, args.segments)
+        rss_before = max_rss_mb()
+
+        start = time.perf_counter()
+        script = draft.ScriptFile.load_template(path)
+        loaded = time.perf_counter()
+        script.dumps()
+        dumped = time.perf_counter()
+
+    print("模板片段数: %d" % (2 * args.segments))
+    print("load_template: %.2fs" % (loaded - start))
+    print("dumps:         %.2fs" % (dumped - loaded))
+    print("内存峰值:      %.0f MB (生成模板后为 %.0f MB)" % (max_rss_mb(), rss_before))
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 import warnings
 import sys
 
-from .local_materials import CropSettings, VideoMaterial, AudioMaterial
+from typing import Any, TYPE_CHECKING
+
+from .local_materials import CropSettings, VideoMaterial, AudioMaterial, set_probe_cache, get_probe_cache, probe_materials
+from .probe_cache import ProbeCache
 from .keyframe import KeyframeProperty
+from .id_provider import CounterIdProvider, set_id_provider, use_id_provider
 
 from .time_util import Timerange
 from .audio_segment import AudioSegment
@@ -10,18 +14,23 @@ from .video_segment import VideoSegment, StickerSegment, ClipSettings
 from .effect_segment import EffectSegment, FilterSegment
 from .text_segment import TextSegment, TextStyle, TextBorder, TextBackground
 
-from .metadata import FontType
+from . import metadata
 from .metadata import MaskType
-from .metadata import TransitionType, FilterType
-from .metadata import IntroType, OutroType, GroupAnimationType
-from .metadata import TextIntro, TextOutro, TextLoopAnim
-from .metadata import AudioSceneEffectType
-from .metadata import VideoSceneEffectType, VideoCharacterEffectType
+
+if TYPE_CHECKING:
+    from .metadata import FontType
+    from .metadata import TransitionType, FilterType
+    from .metadata import IntroType, OutroType, GroupAnimationType
+    from .metadata import TextIntro, TextOutro, TextLoopAnim
+    from .metadata import AudioSceneEffectType
+    from .metadata import VideoSceneEffectType, VideoCharacterEffectType
 
 from .track import TrackType
 from .template_mode import ShrinkMode, ExtendMode
 from .script_file import ScriptFile
 from .draft_folder import DraftFolder
+from .compiled_template import CompiledTemplate, TemplateVariant
+from .batch_runner import run_batch, load_manifest
 
 # 仅在Windows系统下导入jianying_controller
 ISWIN = (sys.platform == 'win32')
@@ -30,6 +39,18 @@ if ISWIN:
 
 from .time_util import SEC, tim, trange
 
+_LAZY_METADATA = ["FontType", "TransitionType", "FilterType", "IntroType", "OutroType", "GroupAnimationType",
+                  "TextIntro", "TextOutro", "TextLoopAnim", "AudioSceneEffectType",
+                  "VideoSceneEffectType", "VideoCharacterEffectType"]
+"""在首次访问时才从`metadata`中加载的元数据枚举类"""
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_METADATA:
+        value = getattr(metadata, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def _deprecated_class_warning(old_name: str, new_name: str):
     warnings.warn(
@@ -146,10 +167,16 @@ class Crop_settings:
 class _DeprecatedEnum:
     """带deprecation警告的枚举代理类"""
     def __init__(self, original_enum, old_name, new_name):
-        self._enum = original_enum
+        self._original = original_enum  # 枚举类, 或延迟加载的元数据枚举类的名称
         self._old_name = old_name
         self._new_name = new_name
 
+    @property
+    def _enum(self):
+        if isinstance(self._original, str):
+            self._original = getattr(metadata, self._original)
+        return self._original
+
     def __getattr__(self, name):
         # 当访问枚举成员时显示警告
         _deprecated_class_warning(self._old_name, self._new_name)
@@ -164,19 +191,19 @@ class _DeprecatedEnum:
         return f"<Deprecated {self._old_name} (use {self._new_name} instead)>"
 
 Track_type = _DeprecatedEnum(TrackType, "Track_type", "TrackType")
-Font_type = _DeprecatedEnum(FontType, "Font_type", "FontType")
+Font_type = _DeprecatedEnum("FontType", "Font_type", "FontType")
 Mask_type = _DeprecatedEnum(MaskType, "Mask_type", "MaskType")
-Filter_type = _DeprecatedEnum(FilterType, "Filter_type", "FilterType")
-Transition_type = _DeprecatedEnum(TransitionType, "Transition_type", "TransitionType")
-Intro_type = _DeprecatedEnum(IntroType, "Intro_type", "IntroType")
-Outro_type = _DeprecatedEnum(OutroType, "Outro_type", "OutroType")
-Group_animation_type = _DeprecatedEnum(GroupAnimationType, "Group_animation_type", "GroupAnimationType")
-Text_intro = _DeprecatedEnum(TextIntro, "Text_intro", "TextIntro")
-Text_outro = _DeprecatedEnum(TextOutro, "Text_outro", "TextOutro")
-Text_loop_anim = _DeprecatedEnum(TextLoopAnim, "Text_loop_anim", "TextLoopAnim")
-Audio_scene_effect_type = _DeprecatedEnum(AudioSceneEffectType, "Audio_scene_effect_type", "AudioSceneEffectType")
-Video_scene_effect_type = _DeprecatedEnum(VideoSceneEffectType, "Video_scene_effect_type", "VideoSceneEffectType")
-Video_character_effect_type = _DeprecatedEnum(VideoCharacterEffectType, "Video_character_effect_type", "VideoCharacterEffectType")
+Filter_type = _DeprecatedEnum("FilterType", "Filter_type", "FilterType")
+Transition_type = _DeprecatedEnum("TransitionType", "Transition_type", "TransitionType")
+Intro_type = _DeprecatedEnum("IntroType", "Intro_type", "IntroType")
+Outro_type = _DeprecatedEnum("OutroType", "Outro_type", "OutroType")
+Group_animation_type = _DeprecatedEnum("GroupAnimationType", "Group_animation_type", "GroupAnimationType")
+Text_intro = _DeprecatedEnum("TextIntro", "Text_intro", "TextIntro")
+Text_outro = _DeprecatedEnum("TextOutro", "Text_outro", "TextOutro")
+Text_loop_anim = _DeprecatedEnum("TextLoopAnim", "Text_loop_anim", "TextLoopAnim")
+Audio_scene_effect_type = _DeprecatedEnum("AudioSceneEffectType", "Audio_scene_effect_type", "AudioSceneEffectType")
+Video_scene_effect_type = _DeprecatedEnum("VideoSceneEffectType", "Video_scene_effect_type", "VideoSceneEffectType")
+Video_character_effect_type = _DeprecatedEnum("VideoCharacterEffectType", "Video_character_effect_type", "VideoCharacterEffectType")
 Keyframe_property = _DeprecatedEnum(KeyframeProperty, "Keyframe_property", "KeyframeProperty")
 
 # 仅在Windows系统下定义jianying_controller相关的向后兼容类
@@ -208,7 +235,14 @@ __all__ = [
     "CropSettings",
     "VideoMaterial",
     "AudioMaterial",
+    "ProbeCache",
+    "set_probe_cache",
+    "get_probe_cache",
+    "probe_materials",
     "KeyframeProperty",
+    "CounterIdProvider",
+    "set_id_provider",
+    "use_id_provider",
     "Timerange",
     "AudioSegment",
     "VideoSegment",
@@ -225,6 +259,10 @@ __all__ = [
     "ExtendMode",
     "ScriptFile",
     "DraftFolder",
+    "CompiledTemplate",
+    "TemplateVariant",
+    "run_batch",
+    "load_manifest",
     "SEC",
     "tim",
     "trange",
@@ -1,15 +1,17 @@
 """定义视频/文本动画相关类"""
 
-import uuid
-
-from typing import Union, Optional
+from typing import Union, Optional, TYPE_CHECKING
 from typing import Literal, Dict, List, Any
 
+from .id_provider import new_id
 from .time_util import Timerange
 
-from .metadata.animation_meta import AnimationMeta
-from .metadata import IntroType, OutroType, GroupAnimationType
-from .metadata import TextIntro, TextOutro, TextLoopAnim
+from . import metadata
+
+if TYPE_CHECKING:
+    from .metadata.animation_meta import AnimationMeta
+    from .metadata import IntroType, OutroType, GroupAnimationType
+    from .metadata import TextIntro, TextOutro, TextLoopAnim
 
 class Animation:
     """一个视频/文本动画效果"""
@@ -31,7 +33,7 @@ class Animation:
     is_video_animation: bool
     """是否为视频动画, 在子类中定义"""
 
-    def __init__(self, animation_meta: AnimationMeta, start: int, duration: int):
+    def __init__(self, animation_meta: "AnimationMeta", start: int, duration: int):
         self.name = animation_meta.title
         self.effect_id = animation_meta.effect_id
         self.resource_id = animation_meta.resource_id
@@ -61,15 +63,15 @@ class VideoAnimation(Animation):
 
     animation_type: Literal["in", "out", "group"]
 
-    def __init__(self, animation_type: Union[IntroType, OutroType, GroupAnimationType],
+    def __init__(self, animation_type: "Union[IntroType, OutroType, GroupAnimationType]",
                  start: int, duration: int):
         super().__init__(animation_type.value, start, duration)
 
-        if isinstance(animation_type, IntroType):
+        if isinstance(animation_type, metadata.IntroType):
             self.animation_type = "in"
-        elif isinstance(animation_type, OutroType):
+        elif isinstance(animation_type, metadata.OutroType):
             self.animation_type = "out"
-        elif isinstance(animation_type, GroupAnimationType):
+        elif isinstance(animation_type, metadata.GroupAnimationType):
             self.animation_type = "group"
 
         self.is_video_animation = True
@@ -79,15 +81,15 @@ class Text_animation(Animation):
 
     animation_type: Literal["in", "out", "loop"]
 
-    def __init__(self, animation_type: Union[TextIntro, TextOutro, TextLoopAnim],
+    def __init__(self, animation_type: "Union[TextIntro, TextOutro, TextLoopAnim]",
                  start: int, duration: int):
         super().__init__(animation_type.value, start, duration)
 
-        if isinstance(animation_type, TextIntro):
+        if isinstance(animation_type, metadata.TextIntro):
             self.animation_type = "in"
-        elif isinstance(animation_type, TextOutro):
+        elif isinstance(animation_type, metadata.TextOutro):
             self.animation_type = "out"
-        elif isinstance(animation_type, TextLoopAnim):
+        elif isinstance(animation_type, metadata.TextLoopAnim):
             self.animation_type = "loop"
 
         self.is_video_animation = False
@@ -104,7 +106,7 @@ class SegmentAnimations:
     """动画列表"""
 
     def __init__(self):
-        self.animation_id = uuid.uuid4().hex
+        self.animation_id = new_id()
         self.animations = []
 
     def get_animation_trange(self, animation_type: Literal["in", "out", "group", "loop"]) -> Optional[Timerange]:
@@ -3,19 +3,20 @@
 包含淡入淡出效果、音频特效等相关类
 """
 
-import uuid
-from copy import deepcopy
-
-from typing import Optional, Literal, Union
+from typing import Optional, Literal, Union, TYPE_CHECKING
 from typing import Dict, List, Any
 
+from .id_provider import new_id
 from .time_util import tim, Timerange
 from .segment import MediaSegment
 from .local_materials import AudioMaterial
-from .keyframe import KeyframeProperty, KeyframeList
+from .keyframe import KeyframeProperty, ArrayLike
 
+from . import metadata
 from .metadata import EffectParamInstance
-from .metadata import AudioSceneEffectType, ToneEffectType, SpeechToSongType
+
+if TYPE_CHECKING:
+    from .metadata import AudioSceneEffectType, ToneEffectType, SpeechToSongType
 
 class AudioFade:
     """音频淡入淡出效果"""
@@ -31,7 +32,7 @@ class AudioFade:
     def __init__(self, in_duration: int, out_duration: int):
         """根据给定的淡入/淡出时长构造一个淡入淡出效果"""
 
-        self.fade_id = uuid.uuid4().hex
+        self.fade_id = new_id()
         self.in_duration = in_duration
         self.out_duration = out_duration
 
@@ -60,24 +61,24 @@ class AudioEffect:
 
     audio_adjust_params: List[EffectParamInstance]
 
-    def __init__(self, effect_meta: Union[AudioSceneEffectType, ToneEffectType, SpeechToSongType],
+    def __init__(self, effect_meta: "Union[AudioSceneEffectType, ToneEffectType, SpeechToSongType]",
                  params: Optional[List[Optional[float]]] = None):
         """根据给定的音效元数据及参数列表构造一个音频特效对象, params的范围是0~100"""
 
         self.name = effect_meta.value.name
-        self.effect_id = uuid.uuid4().hex
+        self.effect_id = new_id()
         self.resource_id = effect_meta.value.resource_id
         self.audio_adjust_params = []
 
-        if isinstance(effect_meta, AudioSceneEffectType):
+        if isinstance(effect_meta, metadata.AudioSceneEffectType):
             self.category_id = "sound_effect"
             self.category_name = "场景音"
             self.category_index = 1
-        elif isinstance(effect_meta, ToneEffectType):
+        elif isinstance(effect_meta, metadata.ToneEffectType):
             self.category_id = "tone"
             self.category_name = "音色"
             self.category_index = 2
-        elif isinstance(effect_meta, SpeechToSongType):
+        elif isinstance(effect_meta, metadata.SpeechToSongType):
             self.category_id = "speech_to_song"
             self.category_name = "声音成曲"
             self.category_index = 3
@@ -107,7 +108,7 @@ class AudioSegment(MediaSegment):
     """安放在轨道上的一个音频片段"""
 
     material_instance: AudioMaterial
-    """音频素材实例"""
+    """音频素材实例, 与其他使用同一素材的片段共享"""
 
     fade: Optional[AudioFade]
     """音频淡入淡出效果, 可能为空
@@ -151,11 +152,11 @@ class AudioSegment(MediaSegment):
 
         super().__init__(material.material_id, source_timerange, target_timerange, speed, volume)
 
-        self.material_instance = deepcopy(material)
+        self.material_instance = material  # 素材不可修改, 故直接共享
         self.fade = None
         self.effects = []
 
-    def add_effect(self, effect_type: Union[AudioSceneEffectType, ToneEffectType, SpeechToSongType],
+    def add_effect(self, effect_type: "Union[AudioSceneEffectType, ToneEffectType, SpeechToSongType]",
                    params: Optional[List[Optional[float]]] = None) -> "AudioSegment":
         """为音频片段添加一个作用于整个片段的音频效果, 目前"声音成曲"效果不能自动被剪映所识别
 
@@ -206,14 +207,26 @@ class AudioSegment(MediaSegment):
             time_offset (`int`): 关键帧的时间偏移量, 单位为微秒
             volume (`float`): 音量在`time_offset`处的值
         """
-        _property = KeyframeProperty.volume
-        for kf_list in self.common_keyframes:
-            if kf_list.keyframe_property == _property:
-                kf_list.add_keyframe(time_offset, volume)
-                return self
-        kf_list = KeyframeList(_property)
-        kf_list.add_keyframe(time_offset, volume)
-        self.common_keyframes.append(kf_list)
+        self._get_keyframe_list(KeyframeProperty.volume).add_keyframe(time_offset, volume)
+        return self
+
+    def add_keyframes(self, times: ArrayLike, volumes: ArrayLike, *,
+                      simplify_tolerance: Optional[float] = None) -> "AudioSegment":
+        """为音频片段批量创建*控制音量*的关键帧
+
+        Args:
+            times (`ArrayLike`): 各关键帧的时间偏移量, 单位为微秒, 可以是列表或NumPy数组
+            volumes (`ArrayLike`): 音量在各时间偏移量处的值, 长度须与`times`一致
+            simplify_tolerance (`float`, optional): 若指定, 则在添加后以此容差简化音量关键帧, 参见`KeyframeList.simplify`.
+                默认不简化.
+
+        Raises:
+            `ValueError`: `times`与`volumes`长度不一致
+        """
+        kf_list = self._get_keyframe_list(KeyframeProperty.volume)
+        kf_list.add_keyframes(times, volumes)
+        if simplify_tolerance is not None:
+            kf_list.simplify(simplify_tolerance)
         return self
 
     def export_json(self) -> Dict[str, Any]:
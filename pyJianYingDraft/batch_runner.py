@@ -0,0 +1,275 @@
+"""使用进程池从清单批量生成草稿
+
+清单的每一行描述一个新草稿, 是一个以列名为键的字典, 可以从JSONL或CSV文件中读取:
+- `draft_name`: 新草稿名称, 必需
+- `template`: 模板草稿名称, 未指定时使用`run_batch`的`template`参数
+- `text:<轨道>:<片段下标>`: 替换文本片段的内容, `<轨道>`为文本轨道的名称或其在同类导入轨道中的下标,
+  JSONL中的值也可以是字符串列表(用于文本模板)
+- `material:<素材名称>`: 以给定路径的文件替换模板中同名的音视频素材
+
+也可以提供自定义的`build_variant`函数, 从每一行构造变体.
+"""
+
+import os
+import csv
+import time
+import traceback
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Optional, Callable, Iterable
+from typing import List, Dict, Set, Any
+
+from . import metadata
+from . import json_backend
+from . import local_materials
+from .track import TrackType
+from .metadata.catalog import ENUM_NAMES
+from .local_materials import VideoMaterial, AudioMaterial
+from .compiled_template import CompiledTemplate, TemplateVariant
+
+Row = Dict[str, Any]
+"""清单中的一行"""
+VariantBuilder = Callable[[CompiledTemplate, Row], TemplateVariant]
+"""从清单中的一行构造变体的函数, 在工作进程中调用, 须能被pickle(即定义在模块顶层)"""
+
+def _check_unique_names(rows: Iterable[Row]) -> None:
+    """检查各行的`draft_name`互不相同, 否则同名的草稿会被并发写入同一文件夹
+
+    Raises:
+        `ValueError`: 存在重复的`draft_name`
+    """
+    seen: Set[str] = set()
+    duplicates: List[str] = []
+    for row in rows:
+        draft_name = row.get("draft_name")
+        if not draft_name:
+            continue
+        if draft_name in seen and draft_name not in duplicates:
+            duplicates.append(draft_name)
+        seen.add(draft_name)
+    if duplicates:
+        raise ValueError("清单中存在重复的draft_name: %s" % ", ".join(duplicates))
+
+def load_manifest(path: str) -> List[Row]:
+    """读取JSONL或CSV格式的清单, 格式依据文件扩展名判断
+
+    Raises:
+        `ValueError`: 不支持的文件格式, JSONL中存在非对象的行, 或存在重复的`draft_name`
+    """
+    ext = os.path.splitext(path)[1].lower()
+    rows: List[Row] = []
+    if ext == ".csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            rows = [dict(row) for row in csv.DictReader(f)]
+    elif ext in (".jsonl", ".ndjson"):
+        with open(path, "r", encoding="utf-8-sig") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                row = json_backend.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError("清单第%d行不是JSON对象" % line_no)
+                rows.append(row)
+    else:
+        raise ValueError("不支持的清单格式 '%s', 仅支持.jsonl及.csv" % ext)
+    _check_unique_names(rows)
+    return rows
+
+def manifest_variant(compiled: CompiledTemplate, row: Row) -> TemplateVariant:
+    """按模块文档中描述的列约定, 从清单中的一行构造变体, 空值的列被忽略
+
+    Raises:
+        `ValueError`: 无法识别的`text:`列
+        `MaterialNotFound`: 模板中不存在`material:`列指定的素材
+    """
+    variant = compiled.variant()
+    for column, value in row.items():
+        if value is None or value == "":
+            continue
+        if column.startswith("text:"):
+            parts = column[len("text:"):].rsplit(":", 1)
+            if len(parts) != 2 or not parts[1].isdigit():
+                raise ValueError("无法识别的列 '%s', 应为 text:<轨道>:<片段下标>" % column)
+            track_ref, segment_index = parts[0], int(parts[1])
+            if track_ref.isdigit():
+                track = compiled.get_imported_track(TrackType.text, index=int(track_ref))
+            else:
+                track = compiled.get_imported_track(TrackType.text, name=track_ref)
+            variant.replace_text(track, segment_index, value)
+        elif column.startswith("material:"):
+            material_name = column[len("material:"):]
+            audio_mode = not compiled.script.get_imported_materials_by_name("videos", material_name) \
+                and len(compiled.script.get_imported_materials_by_name("audios", material_name)) > 0
+            material = AudioMaterial(value) if audio_mode else VideoMaterial(value)
+            variant.replace_material_by_name(material_name, material)
+    return variant
+
+@dataclass
+class BatchProgress:
+    """批量生成的进度, 每完成一行时传递给进度回调"""
+
+    total: int
+    """本次需要生成的草稿数, 不含此前已完成而跳过的行"""
+    done: int
+    """已成功生成的草稿数"""
+    failed: int
+    """已失败的行数"""
+    elapsed: float
+    """已用时间, 单位为秒"""
+
+    @property
+    def drafts_per_second(self) -> float:
+        """平均每秒生成的草稿数"""
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+@dataclass
+class BatchResult:
+    """批量生成的结果"""
+
+    completed: List[str] = field(default_factory=list)
+    """本次成功生成的草稿名称"""
+    skipped: List[str] = field(default_factory=list)
+    """因已记录在完成日志中而跳过的草稿名称"""
+    errors: Dict[str, str] = field(default_factory=dict)
+    """各失败的草稿名称及错误信息(含调用栈)"""
+    seconds: float = 0.0
+    """总耗时, 单位为秒"""
+
+    @property
+    def drafts_per_second(self) -> float:
+        """平均每秒生成的草稿数"""
+        return len(self.completed) / self.seconds if self.seconds > 0 else 0.0
+
+_worker_templates: Dict[str, CompiledTemplate] = {}
+_worker_options: Dict[str, Any] = {}
+
+def _init_worker(folder_path: str, template_names: List[str], build_variant: Optional[VariantBuilder],
+                 compact: bool, allow_replace: bool, probe_cache: Optional[local_materials.ProbeCache]) -> None:
+    """工作进程的初始化: 预先编译各模板并加载元数据"""
+    local_materials.set_probe_cache(probe_cache)
+    for enum_name in ENUM_NAMES:
+        getattr(metadata, enum_name)
+    _worker_options.update(folder_path=folder_path, build_variant=build_variant,
+                           compact=compact, allow_replace=allow_replace)
+    for name in template_names:
+        compiled = CompiledTemplate(os.path.join(folder_path, name), folder_path)
+        compiled._skeleton(compact)
+        _worker_templates[name] = compiled
+
+def _run_row(template_name: str, row: Row) -> Optional[str]:
+    """在工作进程中生成一行对应的草稿, 成功时返回None, 否则返回错误信息"""
+    try:
+        compiled = _worker_templates.get(template_name)
+        if compiled is None:
+            compiled = CompiledTemplate(os.path.join(_worker_options["folder_path"], template_name),
+                                        _worker_options["folder_path"])
+            _worker_templates[template_name] = compiled
+        build_variant: VariantBuilder = _worker_options["build_variant"] or manifest_variant
+        compiled.emit(row["draft_name"], build_variant(compiled, row),
+                      allow_replace=_worker_options["allow_replace"], compact=_worker_options["compact"])
+        return None
+    except Exception:
+        return traceback.format_exc()
+
+def _read_completion_log(path: str) -> Set[str]:
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json_backend.loads(line)
+            except ValueError:  # 中途被终止时最后一行可能不完整
+                continue
+            if isinstance(record, dict) and record.get("ok"):
+                done.add(record["draft_name"])
+    return done
+
+def run_batch(folder_path: str, rows: Iterable[Row], *, template: Optional[str] = None,
+              build_variant: Optional[VariantBuilder] = None, workers: Optional[int] = None,
+              completion_log: Optional[str] = None, progress: Optional[Callable[[BatchProgress], None]] = None,
+              compact: bool = False, allow_replace: bool = False) -> BatchResult:
+    """使用进程池从清单批量生成草稿, 单行的错误不会中断整批生成
+
+    每个工作进程在启动时编译所需的各模板并加载元数据, 此后对每一行只应用替换并写出新草稿(参见`CompiledTemplate`).
+    在Windows下调用时请将调用代码置于`if __name__ == "__main__":`保护之下.
+
+    Args:
+        folder_path (`str`): 草稿文件夹, 模板草稿及生成的草稿均位于其中
+        rows (`Iterable[Row]`): 清单中的各行, 可由`load_manifest`读取
+        template (`str`, optional): 未在行中指定`template`时使用的模板草稿名称
+        build_variant (`VariantBuilder`, optional): 从一行构造变体的函数, 默认为`manifest_variant`.
+        workers (`int`, optional): 工作进程数, 默认为CPU核数.
+        completion_log (`str`, optional): 完成日志的路径. 每生成(或未能生成)一个草稿即追加一条记录,
+            再次运行时跳过日志中已成功的草稿, 从而可以从中断处继续. 中断时正在生成的草稿可能已部分写出,
+            故继续时宜同时指定`allow_replace`. 默认不记录.
+        progress (`Callable[[BatchProgress], None]`, optional): 进度回调, 每完成一行时在主进程中调用.
+        compact (`bool`, optional): 是否以紧凑格式写入草稿文件. 默认为否.
+        allow_replace (`bool`, optional): 是否允许覆盖重名的草稿. 默认为否.
+
+    Returns:
+        `BatchResult`: 成功、跳过及失败的草稿
+
+    Raises:
+        `ValueError`: 清单中存在重复的`draft_name`, 此时不生成任何草稿
+    """
+    start = time.perf_counter()
+    result = BatchResult()
+    row_list = list(rows)
+    _check_unique_names(row_list)
+    finished = _read_completion_log(completion_log) if completion_log is not None else set()
+
+    pending: List[Row] = []
+    for row_no, row in enumerate(row_list, 1):
+        draft_name = row.get("draft_name")
+        if not draft_name:
+            result.errors["<第%d行>" % row_no] = "缺少draft_name列"
+        elif draft_name in finished:
+            result.skipped.append(draft_name)
+        else:
+            pending.append(row)
+
+    template_names: List[str] = []
+    for row in pending:
+        name = row.get("template") or template
+        if name is None:
+            result.errors[row["draft_name"]] = "未指定模板"
+        elif name not in template_names:
+            template_names.append(name)
+    pending = [row for row in pending if row["draft_name"] not in result.errors]
+    rejected = len(result.errors)
+    if len(pending) == 0:
+        result.seconds = time.perf_counter() - start
+        return result
+
+    log_file = open(completion_log, "a", encoding="utf-8") if completion_log is not None else None
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(folder_path, template_names, build_variant, compact, allow_replace,
+                                           local_materials.get_probe_cache())) as executor:
+            futures = {executor.submit(_run_row, row.get("template") or template, row): row["draft_name"]
+                       for row in pending}
+            for future in as_completed(futures):
+                draft_name = futures[future]
+                try:
+                    error = future.result()
+                except Exception:  # 工作进程异常退出等
+                    error = traceback.format_exc()
+                if error is None:
+                    result.completed.append(draft_name)
+                else:
+                    result.errors[draft_name] = error
+
+                if log_file is not None:
+                    log_file.write(json_backend.dumps_compact({"draft_name": draft_name, "ok": error is None}) + "\n")
+                    log_file.flush()
+                if progress is not None:
+                    progress(BatchProgress(len(pending), len(result.completed), len(result.errors) - rejected,
+                                           time.perf_counter() - start))
+    finally:
+        if log_file is not None:
+            log_file.close()
+
+    result.seconds = time.perf_counter() - start
+    return result
@@ -0,0 +1,355 @@
+"""模板的批量生成: 模板只解析一次, 每个变体仅修改并重新编码替换点, 直接写出为新的草稿"""
+
+import os
+import time
+import shutil
+import tempfile
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional, Union, Callable, Iterable, Iterator
+from typing import List, Dict, Tuple, Any, Hashable
+
+from . import util
+from .time_util import Timerange
+from .track import TrackType
+from .script_file import ScriptFile
+from .local_materials import VideoMaterial, AudioMaterial
+from .template_mode import EditableTrack, ShrinkMode, ExtendMode
+
+CONTENT_FILE = "draft_content.json"
+
+def _replace_folder(src: str, dst: str) -> None:
+    """将`src`文件夹移动为`dst`, `dst`已存在时先将其移开, 替换成功后再删除"""
+    if not os.path.exists(dst):
+        os.rename(src, dst)
+        return
+    old_path = src + ".old"
+    os.rename(dst, old_path)
+    try:
+        os.rename(src, dst)
+    except BaseException:
+        os.rename(old_path, dst)
+        raise
+    shutil.rmtree(old_path, ignore_errors=True)
+
+class TemplateVariant:
+    """一个草稿变体相对于模板的替换内容, 由`CompiledTemplate.variant()`创建
+
+    各方法与`ScriptFile`中的同名方法含义相同, 但只记录替换操作, 在`CompiledTemplate.emit`时才实际应用.
+    变体中的轨道以其在模板中的位置保存, 故变体可以被序列化(如传递给子进程).
+    """
+
+    _ops: List[Tuple[Any, ...]]
+    """记录的替换操作, 依次应用"""
+
+    def __init__(self, template: "CompiledTemplate"):
+        self._template: Optional[CompiledTemplate] = template
+        self._ops = []
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"_template": None, "_ops": self._ops}
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def _track_pos(self, track: EditableTrack) -> int:
+        if self._template is None:
+            raise ValueError("反序列化得到的变体不能再添加替换操作")
+        return self._template._track_pos(track)
+
+    def replace_text(self, track: EditableTrack, segment_index: int, text: Union[str, List[str]],
+                     recalc_style: bool = True) -> "TemplateVariant":
+        """替换指定文本轨道上指定片段的文字内容, 参见`ScriptFile.replace_text`"""
+        self._ops.append(("text", self._track_pos(track), segment_index, text, recalc_style))
+        return self
+
+    def replace_material_by_name(self, material_name: str, material: Union[VideoMaterial, AudioMaterial],
+                                 replace_crop: bool = False) -> "TemplateVariant":
+        """替换指定名称的素材, 参见`ScriptFile.replace_material_by_name`"""
+        self._ops.append(("name", material_name, material, replace_crop))
+        return self
+
+    def replace_material_by_seg(self, track: EditableTrack, segment_index: int, material: Union[VideoMaterial, AudioMaterial],
+                                source_timerange: Optional[Timerange] = None, *,
+                                handle_shrink: ShrinkMode = ShrinkMode.cut_tail,
+                                handle_extend: Union[ExtendMode, List[ExtendMode]] = ExtendMode.cut_material_tail) -> "TemplateVariant":
+        """替换指定音视频轨道上指定片段的素材, 参见`ScriptFile.replace_material_by_seg`"""
+        self._ops.append(("seg", self._track_pos(track), segment_index, material,
+                          source_timerange, handle_shrink, handle_extend))
+        return self
+
+@dataclass
+class BatchReport:
+    """一批草稿的生成结果"""
+
+    draft_paths: List[str]
+    """生成的草稿文件夹路径"""
+    seconds: float
+    """总耗时, 单位为秒"""
+
+    @property
+    def drafts_per_second(self) -> float:
+        """每秒生成的草稿数"""
+        return len(self.draft_paths) / self.seconds if self.seconds > 0 else float("inf")
+
+class CompiledTemplate:
+    """编译后的模板草稿, 用于从同一模板批量生成大量草稿
+
+    模板只解析并编码一次, 编码结果按替换点(文本素材、音视频素材及片段的时间范围)切分. 生成每个变体时只修改并重新编码替换点,
+    其余部分原样写出, 写出后再将替换点恢复为模板中的原值. 添加了新素材的变体(如使用`replace_material_by_seg`)无法如此处理,
+    此时退回到增量导出整个草稿, 仍只重新编码发生变化的素材及片段.
+    生成的草稿与使用`DraftFolder.duplicate_as_template`逐个替换并保存得到的草稿相同.
+
+    同一对象不是线程安全的, 多线程或多进程生成时应各自编译模板.
+    """
+
+    template_path: str
+    """模板草稿文件夹的路径"""
+    output_folder: str
+    """生成的草稿所在的文件夹"""
+    script: ScriptFile
+    """以模板模式打开的模板草稿, 在生成变体之外的时间总是保持模板中的原始内容, 不应直接修改"""
+
+    def __init__(self, template_path: str, output_folder: Optional[str] = None):
+        """编译给定的模板草稿
+
+        Args:
+            template_path (`str`): 模板草稿文件夹的路径
+            output_folder (`str`, optional): 生成的草稿所在的文件夹, 默认与模板草稿位于同一文件夹.
+
+        Raises:
+            `FileNotFoundError`: 模板草稿不存在
+        """
+        if not os.path.exists(template_path):
+            raise FileNotFoundError(f"模板草稿 {template_path} 不存在")
+        self.template_path = os.path.abspath(template_path)
+        self.output_folder = output_folder if output_folder is not None else os.path.dirname(self.template_path)
+
+        self.script = ScriptFile.load_template(os.path.join(template_path, CONTENT_FILE))
+        self.script.save_path = None  # 避免意外覆盖模板
+        self.script.incremental_export = True
+
+        # 替换点由ScriptFile的素材索引定位: 文本素材以id查找, 音视频素材以名称查找
+        self._skeletons: Dict[bool, Tuple[List[str], Dict[Hashable, int]]] = {}
+
+    def get_imported_track(self, track_type: TrackType, name: Optional[str] = None,
+                           index: Optional[int] = None) -> EditableTrack:
+        """获取模板中指定类型的导入轨道, 以便在变体中引用, 参见`ScriptFile.get_imported_track`"""
+        return self.script.get_imported_track(track_type, name, index)  # type: ignore
+
+    def _track_pos(self, track: EditableTrack) -> int:
+        for i, imported in enumerate(self.script.imported_tracks):
+            if imported is track:
+                return i
+        raise ValueError("轨道不属于此模板, 请使用`CompiledTemplate.get_imported_track`获取")
+
+    def variant(self) -> TemplateVariant:
+        """创建一个空的变体"""
+        return TemplateVariant(self)
+
+    def _skeleton(self, compact: bool) -> Tuple[List[str], Dict[Hashable, int]]:
+        """模板草稿的编码结果, 按替换点切分为片段, 并返回各替换点(素材及片段)所在的位置
+
+        须在未应用任何变体时调用
+        """
+        skeleton = self._skeletons.get(compact)
+        if skeleton is not None:
+            return skeleton
+
+        chunks = list(self.script._iter_json_chunks(compact))
+        # 增量导出时各素材及片段均以缓存中的RawJson输出, 据此定位替换点.
+        # 编码结果相同的多个片段无法区分, 不作为替换点, 修改它们的变体将退回到增量导出
+        cache = self.script._fragment_cache
+        fragment_keys: Dict[str, Optional[Hashable]] = {}
+        for key in cache.keys():
+            text = cache.get(key)
+            assert text is not None
+            fragment_keys[text] = key if text not in fragment_keys else None
+        matched: Dict[Hashable, int] = {}
+        for chunk in chunks:
+            key = fragment_keys.get(chunk) if isinstance(chunk, util.RawJson) else None
+            if key is not None:
+                matched[key] = matched.get(key, 0) + 1
+
+        pieces: List[str] = []
+        slots: Dict[Hashable, int] = {}
+        static: List[str] = []
+        for chunk in chunks:
+            key = fragment_keys.get(chunk) if isinstance(chunk, util.RawJson) else None
+            if key is None or matched[key] > 1:
+                static.append(chunk)
+                continue
+            if static:
+                pieces.append("".join(static))
+                static = []
+            slots[key] = len(pieces)
+            pieces.append(chunk)
+        if static:
+            pieces.append("".join(static))
+
+        skeleton = self._skeletons[compact] = (pieces, slots)
+        return skeleton
+
+    @contextmanager
+    def _applied(self, variant: Optional[TemplateVariant]) -> Iterator[List[Tuple[Any, ...]]]:
+        """在`with`语句块内将变体应用到模板上, 退出时恢复各替换点
+
+        Yields:
+            被修改的替换点: `("material", 类别, 素材json)`或`("track", 轨道)`, 若草稿结构发生变化则包含`("structure",)`
+        """
+        undo: List[Callable[[], None]] = []
+        patched: List[Tuple[Any, ...]] = []
+
+        def save_material(category: str, obj: Dict[str, Any]) -> None:
+            saved = dict(obj)
+            undo.append(lambda: (obj.clear(), obj.update(saved)))
+            patched.append(("material", category, obj))
+
+        script = self.script
+        duration = script.duration
+        material_counts = (len(script.materials.videos), len(script.materials.audios))
+        try:
+            for op in (variant._ops if variant is not None else []):
+                kind = op[0]
+                if kind == "text":
+                    _, track_pos, segment_index, text, recalc_style = op
+                    track = script.imported_tracks[track_pos]
+                    assert isinstance(track, EditableTrack)
+                    if 0 <= segment_index < len(track):
+                        material_id = track.segments[segment_index].material_id
+                        text_material = script.get_imported_material("texts", material_id)
+                        text_template = script.get_imported_material("text_templates", material_id)
+                        if text_material is not None:
+                            save_material("texts", text_material)
+                        elif text_template is not None:
+                            for resource in text_template["text_info_resources"]:
+                                sub_material = script.get_imported_material("texts", resource["text_material_id"])
+                                if sub_material is not None:
+                                    save_material("texts", sub_material)
+                    script.replace_text(track, segment_index, text, recalc_style)
+                elif kind == "name":
+                    _, material_name, material, replace_crop = op
+                    category = "videos" if isinstance(material, VideoMaterial) else "audios"
+                    targets = script.get_imported_materials_by_name(category, material_name)
+                    for mat in targets:
+                        save_material(category, mat)
+                    script.replace_material_by_name(material_name, material, replace_crop)
+                    # 先于素材本身恢复名称索引
+                    undo.append(lambda category=category, mat=targets[0], old_name=material_name,
+                                new_name=material.material_name:
+                                script._reindex_imported_name(category, mat, new_name, old_name))
+                elif kind == "seg":
+                    _, track_pos, segment_index, material, source_timerange, handle_shrink, handle_extend = op
+                    track = script.imported_tracks[track_pos]
+                    assert isinstance(track, EditableTrack)
+                    saved_segments = [(seg, seg.material_id, seg.start, seg.duration, getattr(seg, "source_timerange", None))
+                                      for seg in track.segments]
+
+                    def restore_segments(saved_segments=saved_segments) -> None:
+                        for seg, material_id, start, seg_duration, source in saved_segments:
+                            seg.material_id = material_id
+                            seg.start, seg.duration = start, seg_duration
+                            if source is not None:
+                                seg.source_timerange = source
+                    undo.append(restore_segments)
+                    patched.append(("track", track))
+                    if source_timerange is not None:  # 替换过程可能修改传入的时间范围
+                        source_timerange = Timerange(source_timerange.start, source_timerange.duration)
+                    script.replace_material_by_seg(track, segment_index, material, source_timerange,
+                                                   handle_shrink=handle_shrink, handle_extend=handle_extend)
+                else:
+                    raise ValueError(f"未知的替换操作 '{kind}'")
+
+            if (len(script.materials.videos), len(script.materials.audios)) != material_counts:
+                patched.append(("structure",))  # 添加了新素材
+            yield patched
+        finally:
+            for action in reversed(undo):
+                action()
+            for registry, count in zip((script.materials.videos, script.materials.audios), material_counts):
+                for key in list(registry)[count:]:
+                    del registry[key]
+            script.duration = duration
+
+    def _render(self, compact: bool, patched: List[Tuple[Any, ...]]) -> Optional[List[str]]:
+        """在模板的编码结果上仅重新编码被修改的替换点, 若无法如此处理(如添加了新素材)则返回None"""
+        pieces, slots = self._skeletons[compact]
+        pieces = list(pieces)
+        indent = None if compact else 4
+        for patch in patched:
+            if patch[0] == "material":
+                _, category, material = patch
+                fragments = [(("material", compact, category, material.get("id")), material, 3)]
+            elif patch[0] == "track":
+                track_json = self.script._export_track(patch[1])
+                fragments = [(("segment", compact, seg.get("id")), seg, 4) for seg in track_json["segments"]]
+            else:
+                return None
+
+            for key, value, level in fragments:
+                slot = slots.get(key)
+                if slot is None:
+                    return None
+                pieces[slot] = util.encode_json_fragment(value, indent=indent, level=level)
+        return pieces
+
+    def emit(self, draft_name: str, variant: Optional[TemplateVariant] = None, *,
+             allow_replace: bool = False, compact: bool = False) -> str:
+        """将一个变体写出为新的草稿, 草稿文件夹中的其余文件从模板复制
+
+        Args:
+            draft_name (`str`): 新草稿名称, 即在`output_folder`中的文件夹名称
+            variant (`TemplateVariant`, optional): 要应用的变体, 不指定时原样复制模板.
+            allow_replace (`bool`, optional): 是否允许覆盖与`draft_name`重名的草稿, 覆盖时整个替换原草稿文件夹. 默认为否.
+            compact (`bool`, optional): 是否以紧凑格式写入草稿文件, 参见`ScriptFile.dump`. 默认为否.
+
+        Returns:
+            `str`: 新草稿文件夹的路径
+
+        Raises:
+            `FileExistsError`: 已存在与`draft_name`重名的草稿, 但不允许覆盖.
+            其余异常同`ScriptFile`中相应的替换方法, 此时不会创建新草稿, 重名的草稿也保持不变.
+        """
+        draft_path = os.path.join(self.output_folder, draft_name)
+        if os.path.abspath(draft_path) == self.template_path:
+            raise FileExistsError("不能覆盖模板草稿本身")
+        if os.path.exists(draft_path) and not allow_replace:
+            raise FileExistsError(f"新草稿 {draft_name} 已存在且不允许覆盖")
+
+        self._skeleton(compact)
+        with self._applied(variant) as patched:
+            pieces = self._render(compact, patched)
+            # 先在同一文件夹下的临时文件夹中生成, 完成后再整体替换, 以免失败时破坏重名的草稿
+            tmp_path = tempfile.mkdtemp(dir=self.output_folder, prefix="." + draft_name + ".", suffix=".tmp")
+            try:
+                shutil.copytree(self.template_path, tmp_path, dirs_exist_ok=True,
+                                ignore=shutil.ignore_patterns(CONTENT_FILE + "*"))
+                content_path = os.path.join(tmp_path, CONTENT_FILE)
+                if pieces is not None:
+                    util.atomic_write(content_path, pieces)
+                else:
+                    self.script.dump(content_path, compact)
+                _replace_folder(tmp_path, draft_path)
+            except BaseException:
+                shutil.rmtree(tmp_path, ignore_errors=True)
+                raise
+        return draft_path
+
+    def emit_many(self, variants: Iterable[Tuple[str, Optional[TemplateVariant]]], *,
+                  allow_replace: bool = False, compact: bool = False) -> BatchReport:
+        """依次生成一批草稿, 并统计生成速度
+
+        Args:
+            variants (`Iterable[Tuple[str, TemplateVariant]]`): 各新草稿的名称及其变体
+            allow_replace (`bool`, optional): 是否允许覆盖重名的草稿. 默认为否.
+            compact (`bool`, optional): 是否以紧凑格式写入草稿文件. 默认为否.
+
+        Returns:
+            `BatchReport`: 生成的草稿路径及耗时, 其`drafts_per_second`属性即每秒生成的草稿数. 耗时不含模板的首次编码.
+        """
+        self._skeleton(compact)
+        start = time.perf_counter()
+        paths = [self.emit(draft_name, variant, allow_replace=allow_replace, compact=compact)
+                 for draft_name, variant in variants]
+        return BatchReport(paths, time.perf_counter() - start)
@@ -3,10 +3,12 @@
 import os
 import shutil
 
-from typing import List
+from typing import List, Optional
 
 from . import assets
 from .script_file import ScriptFile
+from .id_provider import IdProvider
+from .compiled_template import CompiledTemplate
 
 class DraftFolder:
     """管理一个文件夹及其内的一系列草稿"""
@@ -61,7 +63,7 @@ class DraftFolder:
         shutil.rmtree(draft_path)
 
     def create_draft(self, draft_name: str, width: int, height: int, fps: int = 30, *,
-                     allow_replace: bool = False) -> ScriptFile:
+                     allow_replace: bool = False, id_provider: Optional[IdProvider] = None) -> ScriptFile:
         """创建一个新草稿并开始编辑, 编辑完成后使用`ScriptFile.save()`保存即可
 
         Args:
@@ -70,6 +72,7 @@ class DraftFolder:
             height (`int`): 视频高度, 单位为像素
             fps (`int`, optional): 视频帧率. 默认为30.
             allow_replace (`bool`, optional): 是否允许覆盖与`draft_name`重名的草稿. 默认为否.
+            id_provider (`IdProvider`, optional): 草稿使用的id提供者, 参见`ScriptFile.id_scope`. 默认使用全局设置.
 
         Raises:
             `FileExistsError`: 已存在与`draft_name`重名的草稿, 但不允许覆盖.
@@ -85,7 +88,7 @@ class DraftFolder:
         shutil.copy(assets.get_asset_path("DRAFT_META_TEMPLATE"), os.path.join(draft_path, "draft_meta_info.json"))
 
         # 创建草稿文件
-        script_file = ScriptFile(width, height, fps)
+        script_file = ScriptFile(width, height, fps, id_provider=id_provider)
         script_file.save_path = os.path.join(draft_path, "draft_content.json")
 
         return script_file
@@ -151,3 +154,19 @@ class DraftFolder:
 
         # 打开草稿
         return self.load_template(new_draft_name)
+
+    def compile_template(self, template_name: str) -> CompiledTemplate:
+        """编译给定的草稿作为模板, 以便从中批量生成草稿, 生成的草稿同样位于本文件夹中
+
+        相比对每个新草稿调用`duplicate_as_template`, 模板只被解析一次, 且每个新草稿只重新编码被替换的部分
+
+        Args:
+            template_name (`str`): 模板草稿名称
+
+        Raises:
+            `FileNotFoundError`: 模板草稿不存在
+        """
+        template_path = os.path.join(self.folder_path, template_name)
+        if not os.path.exists(template_path):
+            raise FileNotFoundError(f"模板草稿 {template_name} 不存在")
+        return CompiledTemplate(template_path, self.folder_path)
@@ -0,0 +1,58 @@
+"""草稿中各对象id的生成
+
+默认使用`uuid4`生成随机id. 可以替换为带种子的计数器(`CounterIdProvider`), 此时相同的输入将生成逐字节相同的草稿,
+且生成速度更快. id提供者既可以全局设置, 也可以通过`use_id_provider`或`ScriptFile.id_scope`限定在一段代码中生效.
+"""
+
+import uuid
+import hashlib
+import itertools
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Union
+
+IdProvider = Callable[[], str]
+"""id提供者, 每次调用返回一个新的32位十六进制字符串"""
+
+def uuid4_hex() -> str:
+    """默认的id提供者, 返回随机的uuid4"""
+    return uuid.uuid4().hex
+
+class CounterIdProvider:
+    """以种子及递增计数器生成id的提供者, 相同种子生成相同的id序列
+
+    生成的id由种子哈希得到的16位前缀及16位计数值组成, 不同种子的id互不重复.
+    """
+
+    seed: Union[int, str]
+    """种子"""
+
+    def __init__(self, seed: Union[int, str] = 0):
+        self.seed = seed
+        self._prefix = hashlib.blake2b(str(seed).encode("utf-8"), digest_size=8).hexdigest()
+        self._counter = itertools.count()
+
+    def __call__(self) -> str:
+        return "%s%016x" % (self._prefix, next(self._counter))
+
+_default_provider: IdProvider = uuid4_hex
+_current_provider: ContextVar[IdProvider] = ContextVar("id_provider")
+
+def set_id_provider(provider: IdProvider) -> None:
+    """设置全局的id提供者, 在`use_id_provider`作用域之外生效"""
+    global _default_provider
+    _default_provider = provider
+
+@contextmanager
+def use_id_provider(provider: IdProvider) -> Iterator[IdProvider]:
+    """在`with`语句块内使用给定的id提供者"""
+    token = _current_provider.set(provider)
+    try:
+        yield provider
+    finally:
+        _current_provider.reset(token)
+
+def new_id() -> str:
+    """使用当前的id提供者生成一个新id"""
+    return _current_provider.get(_default_provider)()
@@ -0,0 +1,112 @@
+"""可替换的JSON编解码后端
+
+若安装了`orjson`或`ujson`则自动使用之以加速大型草稿的解析及紧凑格式的序列化, 否则回退到标准库`json`.
+各后端的输出均保留非ASCII字符(等同于`ensure_ascii=False`), 且与标准库逐字节相同. 带缩进的输出总是由标准库完成.
+
+orjson将NaN及无穷大写为`null`, 且浮点数的指数格式与标准库不同(如`1e-7`与`1e-07`), 这些差异无法低成本地检测,
+故orjson只用于解析, 紧凑序列化改由ujson(若已安装)或标准库完成. ujson仅在负指数上与标准库不同, 出现时交由标准库处理.
+orjson无法解析的内容(如标准库写出的`NaN`)同样交由标准库解析; 注意orjson会将超过64位的整数解析为浮点数.
+"""
+
+import os
+import json
+
+from typing import Optional, Literal, Union, Callable
+from typing import Dict, Tuple, Any
+
+BackendName = Literal["orjson", "ujson", "json"]
+
+_Codec = Tuple[Callable[[Union[str, bytes]], Any], Callable[[Any], str]]
+"""一对(解析, 紧凑序列化)函数"""
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    return json.loads(data)
+
+def _json_dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+def _make_orjson() -> _Codec:
+    import orjson
+
+    def loads(data: Union[str, bytes]) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:  # 如NaN及Infinity, 交由标准库处理
+            return json.loads(data)
+
+    try:
+        dumps = _make_ujson()[1]
+    except ImportError:
+        dumps = _json_dumps
+    return loads, dumps
+
+def _make_ujson() -> _Codec:
+    import ujson
+
+    def dumps(obj: Any) -> str:
+        try:
+            text = ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+        except (OverflowError, TypeError):
+            return _json_dumps(obj)
+        if "e-" in text:  # 负指数未补零(如1e-7), 交由标准库处理; 字符串中的"e-"只会导致多余的回退
+            return _json_dumps(obj)
+        return text
+    return ujson.loads, dumps
+
+_FACTORIES: Dict[str, Callable[[], _Codec]] = {
+    "orjson": _make_orjson,
+    "ujson": _make_ujson,
+    "json": lambda: (_json_loads, _json_dumps),
+}
+
+_backend: BackendName = "json"
+_loads: Callable[[Union[str, bytes]], Any] = _json_loads
+_dumps: Callable[[Any], str] = _json_dumps
+
+def set_backend(name: Optional[BackendName] = None) -> BackendName:
+    """选择JSON后端
+
+    Args:
+        name (`orjson`, `ujson` or `json`, optional): 后端名称, 不指定时按orjson, ujson, json的顺序选择第一个可用的后端.
+
+    Returns:
+        `str`: 实际选用的后端名称
+
+    Raises:
+        `ImportError`: 指定的后端未安装
+        `ValueError`: 未知的后端名称
+    """
+    global _backend, _loads, _dumps
+
+    if name is not None and name not in _FACTORIES:
+        raise ValueError(f"未知的JSON后端 '{name}', 可选值为 {list(_FACTORIES.keys())}")
+    candidates = [name] if name is not None else list(_FACTORIES.keys())
+    for candidate in candidates:
+        try:
+            _loads, _dumps = _FACTORIES[candidate]()
+        except ImportError:
+            if name is not None:
+                raise
+            continue
+        _backend = candidate  # type: ignore
+        break
+    return _backend
+
+def get_backend() -> BackendName:
+    """当前使用的JSON后端名称"""
+    return _backend
+
+def loads(data: Union[str, bytes]) -> Any:
+    """解析JSON字符串或UTF-8编码的字节串"""
+    return _loads(data)
+
+def load_file(path: Union[str, "os.PathLike[str]"]) -> Any:
+    """读取并解析UTF-8编码的JSON文件"""
+    with open(path, "rb") as f:
+        return _loads(f.read())
+
+def dumps_compact(obj: Any) -> str:
+    """将对象序列化为不含空白的紧凑JSON字符串, 保留非ASCII字符"""
+    return _dumps(obj)
+
+set_backend()
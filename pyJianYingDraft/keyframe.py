@@ -1,11 +1,17 @@
-import uuid
+import bisect
 
+from array import array
 from enum import Enum
-from typing import Dict, List, Any
+from typing import Optional, Sequence, MutableSequence, Union, Callable, Iterable
+from typing import Dict, List, Tuple, Any
+
+from .id_provider import new_id
 
 class Keyframe:
     """一个关键帧（关键点）, 目前只支持线性插值"""
 
+    __slots__ = ("kf_id", "time_offset", "values")
+
     kf_id: str
     """关键帧全局id, 自动生成"""
     time_offset: int
@@ -13,25 +19,48 @@ class Keyframe:
     values: List[float]
     """关键帧的值, 似乎一般只有一个元素"""
 
-    def __init__(self, time_offset: int, value: float):
-        """给定时间偏移量及关键值, 初始化关键帧"""
-        self.kf_id = uuid.uuid4().hex
+    def __init__(self, time_offset: int, value: float, kf_id: Optional[str] = None):
+        """给定时间偏移量及关键值, 初始化关键帧, 不指定`kf_id`时自动生成"""
+        self.kf_id = kf_id if kf_id is not None else new_id()
 
         self.time_offset = time_offset
         self.values = [value]
 
     def export_json(self) -> Dict[str, Any]:
-        return {
-            # 默认值
-            "curveType": "Line",
-            "graphID": "",
-            "left_control": {"x": 0.0, "y": 0.0},
-            "right_control": {"x": 0.0, "y": 0.0},
-            # 自定义属性
-            "id": self.kf_id,
-            "time_offset": self.time_offset,
-            "values": self.values
-        }
+        return _export_keyframe(self.kf_id, self.time_offset, self.values)
+
+def _export_keyframe(kf_id: str, time_offset: int, values: List[float]) -> Dict[str, Any]:
+    return {
+        # 默认值
+        "curveType": "Line",
+        "graphID": "",
+        "left_control": {"x": 0.0, "y": 0.0},
+        "right_control": {"x": 0.0, "y": 0.0},
+        # 自定义属性
+        "id": kf_id,
+        "time_offset": time_offset,
+        "values": values
+    }
+
+ArrayLike = Union[Sequence[float], Any]
+"""一维的数值序列, 如`list`, `array.array`或NumPy数组"""
+
+def _to_array(typecode: str, data: ArrayLike) -> array:
+    """将数值序列转换为给定类型的`array.array`, NumPy数组直接按内存拷贝
+
+    转换为整数(`q`)时, 浮点数按四舍五入取整, 与`tim`一致
+    """
+    if isinstance(data, array) and data.typecode == typecode:
+        return data
+    if hasattr(data, "astype") and hasattr(data, "tobytes"):  # NumPy数组, 无需导入numpy
+        if typecode == "q":
+            data = data.round()
+        result = array(typecode)
+        result.frombytes(data.astype("int64" if typecode == "q" else "float64").ravel().tobytes())
+        return result
+    if typecode == "q":
+        return array(typecode, (int(round(item)) for item in data))
+    return array(typecode, data)
 
 class KeyframeProperty(Enum):
     """关键帧所控制的属性类型"""
@@ -62,33 +91,267 @@ class KeyframeProperty(Enum):
     volume = "KFTypeVolume"
     """音量, 1.0为原始音量, 仅对`AudioSegment`和`VideoSegment`有效"""
 
+def _max_deviation(times: array, values: array, start: int, end: int) -> Tuple[int, float]:
+    """返回`(start, end)`之间偏离两端点连线最远的关键帧下标及其偏离值, 偏离值以数值方向的距离计算"""
+    t0, v0 = times[start], values[start]
+    dt = times[end] - t0
+    slope = (values[end] - v0) / dt if dt != 0 else 0.0
+    best_index, best_dist = start, -1.0
+    for i in range(start + 1, end):
+        dist = abs(values[i] - (v0 + (times[i] - t0) * slope))
+        if dist > best_dist:
+            best_index, best_dist = i, dist
+    return best_index, best_dist
+
+def _max_deviation_numpy(times: Any, values: Any, start: int, end: int) -> Tuple[int, float]:
+    """`_max_deviation`的NumPy向量化版本, `times`与`values`为NumPy数组"""
+    t0, v0 = times[start], values[start]
+    dt = times[end] - t0
+    slope = (values[end] - v0) / dt if dt != 0 else 0.0
+    dist = abs(values[start+1:end] - (v0 + (times[start+1:end] - t0) * slope))
+    offset = int(dist.argmax())
+    return start + 1 + offset, float(dist[offset])
+
+def simplify_polyline(times: array, values: array, tolerance: float) -> List[int]:
+    """使用Ramer-Douglas-Peucker算法简化按时间排列的折线, 返回应保留的点的下标(升序)
+
+    被删除的点与保留点之间线性插值的偏差均不超过`tolerance`. 若安装了NumPy则使用其向量化计算.
+    """
+    n = len(times)
+    if n <= 2:
+        return list(range(n))
+
+    deviation: Callable[[Any, Any, int, int], Tuple[int, float]] = _max_deviation
+    try:
+        import numpy as np
+        times, values = np.asarray(times, dtype=np.float64), np.asarray(values, dtype=np.float64)
+        deviation = _max_deviation_numpy
+    except ImportError:
+        pass
+
+    keep = [False] * n
+    keep[0] = keep[n-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        index, dist = deviation(times, values, start, end)
+        if dist > tolerance:
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return [i for i in range(n) if keep[i]]
+
 class KeyframeList:
-    """关键帧列表, 记录与某个特定属性相关的一系列关键帧"""
+    """关键帧列表, 记录与某个特定属性相关的一系列关键帧
+
+    关键帧的时间及数值以`array`列的形式按时间顺序存储, 关键帧id及JSON对象仅在导出时才生成.
+    """
 
     list_id: str
     """关键帧列表全局id, 自动生成"""
     keyframe_property: KeyframeProperty
     """关键帧对应的属性"""
-    keyframes: List[Keyframe]
-    """关键帧列表"""
+
+    _times: array
+    """各关键帧的时间偏移量, 升序排列"""
+    _values: array
+    """各关键帧的值"""
+    _ids: List[Optional[str]]
+    """各关键帧的id, 尚未导出过的关键帧为None"""
 
     def __init__(self, keyframe_property: KeyframeProperty):
         """为给定的关键帧属性初始化关键帧列表"""
-        self.list_id = uuid.uuid4().hex
+        self.list_id = new_id()
 
         self.keyframe_property = keyframe_property
-        self.keyframes = []
+        self._times = array("q")
+        self._values = array("d")
+        self._ids = []
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    @property
+    def times(self) -> array:
+        """各关键帧的时间偏移量(`array('q')`), 升序排列, 请勿直接修改"""
+        return self._times
+
+    @property
+    def values(self) -> array:
+        """各关键帧的值(`array('d')`), 与`times`一一对应, 请勿直接修改"""
+        return self._values
+
+    @property
+    def keyframes(self) -> MutableSequence[Keyframe]:
+        """按时间排序的关键帧, 以兼容列表的视图形式提供
+
+        通过视图进行的增删及赋值会直接作用于本列表, 且关键帧总是按时间保持有序(`append`及`insert`均按时间插入).
+        取出的`Keyframe`对象是每次重新构造的, 修改其属性不影响本列表, 须将其重新赋值到相应位置.
+        批量添加时`add_keyframes`要快得多.
+        """
+        return _KeyframeView(self)
+
+    @keyframes.setter
+    def keyframes(self, keyframes: Iterable[Keyframe]) -> None:
+        """以给定的关键帧替换全部关键帧, 关键帧按时间稳定排序"""
+        ordered = sorted(keyframes, key=lambda kf: kf.time_offset)
+        self._times = _to_array("q", [kf.time_offset for kf in ordered])
+        self._values = array("d", [kf.values[0] for kf in ordered])
+        self._ids = [kf.kf_id for kf in ordered]
+
+    def add_keyframe(self, time_offset: Union[int, float], value: float):
+        """给定时间偏移量及关键值, 向此关键帧列表中添加一个关键帧
+
+        时间偏移量相同的关键帧按添加顺序排列, 浮点数的时间偏移量按四舍五入取整
+        """
+        self._insert(time_offset, value, None)
+
+    def _insert(self, time_offset: Union[int, float], value: float, kf_id: Optional[str]) -> None:
+        """按时间插入一个关键帧, 位于时间偏移量相同的已有关键帧之后"""
+        time_offset = int(round(time_offset))
+        index = bisect.bisect_right(self._times, time_offset)
+        self._times.insert(index, time_offset)
+        self._values.insert(index, value)
+        self._ids.insert(index, kf_id)
+
+    def add_keyframes(self, times: ArrayLike, values: ArrayLike):
+        """批量添加关键帧, 比逐个调用`add_keyframe`快得多
 
-    def add_keyframe(self, time_offset: int, value: float):
-        """给定时间偏移量及关键值, 向此关键帧列表中添加一个关键帧"""
-        keyframe = Keyframe(time_offset, value)
-        self.keyframes.append(keyframe)
-        self.keyframes.sort(key=lambda x: x.time_offset)
+        Args:
+            times (`ArrayLike`): 各关键帧的时间偏移量, 单位为微秒, 可以是列表或NumPy数组, 无需有序
+            values (`ArrayLike`): 各关键帧的值, 长度须与`times`一致
+
+        Raises:
+            `ValueError`: `times`与`values`长度不一致
+        """
+        new_times = _to_array("q", times)
+        new_values = _to_array("d", values)
+        if len(new_times) != len(new_values):
+            raise ValueError(f"关键帧时间与数值的数量不一致: {len(new_times)} != {len(new_values)}")
+        if len(new_times) == 0:
+            return
+
+        in_order = all(new_times[i] <= new_times[i+1] for i in range(len(new_times) - 1))
+        if in_order and (len(self._times) == 0 or new_times[0] >= self._times[-1]):
+            # 常见情况: 按时间顺序追加
+            self._times.extend(new_times)
+            self._values.extend(new_values)
+            self._ids.extend([None] * len(new_times))
+            return
+
+        # 稳定排序, 时间相同时已有的关键帧在前, 新关键帧按给定顺序排列
+        all_times = self._times + new_times
+        all_values = self._values + new_values
+        all_ids = self._ids + [None] * len(new_times)
+        order = sorted(range(len(all_times)), key=all_times.__getitem__)
+        self._times = array("q", [all_times[i] for i in order])
+        self._values = array("d", [all_values[i] for i in order])
+        self._ids = [all_ids[i] for i in order]
+
+    def simplify(self, tolerance: float) -> float:
+        """删除可由相邻关键帧线性插值近似的关键帧, 适用于由逐帧数据生成的关键帧
+
+        使用Ramer-Douglas-Peucker算法, 保证属性值曲线与简化前的偏差不超过`tolerance`. 首尾关键帧总是保留.
+
+        Args:
+            tolerance (`float`): 允许的最大偏差, 单位与关键帧的值相同, 如位置属性以半个画布宽/高为单位
+
+        Returns:
+            `float`: 压缩比, 即简化前与简化后的关键帧数之比, 空列表返回1.0
+
+        Raises:
+            `ValueError`: `tolerance`为负数
+        """
+        if tolerance < 0:
+            raise ValueError("tolerance 不能为负数")
+        original_count = len(self._times)
+        if original_count == 0:
+            return 1.0
+
+        kept = simplify_polyline(self._times, self._values, tolerance)
+        if len(kept) < original_count:
+            self._times = array("q", [self._times[i] for i in kept])
+            self._values = array("d", [self._values[i] for i in kept])
+            self._ids = [self._ids[i] for i in kept]
+        return original_count / len(kept)
+
+    def evaluate(self, times: ArrayLike) -> Any:
+        """以线性插值计算属性在一系列时间点上的值, 需要安装NumPy
+
+        早于第一个关键帧或晚于最后一个关键帧的时间点取相应端点的值.
+
+        Args:
+            times (`ArrayLike`): 相对于片段起始点的时间偏移量, 单位为微秒
+
+        Returns:
+            `numpy.ndarray`: 与`times`形状相同的`float64`数组
+
+        Raises:
+            `ImportError`: 未安装NumPy
+            `ValueError`: 关键帧列表为空
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("关键帧求值需要NumPy, 请使用 pip install numpy 安装")
+        if len(self._times) == 0:
+            raise ValueError("关键帧列表为空, 无法求值")
+
+        return np.interp(np.asarray(times, dtype=np.float64),
+                         np.frombuffer(self._times, dtype=np.int64).astype(np.float64),
+                         np.frombuffer(self._values, dtype=np.float64))
+
+    def _assign_ids(self) -> None:
+        """为尚无id的关键帧生成id, 已有的id保持不变"""
+        ids = self._ids
+        for i, kf_id in enumerate(ids):
+            if kf_id is None:
+                ids[i] = new_id()
 
     def export_json(self) -> Dict[str, Any]:
+        self._assign_ids()
         return {
             "id": self.list_id,
-            "keyframe_list": [kf.export_json() for kf in self.keyframes],
+            "keyframe_list": [_export_keyframe(kf_id, time_offset, [value])
+                              for kf_id, time_offset, value in zip(self._ids, self._times, self._values)],
             "material_id": "",
             "property_type": self.keyframe_property.value
         }
+
+class _KeyframeView(MutableSequence):
+    """`KeyframeList.keyframes`返回的视图, 将列表操作转换为对关键帧列表的修改"""
+
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner: KeyframeList):
+        self._owner = owner
+
+    def __len__(self) -> int:
+        return len(self._owner)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        owner = self._owner
+        owner._assign_ids()
+        return Keyframe(owner._times[index], owner._values[index], owner._ids[index])
+
+    def __setitem__(self, index: Union[int, slice], value: Any) -> None:
+        keyframes = list(self)
+        keyframes[index] = value
+        self._owner.keyframes = keyframes
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        owner = self._owner
+        del owner._times[index]
+        del owner._values[index]
+        del owner._ids[index]
+
+    def insert(self, index: int, value: Keyframe) -> None:
+        """按`value`的时间插入关键帧, 而忽略`index`, 以保持关键帧有序"""
+        self._owner._insert(value.time_offset, value.values[0], value.kf_id)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
@@ -2,11 +2,125 @@ import os
 import uuid
 import pymediainfo
 
-from typing import Optional, Literal
-from typing import Dict, Any
+from contextlib import nullcontext
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional, Literal, Union
+from typing import Dict, List, Tuple, Iterable, Any
 
-class CropSettings:
-    """素材的裁剪设置, 各属性均在0-1之间, 注意素材的坐标原点在左上角"""
+from .probe_cache import ProbeCache, ProbeResult
+
+_probe_cache: Optional[ProbeCache] = None
+"""全局的素材探测缓存, 为None时不使用缓存"""
+
+def set_probe_cache(cache: Optional[ProbeCache]) -> None:
+    """设置构造`VideoMaterial`及`AudioMaterial`时使用的素材探测缓存, 传入None以禁用缓存"""
+    global _probe_cache
+    _probe_cache = cache
+
+def get_probe_cache() -> Optional[ProbeCache]:
+    """返回当前设置的素材探测缓存, 未设置时返回None"""
+    return _probe_cache
+
+def _probe_video(path: str) -> ProbeResult:
+    """使用mediainfo探测视频(或图片)素材的类型、时长及尺寸"""
+    postfix = os.path.splitext(path)[1]
+    if not pymediainfo.MediaInfo.can_parse():
+        raise ValueError(f"不支持的视频素材类型 '{postfix}'")
+
+    info: pymediainfo.MediaInfo = \
+        pymediainfo.MediaInfo.parse(path, mediainfo_options={"File_TestContinuousFileNames": "0"})  # type: ignore
+    # 有视频轨道的视为视频素材
+    if len(info.video_tracks):
+        return ProbeResult("video", int(info.video_tracks[0].duration * 1e3),  # type: ignore
+                           info.video_tracks[0].width, info.video_tracks[0].height)  # type: ignore
+    # gif文件使用imageio库获取长度
+    elif postfix.lower() == ".gif":
+        import imageio
+        gif = imageio.get_reader(path)
+        duration = int(round(gif.get_meta_data()['duration'] * gif.get_length() * 1e3))
+        gif.close()
+        return ProbeResult("video", duration, info.image_tracks[0].width, info.image_tracks[0].height)  # type: ignore
+    elif len(info.image_tracks):
+        return ProbeResult("photo", 10800000000,  # 相当于3h
+                           info.image_tracks[0].width, info.image_tracks[0].height)  # type: ignore
+    else:
+        raise ValueError(f"输入的素材文件 {path} 没有视频轨道或图片轨道")
+
+def _probe_audio(path: str) -> ProbeResult:
+    """使用mediainfo探测音频素材的时长"""
+    if not pymediainfo.MediaInfo.can_parse():
+        raise ValueError("不支持的音频素材类型 %s" % os.path.splitext(path)[1])
+    info: pymediainfo.MediaInfo = pymediainfo.MediaInfo.parse(path)  # type: ignore
+    if len(info.video_tracks):
+        raise ValueError("音频素材不应包含视频轨道")
+    if not len(info.audio_tracks):
+        raise ValueError(f"给定的素材文件 {path} 没有音频轨道")
+    return ProbeResult("audio", int(info.audio_tracks[0].duration * 1e3), 0, 0)  # type: ignore
+
+def probe_media(path: str, kind: Literal["video", "audio"]) -> ProbeResult:
+    """探测素材信息, 若设置了素材探测缓存则优先从缓存中读取
+
+    Args:
+        path (`str`): 素材文件的绝对路径
+        kind (`video` or `audio`): 按视频素材还是音频素材进行探测
+
+    Raises:
+        `ValueError`: 不支持的素材文件类型.
+    """
+    cache = _probe_cache
+    file_key = None
+    if cache is not None:
+        cached, file_key = cache.lookup(path, kind)
+        if cached is not None:
+            return cached
+
+    result = _probe_video(path) if kind == "video" else _probe_audio(path)
+    if cache is not None:
+        cache.put(path, kind, result, file_key=file_key)
+    return result
+
+class _FrozenValue:
+    """构造完成后不可修改的值对象, 可被多个片段安全地共享
+
+    子类通过`__slots__`声明字段, 在构造函数中以`_init_fields`赋值, 需要修改时以`_replace`得到新的副本.
+    """
+
+    __slots__ = ()
+
+    def _init_fields(self, **fields: Any) -> None:
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def _replace(self, **changes: Any) -> Any:
+        """返回一个修改了指定字段的副本, 原对象不变"""
+        new_obj = object.__new__(type(self))
+        new_obj._init_fields(**{name: getattr(self, name) for name in type(self).__slots__})
+        new_obj._init_fields(**changes)
+        return new_obj
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} 对象不可修改, 请构造新的实例")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} 对象不可修改, 请构造新的实例")
+
+    def __copy__(self) -> Any:
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Any:
+        return self
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in type(self).__slots__}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._init_fields(**state)
+
+class CropSettings(_FrozenValue):
+    """素材的裁剪设置, 各属性均在0-1之间, 注意素材的坐标原点在左上角. 构造后不可修改"""
+
+    __slots__ = ("upper_left_x", "upper_left_y", "upper_right_x", "upper_right_y",
+                 "lower_left_x", "lower_left_y", "lower_right_x", "lower_right_y")
 
     upper_left_x: float
     upper_left_y: float
@@ -22,14 +136,10 @@ class CropSettings:
                  lower_left_x: float = 0.0, lower_left_y: float = 1.0,
                  lower_right_x: float = 1.0, lower_right_y: float = 1.0):
         """初始化裁剪设置, 默认参数表示不裁剪"""
-        self.upper_left_x = upper_left_x
-        self.upper_left_y = upper_left_y
-        self.upper_right_x = upper_right_x
-        self.upper_right_y = upper_right_y
-        self.lower_left_x = lower_left_x
-        self.lower_left_y = lower_left_y
-        self.lower_right_x = lower_right_x
-        self.lower_right_y = lower_right_y
+        self._init_fields(upper_left_x=upper_left_x, upper_left_y=upper_left_y,
+                          upper_right_x=upper_right_x, upper_right_y=upper_right_y,
+                          lower_left_x=lower_left_x, lower_left_y=lower_left_y,
+                          lower_right_x=lower_right_x, lower_right_y=lower_right_y)
 
     def export_json(self) -> Dict[str, Any]:
         return {
@@ -43,8 +153,14 @@ class CropSettings:
             "lower_right_y": self.lower_right_y
         }
 
-class VideoMaterial:
-    """本地视频素材（视频或图片）, 一份素材可以在多个片段中使用"""
+class VideoMaterial(_FrozenValue):
+    """本地视频素材（视频或图片）, 一份素材可以在多个片段中使用
+
+    素材构造后不可修改, 故各片段直接共享同一实例. 需要不同的裁剪设置时使用`with_crop`获得新的素材.
+    """
+
+    __slots__ = ("material_id", "local_material_id", "material_name", "path",
+                 "duration", "height", "width", "crop_settings", "material_type")
 
     material_id: str
     """素材全局id, 自动生成"""
@@ -78,41 +194,25 @@ class VideoMaterial:
             `ValueError`: 不支持的素材文件类型.
         """
         path = os.path.abspath(path)
-        postfix = os.path.splitext(path)[1]
         if not os.path.exists(path):
             raise FileNotFoundError(f"找不到 {path}")
 
-        self.material_name = material_name if material_name else os.path.basename(path)
-        self.material_id = uuid.uuid3(uuid.NAMESPACE_DNS, self.material_name).hex
-        self.path = path
-        self.crop_settings = crop_settings
-        self.local_material_id = ""
-
-        if not pymediainfo.MediaInfo.can_parse():
-            raise ValueError(f"不支持的视频素材类型 '{postfix}'")
-
-        info: pymediainfo.MediaInfo = \
-            pymediainfo.MediaInfo.parse(path, mediainfo_options={"File_TestContinuousFileNames": "0"})  # type: ignore
-        # 有视频轨道的视为视频素材
-        if len(info.video_tracks):
-            self.material_type = "video"
-            self.duration = int(info.video_tracks[0].duration * 1e3)  # type: ignore
-            self.width, self.height = info.video_tracks[0].width, info.video_tracks[0].height  # type: ignore
-        # gif文件使用imageio库获取长度
-        elif postfix.lower() == ".gif":
-            import imageio
-            gif = imageio.get_reader(path)
-
-            self.material_type = "video"
-            self.duration = int(round(gif.get_meta_data()['duration'] * gif.get_length() * 1e3))
-            self.width, self.height = info.image_tracks[0].width, info.image_tracks[0].height  # type: ignore
-            gif.close()
-        elif len(info.image_tracks):
-            self.material_type = "photo"
-            self.duration = 10800000000  # 相当于3h
-            self.width, self.height = info.image_tracks[0].width, info.image_tracks[0].height  # type: ignore
-        else:
-            raise ValueError(f"输入的素材文件 {path} 没有视频轨道或图片轨道")
+        material_name = material_name if material_name else os.path.basename(path)
+        probe = probe_media(path, "video")
+        self._init_fields(material_name=material_name,
+                          material_id=uuid.uuid3(uuid.NAMESPACE_DNS, material_name).hex,
+                          path=path, crop_settings=crop_settings, local_material_id="",
+                          material_type=probe.material_type, duration=probe.duration,
+                          width=probe.width, height=probe.height)
+
+    def with_crop(self, crop_settings: CropSettings) -> "VideoMaterial":
+        """返回使用给定裁剪设置的素材副本, 原素材不受影响
+
+        由于剪映以素材id区分素材, 副本会获得一个由素材名称及裁剪设置决定的新id.
+        """
+        crop_key = ",".join(str(getattr(crop_settings, name)) for name in CropSettings.__slots__)
+        material_id = uuid.uuid3(uuid.NAMESPACE_DNS, f"{self.material_name}|{crop_key}").hex
+        return self._replace(crop_settings=crop_settings, material_id=material_id)
 
     def export_json(self) -> Dict[str, Any]:
         video_material_json = {
@@ -136,8 +236,10 @@ class VideoMaterial:
         }
         return video_material_json
 
-class AudioMaterial:
-    """本地音频素材"""
+class AudioMaterial(_FrozenValue):
+    """本地音频素材, 构造后不可修改, 各片段直接共享同一实例"""
+
+    __slots__ = ("material_id", "material_name", "path", "duration")
 
     material_id: str
     """素材全局id, 自动生成"""
@@ -164,18 +266,10 @@ class AudioMaterial:
         if not os.path.exists(path):
             raise FileNotFoundError(f"找不到 {path}")
 
-        self.material_name = material_name if material_name else os.path.basename(path)
-        self.material_id = uuid.uuid3(uuid.NAMESPACE_DNS, self.material_name).hex
-        self.path = path
-
-        if not pymediainfo.MediaInfo.can_parse():
-            raise ValueError("不支持的音频素材类型 %s" % os.path.splitext(path)[1])
-        info: pymediainfo.MediaInfo = pymediainfo.MediaInfo.parse(path)  # type: ignore
-        if len(info.video_tracks):
-            raise ValueError("音频素材不应包含视频轨道")
-        if not len(info.audio_tracks):
-            raise ValueError(f"给定的素材文件 {path} 没有音频轨道")
-        self.duration = int(info.audio_tracks[0].duration * 1e3)  # type: ignore
+        material_name = material_name if material_name else os.path.basename(path)
+        self._init_fields(material_name=material_name,
+                          material_id=uuid.uuid3(uuid.NAMESPACE_DNS, material_name).hex,
+                          path=path, duration=probe_media(path, "audio").duration)
 
     def export_json(self) -> Dict[str, Any]:
         return {
@@ -196,3 +290,58 @@ class AudioMaterial:
             "type": "extract_music",
             "wave_points": []
         }
+
+def _load_material(path: str, kind: Literal["video", "audio"]) -> Union[VideoMaterial, AudioMaterial]:
+    return VideoMaterial(path) if kind == "video" else AudioMaterial(path)
+
+def probe_materials(paths: Iterable[str],
+                    kind: Union[Literal["video", "audio"], Iterable[Literal["video", "audio"]]] = "video", *,
+                    workers: Optional[int] = None, executor: Optional[Executor] = None) \
+        -> Tuple[List[Optional[Union[VideoMaterial, AudioMaterial]]], Dict[str, Exception]]:
+    """并发地从一系列文件构造素材对象, 单个文件的错误不会中断整批探测
+
+    libmediainfo的全局选项不是线程安全的, 故此处使用进程池而非线程池. 当前设置的素材探测缓存会被传递给各工作进程.
+    重复的(路径, 类型)只探测一次, 其各个位置对应同一个素材对象. 只有一个文件或`workers`为1时直接在当前进程中探测.
+    在Windows下调用时请将调用代码置于`if __name__ == "__main__":`保护之下.
+
+    Args:
+        paths (`Iterable[str]`): 素材文件路径
+        kind (`video` or `audio`, optional): 构造`VideoMaterial`还是`AudioMaterial`, 默认为`video`.
+            也可以给出与`paths`等长的类型序列, 从而在同一批中混合探测视频及音频素材.
+        workers (`int`, optional): 工作进程数, 默认为CPU核数.
+        executor (`Executor`, optional): 复用已有的进程池, 此时忽略`workers`且不会关闭该进程池.
+            其工作进程不会自动设置素材探测缓存, 可以`set_probe_cache`为初始化函数创建进程池.
+
+    Returns:
+        `List[Optional[VideoMaterial | AudioMaterial]]`: 与输入顺序一致的素材列表, 失败的文件对应位置为None
+        `Dict[str, Exception]`: 各失败文件的路径及相应异常, 重复的路径只记录一次
+
+    Raises:
+        `ValueError`: 给出的类型序列与`paths`长度不一致
+    """
+    path_list = list(paths)
+    kinds: List[Literal["video", "audio"]] = [kind] * len(path_list) if isinstance(kind, str) else list(kind)
+    if len(kinds) != len(path_list):
+        raise ValueError("类型序列的长度 (%d) 与路径数 (%d) 不一致" % (len(kinds), len(path_list)))
+    items = list(zip(path_list, kinds))
+    unique_items = list(dict.fromkeys(items))
+    loaded: Dict[Tuple[str, str], Union[VideoMaterial, AudioMaterial]] = {}
+    errors: Dict[str, Exception] = {}
+
+    if executor is None and (len(unique_items) <= 1 or workers == 1):
+        for item in unique_items:
+            try:
+                loaded[item] = _load_material(*item)
+            except Exception as e:
+                errors.setdefault(item[0], e)
+    elif len(unique_items) > 0:
+        with (nullcontext(executor) if executor is not None else
+              ProcessPoolExecutor(workers, initializer=set_probe_cache, initargs=(_probe_cache,))) as pool:
+            futures = [(item, pool.submit(_load_material, *item)) for item in unique_items]
+            for item, future in futures:
+                try:
+                    loaded[item] = future.result()
+                except Exception as e:
+                    errors.setdefault(item[0], e)
+
+    return [loaded.get(item) for item in items], errors
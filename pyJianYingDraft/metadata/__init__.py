@@ -1,15 +1,56 @@
-"""记录各种特效/音效/滤镜等的元数据"""
+"""记录各种特效/音效/滤镜等的元数据
 
-from .effect_meta import EffectMeta, EffectParamInstance
+各元数据枚举类体量较大, 故在首次访问时才导入相应模块(PEP 562), 以缩短`import pyJianYingDraft`的耗时
+"""
+
+import importlib
 
-from .font_meta import FontType
+from typing import Any, List, TYPE_CHECKING
+
+from .effect_meta import EffectMeta, EffectParamInstance
 from .mask_meta import MaskType, MaskMeta
-from .filter_meta import FilterType
-from .transition_meta import TransitionType
-from .animation_meta import IntroType, OutroType, GroupAnimationType
-from .animation_meta import TextIntro, TextOutro, TextLoopAnim
-from .audio_effect_meta import AudioSceneEffectType, ToneEffectType, SpeechToSongType
-from .video_effect_meta import VideoSceneEffectType, VideoCharacterEffectType
+
+if TYPE_CHECKING:
+    from .font_meta import FontType
+    from .filter_meta import FilterType
+    from .transition_meta import TransitionType
+    from .animation_meta import IntroType, OutroType, GroupAnimationType
+    from .animation_meta import TextIntro, TextOutro, TextLoopAnim
+    from .audio_effect_meta import AudioSceneEffectType, ToneEffectType, SpeechToSongType
+    from .video_effect_meta import VideoSceneEffectType, VideoCharacterEffectType
+    from .catalog import MetadataCatalog, CatalogEntry, get_catalog
+
+_LAZY_ATTRS = {
+    "FontType": "font_meta",
+    "FilterType": "filter_meta",
+    "TransitionType": "transition_meta",
+    "IntroType": "animation_meta",
+    "OutroType": "animation_meta",
+    "GroupAnimationType": "animation_meta",
+    "TextIntro": "animation_meta",
+    "TextOutro": "animation_meta",
+    "TextLoopAnim": "animation_meta",
+    "AudioSceneEffectType": "audio_effect_meta",
+    "ToneEffectType": "audio_effect_meta",
+    "SpeechToSongType": "audio_effect_meta",
+    "VideoSceneEffectType": "video_effect_meta",
+    "VideoCharacterEffectType": "video_effect_meta",
+    "MetadataCatalog": "catalog",
+    "CatalogEntry": "catalog",
+    "get_catalog": "catalog",
+}
+"""延迟加载的属性及其所在的子模块"""
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module("." + module_name, __name__), name)
+    globals()[name] = value  # 此后的访问不再经过__getattr__
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
 
 __all__ = [
     "EffectMeta",
@@ -29,5 +70,8 @@ __all__ = [
     "ToneEffectType",
     "SpeechToSongType",
     "VideoSceneEffectType",
-    "VideoCharacterEffectType"
+    "VideoCharacterEffectType",
+    "MetadataCatalog",
+    "CatalogEntry",
+    "get_catalog"
 ]
@@ -0,0 +1,247 @@
+"""元数据目录: 将各元数据枚举编译为带索引的SQLite数据文件
+
+各枚举类仍以Python源码(`*_meta.py`)为准, 本模块将其内容编译为`catalog.sqlite3`,
+并在名称、resource_id及effect_id上建立索引, 使得按这些字段查询时无需导入或实例化任何枚举类.
+查询结果仅在访问`CatalogEntry.member`时才加载对应的枚举类.
+
+运行`python -m pyJianYingDraft.metadata.catalog`以重新生成数据文件. 数据文件缺失或与源码不一致时,
+`MetadataCatalog`会发出警告并在内存中重建目录. 随包分发的数据文件在安装后其源文件的修改时间会改变, 故运行时不作校验,
+其与源码的一致性由测试保证.
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import pathlib
+import importlib
+import warnings
+import threading
+
+from functools import lru_cache
+from typing import Optional, NamedTuple, Iterator
+from typing import List, Dict, Tuple, Any, TYPE_CHECKING
+
+from .effect_meta import normalize_name
+
+if TYPE_CHECKING:
+    from .effect_meta import EffectEnum
+
+METADATA_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(METADATA_DIR, "catalog.sqlite3")
+"""随包分发的目录数据文件路径"""
+
+ENUM_NAMES = ["FontType", "MaskType", "FilterType", "TransitionType",
+              "IntroType", "OutroType", "GroupAnimationType", "TextIntro", "TextOutro", "TextLoopAnim",
+              "AudioSceneEffectType", "ToneEffectType", "SpeechToSongType",
+              "VideoSceneEffectType", "VideoCharacterEffectType"]
+"""编入目录的元数据枚举类"""
+
+_COMMON_FIELDS = {"name", "title", "is_vip", "resource_id", "effect_id", "md5"}
+
+def _source_files() -> List[str]:
+    """各元数据源文件的名称, 源文件不可用(如仅以字节码分发)时为空"""
+    try:
+        return sorted(file_name for file_name in os.listdir(METADATA_DIR) if file_name.endswith("_meta.py"))
+    except OSError:
+        return []
+
+def source_stats() -> str:
+    """各元数据源文件的名称、大小及修改时间, 用于快速判断数据文件是否过期"""
+    stats: List[Tuple[str, int, int]] = []
+    for file_name in _source_files():
+        stat = os.stat(os.path.join(METADATA_DIR, file_name))
+        stats.append((file_name, stat.st_size, stat.st_mtime_ns))
+    return json.dumps(stats)
+
+@lru_cache(maxsize=None)
+def _source_digest(stats: str) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    for file_name in _source_files():
+        hasher.update(file_name.encode("utf-8"))
+        with open(os.path.join(METADATA_DIR, file_name), "rb") as f:
+            hasher.update(f.read())
+    return hasher.hexdigest()
+
+def source_digest() -> str:
+    """各元数据源文件内容的哈希值, 用于判断数据文件是否过期
+
+    需要读取全部源文件, 结果按源文件的大小及修改时间在进程内缓存
+    """
+    return _source_digest(source_stats())
+
+class CatalogEntry(NamedTuple):
+    """目录中的一条记录, 对应某个元数据枚举的一个成员"""
+
+    enum_name: str
+    """所属枚举类的名称, 如`VideoSceneEffectType`"""
+    member_name: str
+    """枚举成员名"""
+    name: str
+    """效果名称"""
+    is_vip: bool
+    """是否为VIP特权"""
+    resource_id: str
+    """资源ID"""
+    effect_id: str
+    """效果ID"""
+    md5: str
+    extra: Dict[str, Any]
+    """元数据的其余字段, 如特效参数(`params`)、默认时长等"""
+
+    @property
+    def member(self) -> "EffectEnum":
+        """对应的枚举成员, 首次访问时加载其所属的枚举类"""
+        metadata = importlib.import_module(__package__)
+        return getattr(metadata, self.enum_name)[self.member_name]
+
+def _iter_rows() -> Iterator[Tuple[Any, ...]]:
+    """从各枚举类中提取目录记录"""
+    metadata = importlib.import_module(__package__)
+    for enum_name in ENUM_NAMES:
+        for member_name, member in getattr(metadata, enum_name).__members__.items():
+            meta = member.value
+            name: str = meta.title if hasattr(meta, "title") else meta.name
+            extra: Dict[str, Any] = {key: value for key, value in vars(meta).items() if key not in _COMMON_FIELDS}
+            if "params" in extra:
+                extra["params"] = [[param.name, param.default_value, param.min_value, param.max_value]
+                                   for param in extra["params"]]
+            yield (enum_name, member_name, normalize_name(member_name), name, int(getattr(meta, "is_vip", False)),
+                   meta.resource_id, meta.effect_id, meta.md5, json.dumps(extra, ensure_ascii=False, separators=(",", ":")))
+
+def _create_schema(conn: sqlite3.Connection, digest: str) -> None:
+    conn.execute("CREATE TABLE info (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    conn.execute("""CREATE TABLE entries (
+        enum_name TEXT NOT NULL,
+        member_name TEXT NOT NULL,
+        norm_name TEXT NOT NULL,
+        name TEXT NOT NULL,
+        is_vip INTEGER NOT NULL,
+        resource_id TEXT NOT NULL,
+        effect_id TEXT NOT NULL,
+        md5 TEXT NOT NULL,
+        extra TEXT NOT NULL,
+        PRIMARY KEY (enum_name, member_name))""")
+    conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", _iter_rows())
+    conn.execute("CREATE INDEX entries_norm_name ON entries (norm_name, enum_name)")
+    conn.execute("CREATE INDEX entries_resource_id ON entries (resource_id)")
+    conn.execute("CREATE INDEX entries_effect_id ON entries (effect_id)")
+    conn.execute("INSERT INTO info VALUES ('source_digest', ?)", (digest,))
+    conn.execute("INSERT INTO info VALUES ('source_stats', ?)", (source_stats(),))
+
+def build_catalog(path: str = DEFAULT_PATH) -> str:
+    """从各元数据枚举类生成目录数据文件, 返回其路径
+
+    Args:
+        path (`str`, optional): 输出路径, 默认为随包分发的`catalog.sqlite3`. 已存在的文件将被覆盖.
+    """
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        with conn:
+            _create_schema(conn, source_digest())
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+    return path
+
+class MetadataCatalog:
+    """元数据目录, 支持按名称、resource_id及effect_id进行索引查询
+
+    查询均不会加载枚举类, 仅在访问结果的`member`属性时才加载对应的枚举类.
+    """
+
+    path: Optional[str]
+    """所使用的数据文件路径, 若目录是在内存中重建的则为None"""
+
+    def __init__(self, path: str = DEFAULT_PATH, *, check_source: Optional[bool] = None):
+        """打开目录数据文件
+
+        Args:
+            path (`str`, optional): 数据文件路径, 默认为随包分发的`catalog.sqlite3`.
+            check_source (`bool`, optional): 是否校验数据文件与元数据源码一致, 不一致时发出警告并在内存中重建目录.
+                源文件的大小及修改时间与生成数据文件时相同时直接视为一致, 否则比较源文件内容的哈希值;
+                源文件不可用时信任数据文件. 默认仅校验自行生成的数据文件, 而信任随包分发的数据文件.
+        """
+        if check_source is None:
+            check_source = os.path.abspath(path) != DEFAULT_PATH
+        self._lock = threading.Lock()
+        self.path = None
+        self._conn: sqlite3.Connection
+
+        if os.path.exists(path):
+            conn = sqlite3.connect(pathlib.Path(os.path.abspath(path)).as_uri() + "?mode=ro", uri=True, check_same_thread=False)
+            if not check_source or self._is_current(conn):
+                self._conn = conn
+                self.path = path
+                return
+            conn.close()
+            warnings.warn("元数据目录 %s 与元数据源码不一致, 已在内存中重建, "
+                          "请运行 python -m pyJianYingDraft.metadata.catalog 重新生成" % path)
+        else:
+            warnings.warn("元数据目录 %s 不存在, 已在内存中重建" % path)
+
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        with self._conn:
+            _create_schema(self._conn, source_digest())
+
+    @staticmethod
+    def _is_current(conn: sqlite3.Connection) -> bool:
+        """数据文件是否与元数据源码一致"""
+        info = dict(conn.execute("SELECT key, value FROM info").fetchall())
+        stats = source_stats()
+        if stats == "[]" or info.get("source_stats") == stats:
+            return True
+        return info.get("source_digest") == _source_digest(stats)
+
+    def _query(self, where: str, args: Tuple[Any, ...], enum_name: Optional[str]) -> List[CatalogEntry]:
+        sql = "SELECT enum_name, member_name, name, is_vip, resource_id, effect_id, md5, extra FROM entries WHERE " + where
+        if enum_name is not None:
+            sql += " AND enum_name = ?"
+            args = args + (enum_name,)
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [CatalogEntry(row[0], row[1], row[2], bool(row[3]), row[4], row[5], row[6], json.loads(row[7]))
+                for row in rows]
+
+    def by_name(self, name: str, enum_name: Optional[str] = None) -> List[CatalogEntry]:
+        """按名称查询, 规则与`EffectEnum.from_name`相同
+
+        Args:
+            name (`str`): 效果名称, 忽略大小写、空格和下划线
+            enum_name (`str`, optional): 仅在给定的枚举类(如`"FilterType"`)中查询
+        """
+        return self._query("norm_name = ?", (normalize_name(name),), enum_name)
+
+    def by_resource_id(self, resource_id: str, enum_name: Optional[str] = None) -> List[CatalogEntry]:
+        """按resource_id查询, 不同枚举类中可能存在相同的resource_id"""
+        return self._query("resource_id = ?", (resource_id,), enum_name)
+
+    def by_effect_id(self, effect_id: str, enum_name: Optional[str] = None) -> List[CatalogEntry]:
+        """按effect_id查询, 不同枚举类中可能存在相同的effect_id"""
+        return self._query("effect_id = ?", (effect_id,), enum_name)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self._conn.close()
+
+_default_catalog: Optional[MetadataCatalog] = None
+_default_lock = threading.Lock()
+
+def get_catalog() -> MetadataCatalog:
+    """获取全局共享的元数据目录, 首次调用时打开"""
+    global _default_catalog
+    with _default_lock:
+        if _default_catalog is None:
+            _default_catalog = MetadataCatalog()
+        return _default_catalog
+
+if __name__ == "__main__":
+    print("已生成 %s" % build_catalog())
@@ -1,11 +1,13 @@
 from enum import Enum
 
-from typing import List, Dict, Any
+from typing import List, Dict, Set, Tuple, Any
 from typing import TypeVar, Optional
 
 class EffectParam:
     """特效参数信息"""
 
+    __slots__ = ("name", "default_value", "min_value", "max_value")
+
     name: str
     """参数名称"""
     default_value: float
@@ -24,6 +26,8 @@ class EffectParam:
 class EffectParamInstance(EffectParam):
     """特效参数实例"""
 
+    __slots__ = ("index", "value")
+
     index: int
     """参数索引"""
     value: float
@@ -89,8 +93,79 @@ class EffectMeta:
 
 EffectEnumSubclass = TypeVar("EffectEnumSubclass", bound="EffectEnum")
 
+def normalize_name(name: str) -> str:
+    """规范化特效名称: 忽略大小写、空格和下划线"""
+    return name.lower().replace(" ", "").replace("_", "")
+
+def _trigrams(normalized_name: str) -> Set[str]:
+    """名称(首尾补齐空格后)的所有三元组"""
+    padded = "  " + normalized_name + " "
+    return {padded[i:i+3] for i in range(len(padded) - 2)}
+
+class _EnumIndex:
+    """某个特效枚举类的查询索引, 在首次查询时构建"""
+
+    __slots__ = ("members", "by_name", "by_resource_id", "by_effect_id", "_names", "_trigrams", "_postings")
+
+    def __init__(self, enum_cls: "type[EffectEnum]"):
+        self.members: List[EffectEnum] = list(enum_cls)
+        self.by_name: Dict[str, EffectEnum] = {}
+        self.by_resource_id: Dict[str, EffectEnum] = {}
+        self.by_effect_id: Dict[str, EffectEnum] = {}
+        for member in self.members:  # 重复时保留先定义的成员, 与线性查找的行为一致
+            self.by_name.setdefault(normalize_name(member.name), member)
+            self.by_resource_id.setdefault(member.value.resource_id, member)
+            self.by_effect_id.setdefault(member.value.effect_id, member)
+
+        self._names: Optional[List[str]] = None
+        self._trigrams: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+
+    def _build_trigrams(self) -> None:
+        self._names = [normalize_name(member.name) for member in self.members]
+        for i, name in enumerate(self._names):
+            grams = _trigrams(name)
+            self._trigrams.append(grams)
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(i)
+
+    def search(self, query: str, limit: int) -> List["EffectEnum"]:
+        if self._names is None:
+            self._build_trigrams()
+        assert self._names is not None
+
+        query = normalize_name(query)
+        query_grams = _trigrams(query)
+        shared: Dict[int, int] = {}
+        for gram in query_grams:
+            for i in self._postings.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+
+        scores: List[Tuple[float, int]] = []
+        for i, count in shared.items():
+            score = count / (len(query_grams) + len(self._trigrams[i]) - count)  # 三元组集合的Jaccard相似度
+            if self._names[i].startswith(query):
+                score += 1.0
+            elif query in self._names[i]:
+                score += 0.5
+            scores.append((-score, i))
+        scores.sort()
+        return [self.members[i] for _, i in scores[:limit]]
+
+_enum_indexes: Dict[type, _EnumIndex] = {}
+
 class EffectEnum(Enum):
-    """特效枚举基类, 提供一个`from_name`方法用于根据名称获取特效元数据"""
+    """特效枚举基类, 提供按名称、resource_id及effect_id获取特效元数据的方法
+
+    查询所用的索引在首次查询时为每个枚举类构建一次.
+    """
+
+    @classmethod
+    def _index(cls) -> _EnumIndex:
+        index = _enum_indexes.get(cls)
+        if index is None:
+            index = _enum_indexes[cls] = _EnumIndex(cls)
+        return index
 
     @classmethod
     def from_name(cls: "type[EffectEnumSubclass]", name: str) -> EffectEnumSubclass:
@@ -100,10 +175,51 @@ class EffectEnum(Enum):
             name (str): 特效名称
 
         Raises:
-            `ValueError`: 特效名称不存在
+            `ValueError`: 特效名称不存在, 错误信息中会给出名称相近的特效
+        """
+        index = cls._index()
+        effect = index.by_name.get(normalize_name(name))
+        if effect is not None:
+            return effect  # type: ignore
+
+        message = f"Effect named '{normalize_name(name)}' not found"
+        suggestions = index.search(name, 3)
+        if suggestions:
+            message += ", did you mean: %s?" % ", ".join(effect.name for effect in suggestions)
+        raise ValueError(message)
+
+    @classmethod
+    def from_resource_id(cls: "type[EffectEnumSubclass]", resource_id: str) -> EffectEnumSubclass:
+        """根据resource_id获取特效元数据
+
+        Raises:
+            `ValueError`: resource_id不存在
+        """
+        effect = cls._index().by_resource_id.get(resource_id)
+        if effect is None:
+            raise ValueError(f"Effect with resource_id '{resource_id}' not found")
+        return effect  # type: ignore
+
+    @classmethod
+    def from_effect_id(cls: "type[EffectEnumSubclass]", effect_id: str) -> EffectEnumSubclass:
+        """根据effect_id获取特效元数据
+
+        Raises:
+            `ValueError`: effect_id不存在
+        """
+        effect = cls._index().by_effect_id.get(effect_id)
+        if effect is None:
+            raise ValueError(f"Effect with effect_id '{effect_id}' not found")
+        return effect  # type: ignore
+
+    @classmethod
+    def search(cls: "type[EffectEnumSubclass]", query: str, limit: int = 5) -> List[EffectEnumSubclass]:
+        """模糊查找名称与给定字符串相近的特效, 按相似度从高到低排列
+
+        相似度以名称的三元组(trigram)计算, 以查询串为前缀或包含查询串的名称优先. 名称同样忽略大小写、空格和下划线.
+
+        Args:
+            query (`str`): 查询字符串
+            limit (`int`, optional): 最多返回的结果数, 默认为5
         """
-        name = name.lower().replace(" ", "").replace("_", "")
-        for effect in cls:
-            if effect.name.lower().replace(" ", "").replace("_", "") == name:
-                return effect
-        raise ValueError(f"Effect named '{name}' not found")
+        return cls._index().search(query, limit)  # type: ignore
@@ -0,0 +1,174 @@
+"""素材探测结果的持久化缓存, 避免对同一素材文件反复调用mediainfo"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional, Literal, Tuple, Iterator
+from typing import Dict, Any
+
+FileKey = Tuple[int, int, str]
+"""缓存中标识文件版本的键: 文件大小、修改时间(纳秒)及内容哈希(未启用时为空串)"""
+
+@dataclass
+class ProbeResult:
+    """一次素材探测的结果"""
+
+    material_type: Literal["video", "photo", "audio"]
+    """素材类型"""
+    duration: int
+    """素材时长, 单位为微秒"""
+    width: int
+    """素材宽度, 音频素材为0"""
+    height: int
+    """素材高度, 音频素材为0"""
+
+class ProbeCache:
+    """以SQLite文件保存的素材探测缓存
+
+    缓存以素材的绝对路径、文件大小及修改时间(以及可选的内容哈希)为键, 文件发生变化时对应条目自动失效.
+    条目数超过上限时按最近访问时间淘汰.
+    """
+
+    db_path: str
+    """缓存数据库路径"""
+    max_entries: int
+    """最多保存的条目数"""
+    use_content_hash: bool
+    """是否额外校验文件内容的哈希值"""
+
+    DB_NAME = "probe_cache.sqlite3"
+
+    def __init__(self, cache_dir: str, *, max_entries: int = 100000, use_content_hash: bool = False):
+        """在给定文件夹下打开(或创建)素材探测缓存
+
+        Args:
+            cache_dir (`str`): 缓存文件夹, 不存在时自动创建
+            max_entries (`int`, optional): 最多保存的条目数, 超出时淘汰最久未访问的条目. 默认为100000.
+            use_content_hash (`bool`, optional): 是否额外以文件内容的哈希值校验缓存, 更可靠但需要读取整个文件. 默认为否.
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries 必须为正数")
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, self.DB_NAME)
+        self.max_entries = max_entries
+        self.use_content_hash = use_content_hash
+        self._lock = threading.Lock()
+
+        with self._transaction() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS probes (
+                path TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                material_type TEXT NOT NULL,
+                duration INTEGER NOT NULL,
+                width INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (path, kind))""")
+            conn.execute("CREATE INDEX IF NOT EXISTS probes_last_access ON probes (last_access)")
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # 锁不能被序列化, 以便将缓存传递给子进程
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """打开一个数据库连接并在一个事务中使用, 结束后自动提交并关闭"""
+        with self._lock:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+
+    def _file_key(self, path: str) -> FileKey:
+        """返回文件的大小、修改时间及(可选的)内容哈希"""
+        stat = os.stat(path)
+        content_hash = ""
+        if self.use_content_hash:
+            hasher = hashlib.blake2b(digest_size=16)
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    hasher.update(chunk)
+            content_hash = hasher.hexdigest()
+        return stat.st_size, stat.st_mtime_ns, content_hash
+
+    def get(self, path: str, kind: Literal["video", "audio"]) -> Optional[ProbeResult]:
+        """查询缓存, 文件不存在、未缓存或已发生变化时返回None
+
+        Args:
+            path (`str`): 素材文件路径
+            kind (`video` or `audio`): 按视频素材还是音频素材进行探测
+        """
+        return self.lookup(path, kind)[0]
+
+    def lookup(self, path: str, kind: Literal["video", "audio"]) -> Tuple[Optional[ProbeResult], Optional[FileKey]]:
+        """与`get`相同, 但同时返回计算出的文件键(文件不存在时为None)
+
+        未命中时可将文件键传给`put`, 以免再次计算(启用内容哈希时需要读取整个文件)
+        """
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            return None, None
+        file_key = self._file_key(path)
+        return self._query(path, kind, file_key), file_key
+
+    def _query(self, path: str, kind: Literal["video", "audio"], file_key: FileKey) -> Optional[ProbeResult]:
+        size, mtime_ns, content_hash = file_key
+
+        with self._transaction() as conn:
+            row = conn.execute("SELECT size, mtime_ns, content_hash, material_type, duration, width, height "
+                               "FROM probes WHERE path = ? AND kind = ?", (path, kind)).fetchone()
+            if row is None:
+                return None
+            if tuple(row[:3]) != (size, mtime_ns, content_hash):  # 文件已变化, 条目失效
+                conn.execute("DELETE FROM probes WHERE path = ? AND kind = ?", (path, kind))
+                return None
+            conn.execute("UPDATE probes SET last_access = ? WHERE path = ? AND kind = ?", (time.time(), path, kind))
+        return ProbeResult(row[3], row[4], row[5], row[6])
+
+    def put(self, path: str, kind: Literal["video", "audio"], result: ProbeResult, *,
+            file_key: Optional[FileKey] = None) -> None:
+        """写入一条探测结果, 必要时淘汰最久未访问的条目
+
+        Args:
+            file_key (`FileKey`, optional): 由`lookup`返回的文件键, 未提供时重新计算.
+        """
+        path = os.path.abspath(path)
+        size, mtime_ns, content_hash = file_key if file_key is not None else self._file_key(path)
+
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (path, kind, size, mtime_ns, content_hash,
+                          result.material_type, result.duration, result.width, result.height, time.time()))
+            count: int = conn.execute("SELECT COUNT(*) FROM probes").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute("DELETE FROM probes WHERE rowid IN "
+                             "(SELECT rowid FROM probes ORDER BY last_access LIMIT ?)", (count - self.max_entries,))
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """使给定文件的缓存条目失效, 不指定路径时清空整个缓存"""
+        with self._transaction() as conn:
+            if path is None:
+                conn.execute("DELETE FROM probes")
+            else:
+                conn.execute("DELETE FROM probes WHERE path = ?", (os.path.abspath(path),))
+
+    def __len__(self) -> int:
+        with self._transaction() as conn:
+            return conn.execute("SELECT COUNT(*) FROM probes").fetchone()[0]
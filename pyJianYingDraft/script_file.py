@@ -2,73 +2,114 @@ import os
 import json
 import math
 from copy import deepcopy
+from functools import lru_cache
+from contextlib import contextmanager, nullcontext
 
-from typing import Optional, Literal, Union, overload
-from typing import Type, Dict, List, Any
+from typing import Optional, Literal, Union, overload, TYPE_CHECKING
+from typing import Type, Dict, List, Tuple, Any, Iterable, Iterator
 
 from . import util
 from . import assets
+from . import json_backend
 from . import exceptions
+from .id_provider import IdProvider, use_id_provider
 from .template_mode import ImportedTrack, EditableTrack, ImportedMediaTrack, ImportedTextTrack, ShrinkMode, ExtendMode, import_track
 from .time_util import Timerange, tim, srt_tstamp
-from .local_materials import VideoMaterial, AudioMaterial
+from .local_materials import VideoMaterial, AudioMaterial, probe_materials
 from .segment import BaseSegment, Speed, ClipSettings
 from .audio_segment import AudioSegment, AudioFade, AudioEffect
 from .video_segment import VideoSegment, StickerSegment, SegmentAnimations, VideoEffect, Transition, Filter, BackgroundFilling
 from .effect_segment import EffectSegment, FilterSegment
 from .text_segment import TextSegment, TextStyle, TextBubble
-from .track import TrackType, BaseTrack, Track
+from .track import TrackType, BaseTrack, Track, format_overlaps
 
-from .metadata import VideoSceneEffectType, VideoCharacterEffectType, FilterType
+if TYPE_CHECKING:
+    from .metadata import VideoSceneEffectType, VideoCharacterEffectType, FilterType
 
-class ScriptMaterial:
-    """草稿文件中的素材信息部分"""
+@lru_cache(maxsize=None)
+def _default_content() -> Dict[str, Any]:
+    """解析默认草稿模板, 每个进程只解析一次. **返回值被共享, 使用前须复制**"""
+    return json_backend.load_file(assets.get_asset_path('DRAFT_CONTENT_TEMPLATE'))
+
+_MEDIA_NAME_KEYS = {"videos": "material_name", "audios": "name"}
+"""导入的音视频素材中作为素材名称的字段"""
 
-    audios: List[AudioMaterial]
-    """音频素材列表"""
-    videos: List[VideoMaterial]
-    """视频素材列表"""
-    stickers: List[Dict[str, Any]]
-    """贴纸素材列表"""
-    texts: List[Dict[str, Any]]
-    """文本素材列表"""
-
-    audio_effects: List[AudioEffect]
-    """音频特效列表"""
-    audio_fades: List[AudioFade]
-    """音频淡入淡出效果列表"""
-    animations: List[SegmentAnimations]
-    """动画素材列表"""
-    video_effects: List[VideoEffect]
-    """视频特效列表"""
-
-    speeds: List[Speed]
-    """变速列表"""
-    masks: List[Dict[str, Any]]
-    """蒙版列表"""
-    transitions: List[Transition]
-    """转场效果列表"""
-    filters: List[Union[Filter, TextBubble]]
-    """滤镜/文本花字/文本气泡列表, 导出到`effects`中"""
-    canvases: List[BackgroundFilling]
-    """背景填充列表"""
+class ScriptMaterial:
+    """草稿文件中的素材信息部分
+
+    各类素材均以其id为键保存在按插入顺序排列的字典中, 从而能以O(1)的代价去重及查找
+    """
+
+    audios: Dict[str, AudioMaterial]
+    """音频素材, 以`material_id`为键"""
+    videos: Dict[str, VideoMaterial]
+    """视频素材, 以`material_id`为键"""
+    stickers: Dict[str, Dict[str, Any]]
+    """贴纸素材, 以`id`为键"""
+    texts: Dict[str, Dict[str, Any]]
+    """文本素材, 以`id`为键"""
+
+    audio_effects: Dict[str, AudioEffect]
+    """音频特效, 以`effect_id`为键"""
+    audio_fades: Dict[str, AudioFade]
+    """音频淡入淡出效果, 以`fade_id`为键"""
+    animations: Dict[str, SegmentAnimations]
+    """动画素材, 以`animation_id`为键"""
+    video_effects: Dict[str, VideoEffect]
+    """视频特效, 以`global_id`为键"""
+
+    speeds: Dict[str, Speed]
+    """变速, 以`global_id`为键"""
+    masks: Dict[str, Dict[str, Any]]
+    """蒙版, 以`id`为键"""
+    transitions: Dict[str, Transition]
+    """转场效果, 以`global_id`为键"""
+    filters: Dict[str, Union[Filter, TextBubble]]
+    """滤镜/文本花字/文本气泡, 以`global_id`为键, 导出到`effects`中"""
+    canvases: Dict[str, BackgroundFilling]
+    """背景填充, 以`global_id`为键"""
+
+    _REGISTRY_OF_TYPE: Dict[type, Tuple[str, str]] = {
+        VideoMaterial: ("videos", "material_id"),
+        AudioMaterial: ("audios", "material_id"),
+        AudioFade: ("audio_fades", "fade_id"),
+        AudioEffect: ("audio_effects", "effect_id"),
+        SegmentAnimations: ("animations", "animation_id"),
+        VideoEffect: ("video_effects", "global_id"),
+        Speed: ("speeds", "global_id"),
+        Transition: ("transitions", "global_id"),
+        Filter: ("filters", "global_id"),
+        TextBubble: ("filters", "global_id"),
+        BackgroundFilling: ("canvases", "global_id"),
+    }
+    """各素材类型对应的素材字典名称及id属性名"""
+    _RAW_CATEGORIES = ("stickers", "texts", "masks")
+    """以json形式保存的素材类别"""
 
     def __init__(self):
-        self.audios = []
-        self.videos = []
-        self.stickers = []
-        self.texts = []
-
-        self.audio_effects = []
-        self.audio_fades = []
-        self.animations = []
-        self.video_effects = []
-
-        self.speeds = []
-        self.masks = []
-        self.transitions = []
-        self.filters = []
-        self.canvases = []
+        self.audios = {}
+        self.videos = {}
+        self.stickers = {}
+        self.texts = {}
+
+        self.audio_effects = {}
+        self.audio_fades = {}
+        self.animations = {}
+        self.video_effects = {}
+
+        self.speeds = {}
+        self.masks = {}
+        self.transitions = {}
+        self.filters = {}
+        self.canvases = {}
+
+    def _locate(self, item: Any) -> Tuple[Dict[str, Any], str]:
+        """返回素材所属的素材字典及其id"""
+        for cls in type(item).__mro__:
+            if cls in self._REGISTRY_OF_TYPE:
+                category, id_attr = self._REGISTRY_OF_TYPE[cls]
+                return getattr(self, category), getattr(item, id_attr)
+        raise TypeError("Invalid argument type '%s'" % type(item))
 
     @overload
     def __contains__(self, item: Union[VideoMaterial, AudioMaterial]) -> bool: ...
@@ -78,40 +119,57 @@ class ScriptMaterial:
     def __contains__(self, item: Union[SegmentAnimations, VideoEffect, Transition, Filter]) -> bool: ...
 
     def __contains__(self, item) -> bool:
-        if isinstance(item, VideoMaterial):
-            return item.material_id in [video.material_id for video in self.videos]
-        elif isinstance(item, AudioMaterial):
-            return item.material_id in [audio.material_id for audio in self.audios]
-        elif isinstance(item, AudioFade):
-            return item.fade_id in [fade.fade_id for fade in self.audio_fades]
-        elif isinstance(item, AudioEffect):
-            return item.effect_id in [effect.effect_id for effect in self.audio_effects]
-        elif isinstance(item, SegmentAnimations):
-            return item.animation_id in [ani.animation_id for ani in self.animations]
-        elif isinstance(item, VideoEffect):
-            return item.global_id in [effect.global_id for effect in self.video_effects]
-        elif isinstance(item, Transition):
-            return item.global_id in [transition.global_id for transition in self.transitions]
-        elif isinstance(item, Filter):
-            return item.global_id in [filter_.global_id for filter_ in self.filters]
-        else:
-            raise TypeError("Invalid argument type '%s'" % type(item))
+        registry, item_id = self._locate(item)
+        return item_id in registry
+
+    def add(self, item: Any) -> bool:
+        """添加一个素材对象, 已存在同id的素材时不做任何操作
+
+        Returns:
+            `bool`: 是否实际添加了素材
+
+        Raises:
+            `TypeError`: 不支持的素材类型
+        """
+        registry, item_id = self._locate(item)
+        if item_id in registry:
+            return False
+        registry[item_id] = item
+        return True
+
+    def add_raw(self, category: Literal["stickers", "texts", "masks"], json_data: Dict[str, Any]) -> bool:
+        """添加一个以json形式保存的素材, 已存在同id的素材时不做任何操作
+
+        Returns:
+            `bool`: 是否实际添加了素材
+        """
+        if category not in self._RAW_CATEGORIES:
+            raise ValueError("Invalid raw material category '%s'" % category)
+        registry: Dict[str, Dict[str, Any]] = getattr(self, category)
+        if json_data["id"] in registry:
+            return False
+        registry[json_data["id"]] = json_data
+        return True
+
+    def get(self, category: str, material_id: str) -> Optional[Any]:
+        """根据素材类别(如`videos`, `speeds`)及id获取素材, 不存在时返回None"""
+        return getattr(self, category).get(material_id)
 
     def export_json(self) -> Dict[str, List[Any]]:
         return {
             "ai_translates": [],
             "audio_balances": [],
-            "audio_effects": [effect.export_json() for effect in self.audio_effects],
-            "audio_fades": [fade.export_json() for fade in self.audio_fades],
+            "audio_effects": [effect.export_json() for effect in self.audio_effects.values()],
+            "audio_fades": [fade.export_json() for fade in self.audio_fades.values()],
             "audio_track_indexes": [],
-            "audios": [audio.export_json() for audio in self.audios],
+            "audios": [audio.export_json() for audio in self.audios.values()],
             "beats": [],
-            "canvases": [canvas.export_json() for canvas in self.canvases],
+            "canvases": [canvas.export_json() for canvas in self.canvases.values()],
             "chromas": [],
             "color_curves": [],
             "digital_humans": [],
             "drafts": [],
-            "effects": [_filter.export_json() for _filter in self.filters],
+            "effects": [_filter.export_json() for _filter in self.filters.values()],
             "flowers": [],
             "green_screens": [],
             "handwrites": [],
@@ -120,8 +178,8 @@ class ScriptMaterial:
             "log_color_wheels": [],
             "loudnesses": [],
             "manual_deformations": [],
-            "masks": self.masks,
-            "material_animations": [ani.export_json() for ani in self.animations],
+            "masks": list(self.masks.values()),
+            "material_animations": [ani.export_json() for ani in self.animations.values()],
             "material_colors": [],
             "multi_language_refs": [],
             "placeholders": [],
@@ -132,16 +190,16 @@ class ScriptMaterial:
             "smart_crops": [],
             "smart_relights": [],
             "sound_channel_mappings": [],
-            "speeds": [spd.export_json() for spd in self.speeds],
-            "stickers": self.stickers,
+            "speeds": [spd.export_json() for spd in self.speeds.values()],
+            "stickers": list(self.stickers.values()),
             "tail_leaders": [],
             "text_templates": [],
-            "texts": self.texts,
+            "texts": list(self.texts.values()),
             "time_marks": [],
-            "transitions": [transition.export_json() for transition in self.transitions],
-            "video_effects": [effect.export_json() for effect in self.video_effects],
+            "transitions": [transition.export_json() for transition in self.transitions.values()],
+            "video_effects": [effect.export_json() for effect in self.video_effects.values()],
             "video_trackings": [],
-            "videos": [video.export_json() for video in self.videos],
+            "videos": [video.export_json() for video in self.videos.values()],
             "vocal_beautifys": [],
             "vocal_separations": []
         }
@@ -170,17 +228,42 @@ class ScriptFile:
 
     imported_materials: Dict[str, List[Dict[str, Any]]]
     """导入的素材信息"""
+    _imported_index: Dict[str, Dict[str, Dict[str, Any]]]
+    """导入素材的索引, 按类别及id查找素材, 参见`get_imported_material`"""
+    _imported_index_state: Dict[str, Tuple[Any, int]]
+    """构建各类别id索引时的素材列表及其长度, 用于发现`imported_materials`被直接修改的情况"""
+    _imported_name_index: Dict[str, Dict[str, List[Dict[str, Any]]]]
+    """导入音视频素材的名称索引, 参见`get_imported_materials_by_name`"""
+    _imported_name_state: Dict[str, Tuple[Any, int]]
+    """构建各类别名称索引时的素材列表及其长度"""
     imported_tracks: List[ImportedTrack]
     """导入的轨道信息"""
 
-    def __init__(self, width: int, height: int, fps: int = 30):
+    id_provider: Optional[IdProvider]
+    """本草稿使用的id提供者, 为None时使用全局设置(默认为uuid4), 参见`id_scope`"""
+
+    incremental_export: bool
+    """是否缓存各轨道及素材的编码结果, 使得反复保存时只重新编码发生变化的部分, 默认为否
+
+    开启后输出不变, 但需要额外保存一份已编码的草稿内容, 适合在编辑过程中频繁保存的场景.
+    各片段及素材通过与上次导出的内容比较判断是否变化, 故原地修改(如为已添加的片段添加关键帧)同样会被反映在输出中.
+    """
+    _fragment_cache: util.JsonFragmentCache
+
+    def __init__(self, width: int, height: int, fps: int = 30, *, id_provider: Optional[IdProvider] = None):
         """**创建剪映草稿推荐使用`DraftFolder.create_draft()`而非此方法**
 
         Args:
             width (int): 视频宽度, 单位为像素
             height (int): 视频高度, 单位为像素
             fps (int, optional): 视频帧率. 默认为30.
+            id_provider (`IdProvider`, optional): 本草稿使用的id提供者, 如`CounterIdProvider(seed)`可使输出可复现. 默认使用全局设置.
         """
+        self._setup(width, height, fps, util.copy_json(_default_content()))
+        self.id_provider = id_provider
+
+    def _setup(self, width: int, height: int, fps: int, content: Dict[str, Any]) -> None:
+        """初始化各属性, 由构造函数及`load_template`共用"""
         self.save_path = None
 
         self.width = width
@@ -192,10 +275,29 @@ class ScriptFile:
         self.tracks = {}
 
         self.imported_materials = {}
+        self._imported_index = {}
+        self._imported_index_state = {}
+        self._imported_name_index = {}
+        self._imported_name_state = {}
         self.imported_tracks = []
+        self.id_provider = None
+        self.incremental_export = False
+        self._fragment_cache = util.JsonFragmentCache()
+
+        self.content = content
 
-        with open(assets.get_asset_path('DRAFT_CONTENT_TEMPLATE'), "r", encoding="utf-8") as f:
-            self.content = json.load(f)
+    @contextmanager
+    def id_scope(self) -> Iterator[None]:
+        """在`with`语句块内使用本草稿的id提供者构造对象
+
+        草稿自身创建的轨道及片段会自动使用其id提供者, 而用户自行构造的片段等对象须在此作用域内构造, 如:
+        ```
+        with script.id_scope():
+            script.add_segment(VideoSegment(material, trange("0s", "1s")))
+        ```
+        """
+        with (use_id_provider(self.id_provider) if self.id_provider is not None else nullcontext()):
+            yield
 
     @staticmethod
     def load_template(json_path: str) -> "ScriptFile":
@@ -207,33 +309,144 @@ class ScriptFile:
         Raises:
             `FileNotFoundError`: JSON文件不存在
         """
-        obj = ScriptFile(**util.provide_ctor_defaults(ScriptFile))
-        obj.save_path = json_path
         if not os.path.exists(json_path):
             raise FileNotFoundError("JSON文件 '%s' 不存在" % json_path)
-        with open(json_path, "r", encoding="utf-8") as f:
-            obj.content = json.load(f)
+
+        # 直接使用模板内容, 不加载默认草稿模板
+        obj = ScriptFile.__new__(ScriptFile)
+        obj._setup(0, 0, 30, json_backend.load_file(json_path))
+        obj.save_path = json_path
 
         util.assign_attr_with_json(obj, ["fps", "duration"], obj.content)
         util.assign_attr_with_json(obj, ["width", "height"], obj.content["canvas_config"])
 
-        obj.imported_materials = deepcopy(obj.content["materials"])
+        obj.imported_materials = dict(obj.content["materials"])  # 导出时会重建content["materials"], 无需深拷贝
+        for category in obj.imported_materials:
+            obj._index_imported(category)
+        for category in _MEDIA_NAME_KEYS:
+            obj._index_imported_names(category)
         obj.imported_tracks = [import_track(track_data) for track_data in obj.content["tracks"]]
 
         return obj
 
+    def _imported_list_state(self, category: str) -> Tuple[Any, int]:
+        """某一类别导入素材的列表及其长度"""
+        material_list = self.imported_materials.get(category)
+        return material_list, len(material_list) if isinstance(material_list, list) else 0
+
+    def _is_index_current(self, states: Dict[str, Tuple[Any, int]], category: str) -> bool:
+        """构建索引后相应的素材列表是否未被替换、增删"""
+        state = states.get(category)
+        if state is None:
+            return False
+        material_list, length = self._imported_list_state(category)
+        return state[0] is material_list and state[1] == length
+
+    def _index_imported(self, category: str) -> Dict[str, Dict[str, Any]]:
+        """(重新)构建某一类别导入素材的id索引, 同id的素材只索引第一个"""
+        index: Dict[str, Dict[str, Any]] = {}
+        material_list = self.imported_materials.get(category)
+        if isinstance(material_list, list):
+            for material in material_list:
+                if isinstance(material, dict) and "id" in material:
+                    index.setdefault(material["id"], material)
+        self._imported_index[category] = index
+        self._imported_index_state[category] = self._imported_list_state(category)
+        return index
+
+    def _append_imported(self, category: str, material: Dict[str, Any]) -> None:
+        """向导入的素材中追加一个素材, 并维护索引"""
+        id_index_current = self._is_index_current(self._imported_index_state, category)
+        name_index_current = self._is_index_current(self._imported_name_state, category)
+        self.imported_materials.setdefault(category, []).append(material)
+        if id_index_current:
+            self._imported_index[category].setdefault(material["id"], material)
+            self._imported_index_state[category] = self._imported_list_state(category)
+        if name_index_current:
+            name_key = _MEDIA_NAME_KEYS[category]
+            if name_key in material:
+                self._imported_name_index[category].setdefault(material[name_key], []).append(material)
+            self._imported_name_state[category] = self._imported_list_state(category)
+
+    def get_imported_material(self, category: str, material_id: str) -> Optional[Dict[str, Any]]:
+        """根据类别(如`texts`, `videos`)及id获取导入的素材, 不存在时返回None
+
+        索引在加载模板及导入轨道时维护. 若`imported_materials`中的列表被替换或增删了元素, 会在查找时重建相应类别的索引;
+        原地替换列表元素后须重新赋值该类别的列表.
+        """
+        if self._is_index_current(self._imported_index_state, category):
+            index = self._imported_index[category]
+        else:
+            index = self._index_imported(category)
+        material = index.get(material_id)
+        if material is not None and material.get("id") != material_id:  # id被原地修改
+            material = self._index_imported(category).get(material_id)
+        return material
+
+    def _index_imported_names(self, category: str) -> Dict[str, List[Dict[str, Any]]]:
+        """(重新)构建某一类别导入音视频素材的名称索引"""
+        name_key = _MEDIA_NAME_KEYS[category]
+        index: Dict[str, List[Dict[str, Any]]] = {}
+        for material in self.imported_materials.get(category, []):
+            if isinstance(material, dict) and name_key in material:
+                index.setdefault(material[name_key], []).append(material)
+        self._imported_name_index[category] = index
+        self._imported_name_state[category] = self._imported_list_state(category)
+        return index
+
+    def _reindex_imported_name(self, category: str, material: Dict[str, Any], old_name: str, new_name: str) -> None:
+        """在名称索引中将素材从旧名称移至新名称下"""
+        index = self._imported_name_index.get(category)
+        if index is None or old_name == new_name:
+            return
+        entries = index.get(old_name, [])
+        entries[:] = [mat for mat in entries if mat is not material]
+        if not entries:
+            index.pop(old_name, None)
+        index.setdefault(new_name, []).append(material)
+
+    def get_imported_materials_by_name(self, category: Literal["videos", "audios"], name: str) -> List[Dict[str, Any]]:
+        """根据类别及名称获取导入的音视频素材, 视频素材以`material_name`字段、音频素材以`name`字段为名称
+
+        索引在加载模板、导入轨道及替换素材时维护. 若`imported_materials`中的列表被替换或增删了元素, 或找到的素材名称不符,
+        会重建相应类别的索引; 直接修改素材名称后须重新赋值该类别的列表.
+        """
+        name_key = _MEDIA_NAME_KEYS[category]
+        if self._is_index_current(self._imported_name_state, category):
+            index = self._imported_name_index[category]
+        else:
+            index = self._index_imported_names(category)
+        found = index.get(name, [])
+        if any(mat.get(name_key) != name for mat in found):
+            found = self._index_imported_names(category).get(name, [])
+        return list(found)
+
     def add_material(self, material: Union[VideoMaterial, AudioMaterial]) -> "ScriptFile":
         """向草稿文件中添加一个素材"""
-        if material in self.materials:  # 素材已存在
-            return self
-        if isinstance(material, VideoMaterial):
-            self.materials.videos.append(material)
-        elif isinstance(material, AudioMaterial):
-            self.materials.audios.append(material)
-        else:
+        if not isinstance(material, (VideoMaterial, AudioMaterial)):
             raise TypeError("错误的素材类型: '%s'" % type(material))
+        self.materials.add(material)  # 素材已存在时不会重复添加
         return self
 
+    def add_materials_from(self, paths: Iterable[str], kind: Literal["video", "audio"] = "video", *,
+                           workers: Optional[int] = None) \
+            -> Tuple[List[Optional[Union[VideoMaterial, AudioMaterial]]], Dict[str, Exception]]:
+        """使用进程池并发地从一系列文件构造素材并添加到草稿中, 单个文件的错误不会中断整批处理
+
+        Args:
+            paths (`Iterable[str]`): 素材文件路径
+            kind (`video` or `audio`, optional): 素材类型, 默认为`video`.
+            workers (`int`, optional): 工作进程数, 默认为CPU核数.
+
+        Returns:
+            与`probe_materials`相同: 与输入顺序一致的素材列表(失败处为None), 以及各失败文件的异常
+        """
+        materials, errors = probe_materials(paths, kind, workers=workers)
+        for material in materials:
+            if material is not None:
+                self.add_material(material)
+        return materials, errors
+
     def add_track(self, track_type: TrackType, track_name: Optional[str] = None, *,
                   mute: bool = False,
                   relative_index: int = 0, absolute_index: Optional[int] = None) -> "ScriptFile":
@@ -266,7 +479,8 @@ class ScriptFile:
         if absolute_index is not None:
             render_index = absolute_index
 
-        self.tracks[track_name] = Track(track_type, track_name, render_index, mute)
+        with self.id_scope():
+            self.tracks[track_name] = Track(track_type, track_name, render_index, mute)
         return self
 
     def _get_track(self, segment_type: Type[BaseSegment], track_name: Optional[str]) -> Track:
@@ -301,61 +515,105 @@ class ScriptFile:
         target.add_segment(segment)
         self.duration = max(self.duration, segment.end)
 
-        # 自动添加相关素材
+        self._add_segment_materials(segment)
+        return self
+
+    def add_segments(self, segments: Iterable[Union[VideoSegment, StickerSegment, AudioSegment, TextSegment]],
+                     track_name: Optional[str] = None, *, presorted: bool = False) -> "ScriptFile":
+        """向轨道中批量添加片段, 效果等同于逐个调用`add_segment`, 但对大量片段快得多
+
+        每条轨道只解析一次, 并通过一次排序及扫描检查重叠. 若存在任何重叠, 则一次性报告全部重叠且不添加任何片段
+
+        Args:
+            segments (`Iterable[...]`): 要添加的片段, 可以属于不同类型
+            track_name (`str`, optional): 添加到的轨道名称. 当各片段类型的轨道均仅有一条时可省略.
+            presorted (`bool`, optional): 同一轨道上的新片段是否已按起始时间升序排列, 若是则跳过排序. 默认为否.
+
+        Raises:
+            `NameError`: 未找到指定名称的轨道, 或必须提供`track_name`参数时未提供
+            `TypeError`: 片段类型不匹配轨道类型
+            `SegmentOverlap`: 新片段之间或与已有片段之间存在重叠
+        """
+        # 按轨道分组, 每种片段类型只解析一次轨道
+        track_of_type: Dict[type, Track] = {}
+        grouped: Dict[str, List[BaseSegment]] = {}
+        segment_list = list(segments)
+        for segment in segment_list:
+            seg_type = type(segment)
+            if seg_type not in track_of_type:
+                track_of_type[seg_type] = self._get_track(seg_type, track_name)
+            grouped.setdefault(track_of_type[seg_type].name, []).append(segment)
+
+        # 先检查所有轨道, 全部通过后再写入
+        merged_results: Dict[str, List[BaseSegment]] = {}
+        errors: List[str] = []
+        for name, new_segments in grouped.items():
+            merged, conflicts = self.tracks[name].merge_segments(new_segments, presorted=presorted)
+            if conflicts:
+                errors.append(format_overlaps(name, conflicts))
+            merged_results[name] = merged
+        if errors:
+            raise exceptions.SegmentOverlap("; ".join(errors))
+
+        for name, merged in merged_results.items():
+            self.tracks[name].set_segments(merged)
+        for segment in segment_list:
+            self.duration = max(self.duration, segment.end)
+            self._add_segment_materials(segment)
+
+        return self
+
+    def _add_segment_materials(self, segment: BaseSegment) -> None:
+        """自动添加片段相关的素材"""
         if isinstance(segment, VideoSegment):
             # 出入场等动画
-            if (segment.animations_instance is not None) and (segment.animations_instance not in self.materials):
-                self.materials.animations.append(segment.animations_instance)
+            if segment.animations_instance is not None:
+                self.materials.add(segment.animations_instance)
             # 特效
             for effect in segment.effects:
-                if effect not in self.materials:
-                    self.materials.video_effects.append(effect)
+                self.materials.add(effect)
             # 滤镜
             for filter_ in segment.filters:
-                if filter_ not in self.materials:
-                    self.materials.filters.append(filter_)
+                self.materials.add(filter_)
             # 蒙版
             if segment.mask is not None:
-                self.materials.masks.append(segment.mask.export_json())
+                self.materials.add_raw("masks", segment.mask.export_json())
             # 转场
-            if (segment.transition is not None) and (segment.transition not in self.materials):
-                self.materials.transitions.append(segment.transition)
+            if segment.transition is not None:
+                self.materials.add(segment.transition)
             # 背景填充
             if segment.background_filling is not None:
-                self.materials.canvases.append(segment.background_filling)
+                self.materials.add(segment.background_filling)
 
-            self.materials.speeds.append(segment.speed)
+            self.materials.add(segment.speed)
         elif isinstance(segment, StickerSegment):
-            self.materials.stickers.append(segment.export_material())
+            self.materials.add_raw("stickers", segment.export_material())
         elif isinstance(segment, AudioSegment):
             # 淡入淡出
-            if (segment.fade is not None) and (segment.fade not in self.materials):
-                self.materials.audio_fades.append(segment.fade)
+            if segment.fade is not None:
+                self.materials.add(segment.fade)
             # 特效
             for effect in segment.effects:
-                if effect not in self.materials:
-                    self.materials.audio_effects.append(effect)
-            self.materials.speeds.append(segment.speed)
+                self.materials.add(effect)
+            self.materials.add(segment.speed)
         elif isinstance(segment, TextSegment):
             # 出入场等动画
-            if (segment.animations_instance is not None) and (segment.animations_instance not in self.materials):
-                self.materials.animations.append(segment.animations_instance)
+            if segment.animations_instance is not None:
+                self.materials.add(segment.animations_instance)
             # 气泡效果
             if segment.bubble is not None:
-                self.materials.filters.append(segment.bubble)
+                self.materials.add(segment.bubble)
             # 花字效果
             if segment.effect is not None:
-                self.materials.filters.append(segment.effect)
+                self.materials.add(segment.effect)
             # 字体样式
-            self.materials.texts.append(segment.export_material())
+            self.materials.add_raw("texts", segment.export_material())
 
         # 添加片段素材
         if isinstance(segment, (VideoSegment, AudioSegment)):
             self.add_material(segment.material_instance)
 
-        return self
-
-    def add_effect(self, effect: Union[VideoSceneEffectType, VideoCharacterEffectType],
+    def add_effect(self, effect: "Union[VideoSceneEffectType, VideoCharacterEffectType]",
                    t_range: Timerange, track_name: Optional[str] = None, *,
                    params: Optional[List[Optional[float]]] = None) -> "ScriptFile":
         """向指定的特效轨道中添加一个特效片段
@@ -375,16 +633,16 @@ class ScriptFile:
         target = self._get_track(EffectSegment, track_name)
 
         # 加入轨道并更新时长
-        segment = EffectSegment(effect, t_range, params)
+        with self.id_scope():
+            segment = EffectSegment(effect, t_range, params)
         target.add_segment(segment)
         self.duration = max(self.duration, t_range.start + t_range.duration)
 
         # 自动添加相关素材
-        if segment.effect_inst not in self.materials:
-            self.materials.video_effects.append(segment.effect_inst)
+        self.materials.add(segment.effect_inst)
         return self
 
-    def add_filter(self, filter_meta: FilterType, t_range: Timerange,
+    def add_filter(self, filter_meta: "FilterType", t_range: Timerange,
                    track_name: Optional[str] = None, intensity: float = 100.0) -> "ScriptFile":
         """向指定的滤镜轨道中添加一个滤镜片段
 
@@ -402,12 +660,13 @@ class ScriptFile:
         target = self._get_track(FilterSegment, track_name)
 
         # 加入轨道并更新时长
-        segment = FilterSegment(filter_meta, t_range, intensity / 100.0)  # 转换为0-1范围
+        with self.id_scope():
+            segment = FilterSegment(filter_meta, t_range, intensity / 100.0)  # 转换为0-1范围
         target.add_segment(segment)
         self.duration = max(self.duration, t_range.end)
 
         # 自动添加相关素材
-        self.materials.filters.append(segment.material)
+        self.materials.add(segment.material)
         return self
 
     def import_srt(self, srt_path: str, track_name: str, *,
@@ -442,12 +701,13 @@ class ScriptFile:
             lines = srt_file.readlines()
 
         def __add_text_segment(text: str, t_range: Timerange) -> None:
-            if style_reference:
-                seg = TextSegment.create_from_template(text, t_range, style_reference)
-                if clip_settings is not None:
-                    seg.clip_settings = deepcopy(clip_settings)
-            else:
-                seg = TextSegment(text, t_range, style=text_style, clip_settings=clip_settings)
+            with self.id_scope():
+                if style_reference:
+                    seg = TextSegment.create_from_template(text, t_range, style_reference)
+                    if clip_settings is not None:
+                        seg.clip_settings = deepcopy(clip_settings)
+                else:
+                    seg = TextSegment(text, t_range, style=text_style, clip_settings=clip_settings)
             self.add_segment(seg, track_name)
 
         index = 0
@@ -540,7 +800,7 @@ class ScriptFile:
             relative_index (`int`, optional): 相对索引，用于调整导入轨道的渲染层级. 默认保持原有层级.
         """
         # 直接拷贝原始轨道结构, 按需修改渲染层级
-        imported_track = deepcopy(track)
+        imported_track = track.copy()
         if relative_index is not None:
             imported_track.render_index = track.track_type.value.render_index + relative_index
         if new_name is not None:
@@ -570,9 +830,8 @@ class ScriptFile:
         for material_type, material_list in source_file.imported_materials.items():
             for material in material_list:
                 if material.get("id") in material_ids:
-                    if material_type not in self.imported_materials:
-                        self.imported_materials[material_type] = []
-                    self.imported_materials[material_type].append(deepcopy(material))
+                    material_copy = util.copy_json(material)
+                    self._append_imported(material_type, material_copy)
                     material_ids.remove(material.get("id"))
 
         assert len(material_ids) == 0, "未找到以下素材: %s" % material_ids
@@ -597,28 +856,88 @@ class ScriptFile:
             `MaterialNotFound`: 根据指定名称未找到与新素材同类的素材
             `AmbiguousMaterial`: 根据指定名称找到多个与新素材同类的素材
         """
-        video_mode = isinstance(material, VideoMaterial)
-        # 查找素材
-        target_json_obj: Optional[Dict[str, Any]] = None
-        target_material_list = self.imported_materials["videos" if video_mode else "audios"]
-        name_key = "material_name" if video_mode else "name"
-        for mat in target_material_list:
-            if mat[name_key] == material_name:
-                if target_json_obj is not None:
-                    raise exceptions.AmbiguousMaterial(
-                        "找到多个名为 '%s', 类型为 '%s' 的素材" % (material_name, type(material)))
-                target_json_obj = mat
-        if target_json_obj is None:
-            raise exceptions.MaterialNotFound("没有找到名为 '%s', 类型为 '%s' 的素材" % (material_name, type(material)))
-
-        # 更新素材信息
+        category = "videos" if isinstance(material, VideoMaterial) else "audios"
+        target = self._find_unique_by_name(category, material_name, type(material))
+        self._apply_material(category, target, material, replace_crop)
+        return self
+
+    def replace_materials_by_name(self, replacements: Dict[str, Union[str, VideoMaterial, AudioMaterial]], *,
+                                  replace_crop: bool = False, workers: Optional[int] = None) -> "ScriptFile":
+        """批量替换指定名称的素材, 效果与逐个调用`replace_material_by_name`相同
+
+        先检查所有名称, 再一次性并发探测以路径给出的新素材(规则同`probe_materials`), 全部成功后才统一修改草稿,
+        任一名称或文件有误时草稿保持不变. 所有名称均在替换前查找, 故不允许新素材的名称与另一个待替换的名称相同,
+        否则结果将取决于替换的顺序.
+
+        Args:
+            replacements (`Dict[str, str | VideoMaterial | AudioMaterial]`): 要替换的素材名称及相应的新素材,
+                新素材也可以是文件路径, 此时根据模板中同名素材的类型构造视频或音频素材
+            replace_crop (`bool`, optional): 是否替换原素材的裁剪设置, 默认为否. 仅对视频素材有效.
+            workers (`int`, optional): 探测新素材的工作进程数, 默认为CPU核数.
+
+        Raises:
+            `MaterialNotFound`: 根据某个名称未找到与新素材同类的素材
+            `AmbiguousMaterial`: 根据某个名称找到多个与新素材同类的素材, 或以路径给出新素材时视频和音频中均有同名素材
+            `ValueError`: 某个新素材的名称(以路径给出时为文件名)与另一个待替换的名称相同
+            其他异常: 探测新素材失败时, 抛出第一个失败文件的异常
+        """
+        # 检查名称
+        for material_name, material in replacements.items():
+            new_name = os.path.basename(material) if isinstance(material, str) else material.material_name
+            if new_name != material_name and new_name in replacements:
+                raise ValueError("素材 '%s' 的新名称 '%s' 与另一个待替换的名称相同, 请分多次替换" % (material_name, new_name))
+        targets: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        pending: Dict[str, Tuple[str, Literal["video", "audio"]]] = {}
+        for material_name, material in replacements.items():
+            if isinstance(material, str):
+                found = [(category, mat) for category in ("videos", "audios")
+                         for mat in self.get_imported_materials_by_name(category, material_name)]
+                if len(found) == 0:
+                    raise exceptions.MaterialNotFound("没有找到名为 '%s' 的音视频素材" % material_name)
+                if len(found) > 1:
+                    raise exceptions.AmbiguousMaterial("找到多个名为 '%s' 的音视频素材" % material_name)
+                targets[material_name] = found[0]
+                pending[material_name] = (material, "video" if found[0][0] == "videos" else "audio")
+            else:
+                category = "videos" if isinstance(material, VideoMaterial) else "audios"
+                targets[material_name] = (category, self._find_unique_by_name(category, material_name, type(material)))
+
+        # 探测新素材, 视频及音频在同一批中探测, 只有一个文件时不启动进程池
+        new_materials: Dict[str, Union[VideoMaterial, AudioMaterial]] = \
+            {name: material for name, material in replacements.items() if not isinstance(material, str)}
+        probed, errors = probe_materials([path for path, _ in pending.values()],
+                                         [kind for _, kind in pending.values()], workers=workers)
+        for (path, _), material in zip(pending.values(), probed):
+            if material is None:
+                raise errors[path]
+        for name, material in zip(pending, probed):
+            assert material is not None
+            new_materials[name] = material
+
+        # 统一修改
+        for material_name, (category, target) in targets.items():
+            self._apply_material(category, target, new_materials[material_name], replace_crop)
+        return self
+
+    def _find_unique_by_name(self, category: str, material_name: str, material_type: type) -> Dict[str, Any]:
+        found = self.get_imported_materials_by_name(category, material_name)  # type: ignore
+        if len(found) > 1:
+            raise exceptions.AmbiguousMaterial("找到多个名为 '%s', 类型为 '%s' 的素材" % (material_name, material_type))
+        if len(found) == 0:
+            raise exceptions.MaterialNotFound("没有找到名为 '%s', 类型为 '%s' 的素材" % (material_name, material_type))
+        return found[0]
+
+    def _apply_material(self, category: str, target_json_obj: Dict[str, Any],
+                        material: Union[VideoMaterial, AudioMaterial], replace_crop: bool) -> None:
+        """以新素材的信息更新导入的素材, 并维护名称索引"""
+        name_key = _MEDIA_NAME_KEYS[category]
+        old_name = target_json_obj[name_key]
         target_json_obj.update({name_key: material.material_name, "path": material.path, "duration": material.duration})
-        if video_mode:
+        if isinstance(material, VideoMaterial):
             target_json_obj.update({"width": material.width, "height": material.height, "material_type": material.material_type})
             if replace_crop:
                 target_json_obj.update({"crop": material.crop_settings.export_json()})
-
-        return self
+        self._reindex_imported_name(category, target_json_obj, old_name, material.material_name)
 
     def replace_material_by_seg(self, track: EditableTrack, segment_index: int, material: Union[VideoMaterial, AudioMaterial],
                                 source_timerange: Optional[Timerange] = None, *,
@@ -681,10 +1000,26 @@ class ScriptFile:
             `TypeError`: 轨道类型不正确
             `ValueError`: 文本模板片段的文本数量不匹配
         """
+        return self.replace_texts(track, {segment_index: text}, recalc_style)
+
+    def replace_texts(self, track: EditableTrack, texts: Dict[int, Union[str, List[str]]],
+                      recalc_style: bool = True) -> "ScriptFile":
+        """批量替换指定文本轨道上若干片段的文字内容, 效果等同于依次调用`replace_text`
+
+        每个文本素材的内容只被解析及编码一次, 且任一片段替换失败时不修改任何内容
+
+        Args:
+            track (`EditableTrack`): 要替换文字的文本轨道, 由`get_imported_track`获取
+            texts (`Dict[int, str | List[str]]`): 各片段下标(从0开始)及其新的文字内容, 对于文本模板而言应为字符串列表.
+            recalc_style (`bool`): 是否重新计算字体样式分布, 参见`replace_text`. 默认开启.
+
+        Raises:
+            `IndexError`: 片段下标越界
+            `TypeError`: 轨道类型不正确
+            `ValueError`: 文本模板片段的文本数量不匹配
+        """
         if not isinstance(track, ImportedTextTrack):
             raise TypeError("指定的轨道(类型为 %s)不支持文本内容替换" % track.track_type)
-        if not 0 <= segment_index < len(track):
-            raise IndexError("片段下标 %d 超出 [0, %d) 的范围" % (segment_index, len(track)))
 
         def __recalc_style_range(old_len: int, new_len: int, styles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             """调整字体样式分布"""
@@ -697,32 +1032,43 @@ class ScriptFile:
                     new_styles.append(style)
             return new_styles
 
-        replaced: bool = False
-        material_id: str = track.segments[segment_index].material_id
-        # 尝试在文本素材中替换
-        for mat in self.imported_materials["texts"]:
-            if mat["id"] != material_id:
+        # 各文本素材解析后的内容, 在全部替换成功后才编码写回; 无法解析的内容以新文字直接替换
+        decoded: Dict[str, Tuple[Dict[str, Any], Any]] = {}
+
+        def __set_text(mat: Dict[str, Any], new_text: str, fallback_raw: bool) -> None:
+            entry = decoded.get(mat["id"])
+            if entry is not None and isinstance(entry[1], str):
+                decoded[mat["id"]] = (mat, new_text)
+                return
+            try:
+                content = entry[1] if entry is not None else json_backend.loads(mat["content"])
+                if recalc_style:
+                    content["styles"] = __recalc_style_range(len(content["text"]), len(new_text), content["styles"])
+                content["text"] = new_text
+                decoded[mat["id"]] = (mat, content)
+            except (ValueError, TypeError):
+                if not fallback_raw:
+                    raise
+                decoded[mat["id"]] = (mat, new_text)
+
+        for segment_index, text in texts.items():
+            if not 0 <= segment_index < len(track):
+                raise IndexError("片段下标 %d 超出 [0, %d) 的范围" % (segment_index, len(track)))
+            material_id: str = track.segments[segment_index].material_id
+
+            # 尝试在文本素材中替换
+            mat = self.get_imported_material("texts", material_id)
+            if mat is not None:
+                if isinstance(text, list):
+                    if len(text) != 1:
+                        raise ValueError(f"正常文本片段只能有一个文字内容, 但替换内容是 {text}")
+                    text = text[0]
+                __set_text(mat, text, False)
                 continue
 
-            if isinstance(text, list):
-                if len(text) != 1:
-                    raise ValueError(f"正常文本片段只能有一个文字内容, 但替换内容是 {text}")
-                text = text[0]
-
-            content = json.loads(mat["content"])
-            if recalc_style:
-                content["styles"] = __recalc_style_range(len(content["text"]), len(text), content["styles"])
-            content["text"] = text
-            mat["content"] = json.dumps(content, ensure_ascii=False)
-            replaced = True
-            break
-        if replaced:
-            return self
-
-        # 尝试在文本模板中替换
-        for template in self.imported_materials["text_templates"]:
-            if template["id"] != material_id:
-                continue
+            # 尝试在文本模板中替换
+            template = self.get_imported_material("text_templates", material_id)
+            assert template is not None, f"未找到指定片段的素材 {material_id}"
 
             resources = template["text_info_resources"]
             if isinstance(text, str):
@@ -730,28 +1076,13 @@ class ScriptFile:
             if len(text) > len(resources):
                 raise ValueError(f"文字模板'{template['name']}'只有{len(resources)}段文本, 但提供了{len(text)}段替换内容")
 
-            for sub_material_id, new_text in zip(map(lambda x: x["text_material_id"], resources), text):
-                for mat in self.imported_materials["texts"]:
-                    if mat["id"] != sub_material_id:
-                        continue
-
-                    try:
-                        content = json.loads(mat["content"])
-                        if recalc_style:
-                            content["styles"] = __recalc_style_range(len(content["text"]), len(new_text), content["styles"])
-                        content["text"] = new_text
-                        mat["content"] = json.dumps(content, ensure_ascii=False)
-                    except json.JSONDecodeError:
-                        mat["content"] = new_text
-                    except TypeError:
-                        mat["content"] = new_text
-
-                    break
-            replaced = True
-            break
-
-        assert replaced, f"未找到指定片段的素材 {material_id}"
+            for resource, new_text in zip(resources, text):
+                sub_material = self.get_imported_material("texts", resource["text_material_id"])
+                if sub_material is not None:
+                    __set_text(sub_material, new_text, True)
 
+        for mat, content in decoded.values():
+            mat["content"] = content if isinstance(content, str) else json.dumps(content, ensure_ascii=False)
         return self
 
     def inspect_material(self) -> None:
@@ -771,8 +1102,8 @@ class ScriptFile:
             if effect["type"] == "text_effect":
                 print("\tResource id: %s '%s'" % (effect["resource_id"], effect.get("name", "")))
 
-    def dumps(self) -> str:
-        """将草稿文件内容导出为JSON字符串"""
+    def _iter_json_chunks(self, compact: bool) -> Iterator[str]:
+        """更新草稿内容并逐块生成JSON, 各轨道在写出时才逐个导出"""
         self.content["fps"] = self.fps
         self.content["duration"] = self.duration
         self.content["canvas_config"] = {"width": self.width, "height": self.height, "ratio": "original"}
@@ -785,24 +1116,89 @@ class ScriptFile:
             else:
                 self.content["materials"][material_type].extend(material_list)
 
-        # 对轨道排序并导出
+        # 对轨道排序, 导出推迟到写出时进行
         track_list: List[BaseTrack] = list(self.imported_tracks + list(self.tracks.values()))  # 新加入的轨道在列表末尾（上层）
         track_list.sort(key=lambda track: track.render_index)
-        self.content["tracks"] = [track.export_json() for track in track_list]
+        content = dict(self.content)
+        indent = None if compact else 4
+        if not self.incremental_export:
+            content["tracks"] = (self._export_track(track) for track in track_list)
+            return util.iter_json_chunks(content, indent=indent, expand_depth=3)
+
+        # 增量导出: 未变化的轨道及素材直接复用上次的编码结果
+        cache = self._fragment_cache
+        cache.begin()
+        materials: Dict[str, Any] = {}
+        for material_type, material_list in self.content["materials"].items():
+            if not isinstance(material_list, list):
+                materials[material_type] = material_list
+                continue
+            materials[material_type] = [
+                cache.encode(("material", compact, material_type, material.get("id", i) if isinstance(material, dict) else i),
+                             material, indent=indent, level=3, snapshot=True)  # 导入的素材可能被原地修改
+                for i, material in enumerate(material_list)]
+        content["materials"] = materials
+        content["tracks"] = (self._export_track_cached(track, compact) for track in track_list)
+        return util.iter_json_chunks(content, indent=indent, expand_depth=4)
+
+    def _export_track(self, track: BaseTrack) -> Dict[str, Any]:
+        # 关键帧的id在导出时才生成, 故导出同样需要在id作用域内进行
+        with self.id_scope():
+            return track.export_json()
+
+    def _export_track_cached(self, track: BaseTrack, compact: bool) -> Dict[str, Any]:
+        """导出轨道, 其中各片段替换为经过缓存的编码结果
+
+        片段导出的JSON可能引用片段内部的可变对象(如`extra_material_refs`), 故缓存中保存的是其副本
+        """
+        track_json = self._export_track(track)
+        segments = track_json.get("segments")
+        if isinstance(segments, list):
+            track_json["segments"] = [
+                self._fragment_cache.encode(("segment", compact, seg.get("id", i) if isinstance(seg, dict) else i),
+                                            seg, indent=None if compact else 4, level=4, snapshot=True)
+                for i, seg in enumerate(segments)]
+        return track_json
+
+    def dumps(self, compact: bool = False) -> str:
+        """将草稿文件内容导出为JSON字符串
+
+        Args:
+            compact (`bool`, optional): 是否以不含缩进及空白的紧凑格式导出, 剪映同样能够读取. 默认为否.
+        """
+        return "".join(self._iter_json_chunks(compact))
 
-        return json.dumps(self.content, ensure_ascii=False, indent=4)
+    def dump(self, file_path: str, compact: bool = False, *, backups: int = 0, skip_unchanged: bool = False) -> bool:
+        """将草稿文件内容逐块写入文件, 不在内存中构造完整的JSON字符串
 
-    def dump(self, file_path: str) -> None:
-        """将草稿文件内容写入文件"""
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(self.dumps())
+        写入是原子的: 内容先写入同一文件夹下的临时文件, 落盘后再替换目标文件, 故中途崩溃不会留下残缺的草稿
 
-    def save(self) -> None:
+        Args:
+            file_path (`str`): 写入的文件路径
+            compact (`bool`, optional): 是否以不含缩进及空白的紧凑格式写入, 剪映同样能够读取. 默认为否.
+            backups (`int`, optional): 保留的历史版本数, 依次存为`<file_path>.bak1`, `.bak2`等. 默认不保留.
+            skip_unchanged (`bool`, optional): 内容与已有文件相同时不替换文件, 使其修改时间保持不变, 避免剪映重新索引草稿.
+                内容的哈希值记录在`<file_path>.hash`中. 默认为否.
+
+        Returns:
+            `bool`: 是否实际写入了文件, 仅在`skip_unchanged`为真且内容未变化时为假
+        """
+        return util.atomic_write(file_path, self._iter_json_chunks(compact), backups=backups, skip_unchanged=skip_unchanged)
+
+    def save(self, compact: bool = False, *, backups: int = 0, skip_unchanged: bool = False) -> bool:
         """保存草稿文件至打开时的路径
 
+        Args:
+            compact (`bool`, optional): 是否以紧凑格式保存, 参见`dump`. 默认为否.
+            backups (`int`, optional): 保留的历史版本数, 参见`dump`. 默认不保留.
+            skip_unchanged (`bool`, optional): 内容未变化时跳过写入, 参见`dump`. 默认为否.
+
+        Returns:
+            `bool`: 是否实际写入了文件
+
         Raises:
             `ValueError`: 没有设置保存路径
         """
         if self.save_path is None:
             raise ValueError("没有设置保存路径, 可能不在模板模式下")
-        self.dump(self.save_path)
+        return self.dump(self.save_path, compact, backups=backups, skip_unchanged=skip_unchanged)
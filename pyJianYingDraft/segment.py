@@ -1,11 +1,11 @@
 """定义片段基类及部分比较通用的属性类"""
 
-import uuid
 from typing import Optional, Dict, List, Any, Union
 
+from .id_provider import new_id
 from .animation import SegmentAnimations
 from .time_util import Timerange, tim
-from .keyframe import KeyframeList, KeyframeProperty
+from .keyframe import KeyframeList, KeyframeProperty, ArrayLike
 
 class BaseSegment:
     """片段基类"""
@@ -21,7 +21,7 @@ class BaseSegment:
     """各属性的关键帧列表"""
 
     def __init__(self, material_id: str, target_timerange: Timerange):
-        self.segment_id = uuid.uuid4().hex
+        self.segment_id = new_id()
         self.material_id = material_id
         self.target_timerange = target_timerange
 
@@ -52,6 +52,50 @@ class BaseSegment:
         """判断是否与另一个片段有重叠"""
         return self.target_timerange.overlaps(other.target_timerange)
 
+    def _get_keyframe_list(self, _property: KeyframeProperty) -> KeyframeList:
+        """获取给定属性的关键帧列表, 不存在时创建之"""
+        for kf_list in self.common_keyframes:
+            if kf_list.keyframe_property == _property:
+                return kf_list
+        kf_list = KeyframeList(_property)
+        self.common_keyframes.append(kf_list)
+        return kf_list
+
+    def evaluate_keyframes(self, times: ArrayLike, *, absolute: bool = False) -> Dict[KeyframeProperty, Any]:
+        """一次性计算所有设置了关键帧的属性在一系列时间点上的值, 需要安装NumPy, 参见`KeyframeList.evaluate`
+
+        Args:
+            times (`ArrayLike`): 时间点, 单位为微秒
+            absolute (`bool`, optional): `times`是否为轨道上的绝对时间, 默认为否, 即相对于片段起始点的偏移量.
+
+        Returns:
+            `Dict[KeyframeProperty, numpy.ndarray]`: 各属性在给定时间点的值, 不包含未设置关键帧的属性.
+                注意`uniform_scale`的关键帧以`scale_x`存储.
+        """
+        if absolute:
+            import numpy as np
+            times = np.asarray(times, dtype=np.float64) - self.target_timerange.start
+        return {kf_list.keyframe_property: kf_list.evaluate(times)
+                for kf_list in self.common_keyframes if len(kf_list) > 0}
+
+    def simplify_keyframes(self, tolerance: float,
+                           properties: Optional[List[KeyframeProperty]] = None) -> Dict[KeyframeProperty, float]:
+        """简化此片段的关键帧, 删除可由相邻关键帧线性插值近似的关键帧, 参见`KeyframeList.simplify`
+
+        Args:
+            tolerance (`float`): 允许的最大偏差, 单位与关键帧的值相同
+            properties (`List[KeyframeProperty]`, optional): 要简化的属性, 默认简化所有属性.
+                注意`uniform_scale`的关键帧以`scale_x`存储.
+
+        Returns:
+            `Dict[KeyframeProperty, float]`: 各属性的压缩比(简化前与简化后的关键帧数之比)
+        """
+        ratios: Dict[KeyframeProperty, float] = {}
+        for kf_list in self.common_keyframes:
+            if properties is None or kf_list.keyframe_property in properties:
+                ratios[kf_list.keyframe_property] = kf_list.simplify(tolerance)
+        return ratios
+
     def export_json(self) -> Dict[str, Any]:
         """返回通用于各种片段的属性"""
         return {
@@ -79,13 +123,15 @@ class BaseSegment:
 class Speed:
     """播放速度对象, 目前只支持固定速度"""
 
+    __slots__ = ("global_id", "speed")
+
     global_id: str
     """全局id, 由程序自动生成"""
     speed: float
     """播放速度"""
 
     def __init__(self, speed: float):
-        self.global_id = uuid.uuid4().hex
+        self.global_id = new_id()
         self.speed = speed
 
     def export_json(self) -> Dict[str, Any]:
@@ -100,6 +146,9 @@ class Speed:
 class ClipSettings:
     """素材片段的图像调节设置"""
 
+    __slots__ = ("alpha", "flip_horizontal", "flip_vertical", "rotation",
+                 "scale_x", "scale_y", "transform_x", "transform_y")
+
     alpha: float
     """图像不透明度, 0-1"""
     flip_horizontal: bool
@@ -228,23 +277,40 @@ class VisualSegment(MediaSegment):
         Raises:
             `ValueError`: 试图同时设置`uniform_scale`以及`scale_x`或`scale_y`其中一者
         """
+        if isinstance(time_offset, str): time_offset = tim(time_offset)
+
+        self._get_keyframe_list(self._resolve_scale_property(_property)).add_keyframe(time_offset, value)
+        return self
+
+    def add_keyframes(self, _property: KeyframeProperty, times: ArrayLike, values: ArrayLike, *,
+                      simplify_tolerance: Optional[float] = None) -> "VisualSegment":
+        """为给定属性批量创建关键帧, 适用于逐帧生成的运动数据
+
+        Args:
+            _property (`KeyframeProperty`): 要控制的属性
+            times (`ArrayLike`): 各关键帧的时间偏移量, 单位为微秒, 可以是列表或NumPy数组
+            values (`ArrayLike`): 属性在各时间偏移量处的值, 长度须与`times`一致
+            simplify_tolerance (`float`, optional): 若指定, 则在添加后以此容差简化该属性的关键帧, 参见`KeyframeList.simplify`.
+                默认不简化.
+
+        Raises:
+            `ValueError`: 试图同时设置`uniform_scale`以及`scale_x`或`scale_y`其中一者, 或`times`与`values`长度不一致
+        """
+        kf_list = self._get_keyframe_list(self._resolve_scale_property(_property))
+        kf_list.add_keyframes(times, values)
+        if simplify_tolerance is not None:
+            kf_list.simplify(simplify_tolerance)
+        return self
+
+    def _resolve_scale_property(self, _property: KeyframeProperty) -> KeyframeProperty:
+        """检查缩放属性的互斥关系, 并将`uniform_scale`映射为实际存储的属性"""
         if (_property == KeyframeProperty.scale_x or _property == KeyframeProperty.scale_y) and self.uniform_scale:
             self.uniform_scale = False
         elif _property == KeyframeProperty.uniform_scale:
             if not self.uniform_scale:
                 raise ValueError("已设置 scale_x 或 scale_y 时, 不能再设置 uniform_scale")
             _property = KeyframeProperty.scale_x
-
-        if isinstance(time_offset, str): time_offset = tim(time_offset)
-
-        for kf_list in self.common_keyframes:
-            if kf_list.keyframe_property == _property:
-                kf_list.add_keyframe(time_offset, value)
-                return self
-        kf_list = KeyframeList(_property)
-        kf_list.add_keyframe(time_offset, value)
-        self.common_keyframes.append(kf_list)
-        return self
+        return _property
 
     def export_json(self) -> Dict[str, Any]:
         """导出通用于所有视觉片段的JSON数据"""
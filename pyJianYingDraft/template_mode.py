@@ -1,7 +1,8 @@
 """与模板模式相关的类及函数等"""
 
+import copy
+
 from enum import Enum
-from copy import deepcopy
 
 from . import util
 from . import exceptions
@@ -44,16 +45,22 @@ class ImportedSegment(BaseSegment):
     """导入的片段"""
 
     raw_data: Dict[str, Any]
-    """原始json数据"""
+    """原始json数据, 与模板内容共享且视为只读, 修改过的字段在导出时覆盖其上"""
 
     __DATA_ATTRS = ["material_id", "target_timerange"]
     def __init__(self, json_data: Dict[str, Any]):
-        self.raw_data = deepcopy(json_data)
+        self.raw_data = json_data
 
         util.assign_attr_with_json(self, self.__DATA_ATTRS, json_data)
 
+    def copy(self) -> "ImportedSegment":
+        """复制片段, 时间范围被独立复制, 原始json数据则与原片段共享"""
+        new_segment = copy.copy(self)
+        new_segment.target_timerange = Timerange(self.target_timerange.start, self.target_timerange.duration)
+        return new_segment
+
     def export_json(self) -> Dict[str, Any]:
-        json_data = deepcopy(self.raw_data)
+        json_data = dict(self.raw_data)
         json_data.update(util.export_attr_to_json(self, self.__DATA_ATTRS))
         return json_data
 
@@ -69,6 +76,11 @@ class ImportedMediaSegment(ImportedSegment):
 
         util.assign_attr_with_json(self, self.__DATA_ATTRS, json_data)
 
+    def copy(self) -> "ImportedMediaSegment":
+        new_segment = super().copy()
+        new_segment.source_timerange = Timerange(self.source_timerange.start, self.source_timerange.duration)
+        return new_segment
+
     def export_json(self) -> Dict[str, Any]:
         json_data = super().export_json()
         json_data.update(util.export_attr_to_json(self, self.__DATA_ATTRS))
@@ -79,7 +91,7 @@ class ImportedTrack(BaseTrack):
     """模板模式下导入的轨道"""
 
     raw_data: Dict[str, Any]
-    """原始轨道数据"""
+    """原始轨道数据, 与模板内容共享且视为只读"""
 
     def __init__(self, json_data: Dict[str, Any]):
         self.track_type = TrackType.from_name(json_data["type"])
@@ -87,10 +99,10 @@ class ImportedTrack(BaseTrack):
         self.track_id = json_data["id"]
         self.render_index = max([int(seg["render_index"]) for seg in json_data["segments"]], default=0)
 
-        self.raw_data = deepcopy(json_data)
+        self.raw_data = json_data
 
     def export_json(self) -> Dict[str, Any]:
-        ret = deepcopy(self.raw_data)
+        ret = dict(self.raw_data)
         ret.update({
             "name": self.name,
             "id": self.track_id
@@ -120,6 +132,12 @@ class EditableTrack(ImportedTrack):
             return 0
         return self.segments[-1].target_timerange.end
 
+    def copy(self) -> "EditableTrack":
+        """复制轨道, 各片段的时间范围被独立复制, 原始json数据则与原轨道共享"""
+        new_track = copy.copy(self)
+        new_track.segments = [seg.copy() for seg in self.segments]
+        return new_track
+
     def export_json(self) -> Dict[str, Any]:
         ret = super().export_json()
         # 为每个片段写入render_index
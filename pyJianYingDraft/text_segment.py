@@ -1,18 +1,22 @@
 """定义文本片段及其相关类"""
 
 import json
-import uuid
 from copy import deepcopy
 
-from typing import Dict, Tuple, Any
+from typing import Dict, Tuple, Any, TYPE_CHECKING
 from typing import Union, Optional, Literal
 
+from .id_provider import new_id
 from .time_util import Timerange, tim
 from .segment import ClipSettings, VisualSegment
 from .animation import SegmentAnimations, Text_animation
 
-from .metadata import FontType, EffectMeta
-from .metadata import TextIntro, TextOutro, TextLoopAnim
+from . import metadata
+from .metadata import EffectMeta
+
+if TYPE_CHECKING:
+    from .metadata import FontType
+    from .metadata import TextIntro, TextOutro, TextLoopAnim
 
 class TextStyle:
     """字体样式类"""
@@ -185,7 +189,7 @@ class TextBubble:
     resource_id: str
 
     def __init__(self, effect_id: str, resource_id: str):
-        self.global_id = uuid.uuid4().hex
+        self.global_id = new_id()
         self.effect_id = effect_id
         self.resource_id = resource_id
 
@@ -230,7 +234,7 @@ class TextSegment(VisualSegment):
     """文本花字效果, 在放入轨道时加入素材列表中, 目前仅支持一部分花字效果"""
 
     def __init__(self, text: str, timerange: Timerange, *,
-                 font: Optional[FontType] = None,
+                 font: "Optional[FontType]" = None,
                  style: Optional[TextStyle] = None, clip_settings: Optional[ClipSettings] = None,
                  border: Optional[TextBorder] = None, background: Optional[TextBackground] = None):
         """创建文本片段, 并指定其时间信息、字体样式及图像调节设置
@@ -246,7 +250,7 @@ class TextSegment(VisualSegment):
             border (`TextBorder`, optional): 文本描边参数, 默认无描边
             background (`TextBackground`, optional): 文本背景参数, 默认无背景
         """
-        super().__init__(uuid.uuid4().hex, None, timerange, 1.0, 1.0, clip_settings=clip_settings)
+        super().__init__(new_id(), None, timerange, 1.0, 1.0, clip_settings=clip_settings)
 
         self.text = text
         self.font = font.value if font else None
@@ -267,7 +271,7 @@ class TextSegment(VisualSegment):
         # 处理动画等
         if template.animations_instance:
             new_segment.animations_instance = deepcopy(template.animations_instance)
-            new_segment.animations_instance.animation_id = uuid.uuid4().hex
+            new_segment.animations_instance.animation_id = new_id()
             new_segment.extra_material_refs.append(new_segment.animations_instance.animation_id)
         if template.bubble:
             new_segment.add_bubble(template.bubble.effect_id, template.bubble.resource_id)
@@ -276,7 +280,7 @@ class TextSegment(VisualSegment):
 
         return new_segment
 
-    def add_animation(self, animation_type: Union[TextIntro, TextOutro, TextLoopAnim],
+    def add_animation(self, animation_type: "Union[TextIntro, TextOutro, TextLoopAnim]",
                       duration: Union[str, float] = 500000) -> "TextSegment":
         """将给定的入场/出场/循环动画添加到此片段的动画列表中, 出入场动画的持续时间可以自行设置, 循环动画则会自动填满其余无动画部分
 
@@ -289,11 +293,11 @@ class TextSegment(VisualSegment):
         """
         duration = min(tim(duration), self.target_timerange.duration)
 
-        if isinstance(animation_type, TextIntro):
+        if isinstance(animation_type, metadata.TextIntro):
             start = 0
-        elif isinstance(animation_type, TextOutro):
+        elif isinstance(animation_type, metadata.TextOutro):
             start = self.target_timerange.duration - duration
-        elif isinstance(animation_type, TextLoopAnim):
+        elif isinstance(animation_type, metadata.TextLoopAnim):
             intro_trange = self.animations_instance and self.animations_instance.get_animation_trange("in")
             outro_trange = self.animations_instance and self.animations_instance.get_animation_trange("out")
             start = intro_trange.start if intro_trange else 0
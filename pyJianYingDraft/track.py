@@ -1,13 +1,14 @@
 """轨道类及其元数据"""
 
-import uuid
+import bisect
 
 from enum import Enum
 from typing import TypeVar, Generic, Type
-from typing import Dict, List, Any, Union
+from typing import Dict, List, Tuple, Any, Union, Optional, Iterable
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 
+from .id_provider import new_id
 from .exceptions import SegmentOverlap
 from .segment import BaseSegment
 from .video_segment import VideoSegment, StickerSegment
@@ -69,6 +70,12 @@ class BaseTrack(ABC):
     def export_json(self) -> Dict[str, Any]: ...
 
 Seg_type = TypeVar("Seg_type", bound=BaseSegment)
+
+def format_overlaps(track_name: str, conflicts: List[Tuple[BaseSegment, BaseSegment]]) -> str:
+    """生成描述一系列重叠片段对的错误信息"""
+    return "%d overlapping segment pair(s) on track '%s': " % (len(conflicts), track_name) + \
+        ", ".join("[start: {}, end: {}] & [start: {}, end: {}]".format(a.start, a.end, b.start, b.end) for a, b in conflicts)
+
 class Track(BaseTrack, Generic[Seg_type]):
     """非模板模式下的轨道"""
 
@@ -76,16 +83,20 @@ class Track(BaseTrack, Generic[Seg_type]):
     """是否静音"""
 
     segments: List[Seg_type]
-    """该轨道包含的片段列表"""
+    """该轨道包含的片段列表, 按起始时间升序排列"""
+
+    _segment_starts: List[int]
+    """与`segments`一一对应的起始时间列表, 用于二分查找"""
 
     def __init__(self, track_type: TrackType, name: str, render_index: int, mute: bool):
         self.track_type = track_type
         self.name = name
-        self.track_id = uuid.uuid4().hex
+        self.track_id = new_id()
         self.render_index = render_index
 
         self.mute = mute
         self.segments = []
+        self._segment_starts = []
 
     @property
     def end_time(self) -> int:
@@ -99,9 +110,24 @@ class Track(BaseTrack, Generic[Seg_type]):
         """返回该轨道允许的片段类型"""
         return self.track_type.value.segment_type  # type: ignore
 
+    def _find_overlap(self, segment: BaseSegment, index: int) -> Optional[Seg_type]:
+        """返回在`index`处插入`segment`时与之重叠的已有片段, 不存在则返回None"""
+        if index > 0 and self.segments[index-1].overlaps(segment):
+            return self.segments[index-1]
+        # 起始时间不早于新片段的片段中, 只有起始于新片段结束之前的才可能重叠
+        for i in range(index, len(self.segments)):
+            seg = self.segments[i]
+            if seg.target_timerange.start >= segment.target_timerange.end:
+                break
+            if seg.overlaps(segment):
+                return seg
+        return None
+
     def add_segment(self, segment: Seg_type) -> "Track[Seg_type]":
         """向轨道中添加一个片段, 添加的片段必须匹配轨道类型且不与现有片段重叠
 
+        片段可以按任意顺序添加, 轨道会保持其按起始时间排列
+
         Args:
             segment (Seg_type): 要添加的片段
 
@@ -112,15 +138,88 @@ class Track(BaseTrack, Generic[Seg_type]):
         if not isinstance(segment, self.accept_segment_type):
             raise TypeError("New segment (%s) is not of the same type as the track (%s)" % (type(segment), self.accept_segment_type))
 
-        # 检查片段是否重叠
-        for seg in self.segments:
-            if seg.overlaps(segment):
-                raise SegmentOverlap("New segment overlaps with existing segment [start: {}, end: {}]"
-                                     .format(segment.target_timerange.start, segment.target_timerange.end))
+        # 二分查找插入位置, 并仅检查相邻片段是否重叠
+        start = segment.target_timerange.start
+        index = bisect.bisect_right(self._segment_starts, start)
+        if self._find_overlap(segment, index) is not None:
+            raise SegmentOverlap("New segment overlaps with existing segment [start: {}, end: {}]"
+                                 .format(segment.target_timerange.start, segment.target_timerange.end))
 
-        self.segments.append(segment)
+        self.segments.insert(index, segment)
+        self._segment_starts.insert(index, start)
         return self
 
+    def merge_segments(self, segments: Iterable[Seg_type], *,
+                       presorted: bool = False) -> Tuple[List[Seg_type], List[Tuple[Seg_type, Seg_type]]]:
+        """将一批新片段与轨道现有片段合并, 但**不修改轨道本身**
+
+        合并后的片段列表通过一次扫描检查重叠, 返回合并结果以及全部重叠片段对
+
+        Args:
+            segments (`Iterable[Seg_type]`): 要添加的片段
+            presorted (`bool`, optional): 新片段是否已按起始时间升序排列, 若是则跳过排序. 默认为否.
+
+        Raises:
+            `TypeError`: 某个新片段类型与轨道类型不匹配
+        """
+        new_segments = list(segments)
+        for segment in new_segments:
+            if not isinstance(segment, self.accept_segment_type):
+                raise TypeError("New segment (%s) is not of the same type as the track (%s)" % (type(segment), self.accept_segment_type))
+        if not presorted:
+            new_segments.sort(key=lambda seg: seg.target_timerange.start)
+
+        # 两个有序序列的拼接可以被线性时间内排好
+        merged = self.segments + new_segments
+        merged.sort(key=lambda seg: seg.target_timerange.start)
+
+        # 扫描: 与此前结束最晚的片段比较即可发现重叠
+        conflicts: List[Tuple[Seg_type, Seg_type]] = []
+        latest: Optional[Seg_type] = None
+        for seg in merged:
+            if latest is not None and seg.overlaps(latest):
+                conflicts.append((latest, seg))
+            if latest is None or seg.target_timerange.end > latest.target_timerange.end:
+                latest = seg
+
+        return merged, conflicts
+
+    def add_segments(self, segments: Iterable[Seg_type], *, presorted: bool = False) -> "Track[Seg_type]":
+        """向轨道中批量添加片段, 若存在任何重叠则一次性报告全部重叠且不添加任何片段
+
+        Args:
+            segments (`Iterable[Seg_type]`): 要添加的片段
+            presorted (`bool`, optional): 新片段是否已按起始时间升序排列, 若是则跳过排序. 默认为否.
+
+        Raises:
+            `TypeError`: 某个新片段类型与轨道类型不匹配
+            `SegmentOverlap`: 新片段之间或与现有片段之间存在重叠
+        """
+        merged, conflicts = self.merge_segments(segments, presorted=presorted)
+        if conflicts:
+            raise SegmentOverlap(format_overlaps(self.name, conflicts))
+        self.set_segments(merged)
+        return self
+
+    def set_segments(self, segments: List[Seg_type]) -> None:
+        """直接替换轨道的片段列表, 传入的片段须已按起始时间排列且互不重叠"""
+        self.segments = segments
+        self._segment_starts = [seg.target_timerange.start for seg in segments]
+
+    def get_segment_at(self, time: int) -> Optional[Seg_type]:
+        """获取轨道上覆盖给定时刻的片段, 不存在则返回None
+
+        Args:
+            time (`int`): 轨道上的时刻, 单位为微秒
+        """
+        index = bisect.bisect_right(self._segment_starts, time) - 1
+        if index < 0:
+            return None
+        seg = self.segments[index]
+        if seg.target_timerange.start <= time < seg.target_timerange.end:
+            return seg
+        return None
+
     def export_json(self) -> Dict[str, Any]:
         # 为每个片段写入render_index
         segment_exports = [seg.export_json() for seg in self.segments]
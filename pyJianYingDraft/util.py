@@ -1,9 +1,15 @@
 """辅助函数，主要与模板模式有关"""
 
+import os
+import json
+import shutil
+import hashlib
 import inspect
 
-from typing import Union, Type
-from typing import List, Dict, Any
+from typing import Union, Type, Optional
+from typing import List, Dict, Set, Tuple, Any, Hashable, Iterator, Iterable
+
+from . import json_backend
 
 JsonExportable = Union[int, float, bool, str, List["JsonExportable"], Dict[str, "JsonExportable"]]
 
@@ -56,3 +62,238 @@ def export_attr_to_json(obj: object, attrs: List[str]) -> Dict[str, JsonExportab
         else:
             json_data[attr] = getattr(obj, attr)
     return json_data
+
+def copy_json(obj: Any) -> Any:
+    """复制由dict/list及基本类型构成的JSON对象, 比`copy.deepcopy`快得多"""
+    if isinstance(obj, dict):
+        return {key: copy_json(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [copy_json(value) for value in obj]
+    return obj
+
+class RawJson(str):
+    """已编码好的JSON片段, `iter_json_chunks`遇到时原样输出"""
+
+def iter_json_chunks(obj: Any, *, indent: Optional[int] = None, expand_depth: int = 1,
+                     base_level: int = 0) -> Iterator[str]:
+    """将对象逐块编码为JSON字符串, 拼接结果与`json.dumps(obj, ensure_ascii=False, indent=indent)`一致
+
+    `indent`为None时使用紧凑格式(不含任何空白), 并使用`json_backend`中选定的后端编码. 嵌套深度小于`expand_depth`的dict及list会被逐元素展开编码,
+    其中的list也可以是一个惰性生成元素的迭代器, 从而不必在内存中同时保存全部元素及整个字符串.
+    `base_level`为`obj`所处的缩进层级, 用于单独编码嵌套在更大的JSON中的片段; 其中的`RawJson`片段须以相应层级编码.
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False, indent=indent,
+                               separators=(",", ": ") if indent is not None else (",", ":"))
+    key_separator = ": " if indent is not None else ":"
+
+    def newline(level: int) -> str:
+        return "\n" + " " * (indent * level) if indent is not None else ""
+
+    def chunks(value: Any, level: int, depth: int) -> Iterator[str]:
+        if isinstance(value, RawJson):
+            yield value
+        elif depth > 0 and isinstance(value, dict):
+            if len(value) == 0:
+                yield "{}"
+                return
+            yield "{"
+            for i, (key, item) in enumerate(value.items()):
+                yield ("," if i else "") + newline(level + 1) + encoder.encode(key) + key_separator
+                yield from chunks(item, level + 1, depth - 1)
+            yield newline(level) + "}"
+        elif depth > 0 and isinstance(value, (list, Iterator)):
+            empty = True
+            for item in value:
+                yield ("[" if empty else ",") + newline(level + 1)
+                yield from chunks(item, level + 1, depth - 1)
+                empty = False
+            yield "[]" if empty else newline(level) + "]"
+        elif indent is None:
+            yield json_backend.dumps_compact(value)
+        else:
+            # 字符串内的换行符已被转义, 故可直接为结构性换行补上缩进
+            text = encoder.encode(value)
+            yield text.replace("\n", newline(level)) if level > 0 else text
+
+    return chunks(obj, base_level, expand_depth)
+
+def encode_json_fragment(value: Any, *, indent: Optional[int], level: int, expand_depth: int = 0) -> RawJson:
+    """将嵌套在更大的JSON中第`level`层的片段编码为`RawJson`, 参数含义同`iter_json_chunks`"""
+    return RawJson("".join(iter_json_chunks(value, indent=indent, expand_depth=expand_depth, base_level=level)))
+
+class JsonFragmentCache:
+    """JSON片段的编码缓存, 内容与上次编码时相等的片段直接复用已编码的文本
+
+    是否变化通过与上次编码时的对象比较得出, 故片段可以被任意方式修改而不会得到过时的结果.
+    注意数值相等但类型不同的值(如`1`与`1.0`)被视为未变化.
+    """
+
+    _entries: Dict[Hashable, Tuple[Any, RawJson]]
+    """各片段上次编码时的对象及编码结果"""
+    _used: Set[Hashable]
+    """本轮编码中使用过的键"""
+
+    def __init__(self):
+        self._entries = {}
+        self._used = set()
+
+    def begin(self) -> None:
+        """开始新一轮编码, 丢弃上一轮中未被使用的片段"""
+        if len(self._entries) != len(self._used):
+            self._entries = {key: entry for key, entry in self._entries.items() if key in self._used}
+        self._used = set()
+
+    def encode(self, key: Hashable, value: Any, *, indent: Optional[int], level: int,
+               expand_depth: int = 0, snapshot: bool = False) -> RawJson:
+        """编码一个片段, 参数含义同`iter_json_chunks`
+
+        Args:
+            key (`Hashable`): 片段的键, 同一轮编码中重复的键不使用缓存
+            snapshot (`bool`, optional): 是否保存`value`的副本用于比较. 若`value`此后可能被原地修改则必须为真. 默认为否.
+        """
+        if key in self._used:
+            return encode_json_fragment(value, indent=indent, level=level, expand_depth=expand_depth)
+        self._used.add(key)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == value:
+            return entry[1]
+        text = encode_json_fragment(value, indent=indent, level=level, expand_depth=expand_depth)
+        self._entries[key] = (copy_json(value) if snapshot else value, text)
+        return text
+
+    def keys(self) -> List[Hashable]:
+        """返回缓存中各片段的键"""
+        return list(self._entries)
+
+    def get(self, key: Hashable) -> Optional[RawJson]:
+        """返回给定键上次的编码结果, 未缓存时返回None"""
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+
+def atomic_write(file_path: str, chunks: Iterable[str], *, backups: int = 0, skip_unchanged: bool = False) -> bool:
+    """将文本块原子地写入文件, 写入过程中崩溃或被终止不会留下残缺的文件
+
+    内容先写入同一文件夹下的临时文件并`fsync`, 再通过`os.replace`替换目标文件
+
+    Args:
+        file_path (`str`): 目标文件路径
+        chunks (`Iterable[str]`): 依次写入的文本块
+        backups (`int`, optional): 保留的历史版本数, 依次存为`<file_path>.bak1`, `<file_path>.bak2`等, 默认不保留.
+        skip_unchanged (`bool`, optional): 内容与目标文件相同时不替换目标文件, 从而保持其修改时间不变.
+            内容的哈希值保存在`<file_path>.hash`中, 以免每次都读取目标文件; 不跳过时若替换了目标文件则删除该文件. 默认为否.
+
+    Returns:
+        `bool`: 是否实际写入了目标文件
+    """
+    file_path = os.path.abspath(file_path)
+    directory = os.path.dirname(file_path)
+    fd, tmp_path = _create_temp_file(file_path)
+    hasher = hashlib.blake2b(digest_size=16)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            if skip_unchanged:
+                for chunk in chunks:
+                    f.write(chunk)
+                    hasher.update(chunk.encode("utf-8"))
+            else:
+                f.writelines(chunks)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if skip_unchanged and _stored_hash(file_path) == hasher.hexdigest():
+            os.remove(tmp_path)
+            return False
+
+        # 替换已有文件时沿用其权限, 新建文件则保持受umask限制的默认权限
+        if os.path.exists(file_path):
+            os.chmod(tmp_path, os.stat(file_path).st_mode & 0o777)
+
+        if backups > 0 and os.path.exists(file_path):
+            _rotate_backups(file_path, backups)
+        # 旧的哈希旁路文件即将过期, 须先删除: 否则在修改时间精度较低的文件系统上, 新文件可能与其记录的大小及修改时间恰好一致
+        if os.path.exists(file_path + ".hash"):
+            os.remove(file_path + ".hash")
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if skip_unchanged:
+        _write_hash_sidecar(file_path, hasher.hexdigest())
+
+    # 确保目录项的变更也落盘, 部分平台(如Windows)不支持对目录fsync
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return True
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+    return True
+
+def _create_temp_file(file_path: str) -> Tuple[int, str]:
+    """在目标文件所在的文件夹中创建并打开一个临时文件, 返回其文件描述符及路径
+
+    与`tempfile.mkstemp`(权限固定为0o600)不同, 临时文件的权限与`open`新建文件时相同, 即受umask限制的0o666
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    for _ in range(100):
+        tmp_path = "%s.%s.tmp" % (file_path, os.urandom(4).hex())
+        try:
+            return os.open(tmp_path, flags, 0o666), tmp_path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"无法为 {file_path} 创建临时文件")
+
+def _stored_hash(file_path: str) -> Optional[str]:
+    """返回文件内容的哈希值, 文件不存在时返回None
+
+    若旁路文件中记录的文件大小及修改时间与文件一致则直接使用其中的哈希值, 否则读取文件重新计算
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+
+    try:
+        with open(file_path + ".hash", "r", encoding="utf-8") as f:
+            record = json.load(f)
+        if record["size"] == stat.st_size and record["mtime_ns"] == stat.st_mtime_ns:
+            return record["blake2b"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    # 与写入时一致, 以文本模式读取并对UTF-8编码的内容计算哈希
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(file_path, "r", encoding="utf-8") as f:
+        for chunk in iter(lambda: f.read(1 << 20), ""):
+            hasher.update(chunk.encode("utf-8"))
+    return hasher.hexdigest()
+
+def _write_hash_sidecar(file_path: str, digest: str) -> None:
+    """在`<file_path>.hash`中记录文件内容的哈希值及文件的大小和修改时间"""
+    stat = os.stat(file_path)
+    with open(file_path + ".hash", "w", encoding="utf-8") as f:
+        json.dump({"blake2b": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}, f)
+
+def _rotate_backups(file_path: str, backups: int) -> None:
+    """将`file_path`的当前版本存为`.bak1`, 已有的备份依次后移, 超出数量的最旧备份被覆盖"""
+    for i in range(backups - 1, 0, -1):
+        older = "%s.bak%d" % (file_path, i)
+        if os.path.exists(older):
+            os.replace(older, "%s.bak%d" % (file_path, i + 1))
+
+    newest = file_path + ".bak1"
+    if os.path.exists(newest):
+        os.remove(newest)
+    # 优先使用硬链接, 使得目标文件在任何时刻都存在
+    try:
+        os.link(file_path, newest)
+    except OSError:
+        shutil.copy2(file_path, newest)
@@ -3,21 +3,23 @@
 包含图像调节设置、动画效果、特效、转场等相关类
 """
 
-import uuid
-from copy import deepcopy
-
-from typing import Optional, Literal, Union
+from typing import Optional, Literal, Union, TYPE_CHECKING
 from typing import Dict, List, Tuple, Any
 
+from .id_provider import new_id
 from .time_util import tim, Timerange
 from .segment import VisualSegment, ClipSettings
-from .local_materials import VideoMaterial
+from .local_materials import VideoMaterial, CropSettings
 from .animation import SegmentAnimations, VideoAnimation
 
+from . import metadata
 from .metadata import EffectMeta, EffectParamInstance
-from .metadata import MaskMeta, MaskType, FilterType, TransitionType
-from .metadata import IntroType, OutroType, GroupAnimationType
-from .metadata import VideoSceneEffectType, VideoCharacterEffectType
+from .metadata import MaskMeta, MaskType
+
+if TYPE_CHECKING:
+    from .metadata import FilterType, TransitionType
+    from .metadata import IntroType, OutroType, GroupAnimationType
+    from .metadata import VideoSceneEffectType, VideoCharacterEffectType
 
 class Mask:
     """蒙版对象"""
@@ -46,7 +48,7 @@ class Mask:
                  cx: float, cy: float, w: float, h: float,
                  ratio: float, rot: float, inv: bool, feather: float, round_corner: float):
         self.mask_meta = mask_meta
-        self.global_id = uuid.uuid4().hex
+        self.global_id = new_id()
 
         self.center_x, self.center_y = cx, cy
         self.width, self.height = w, h
@@ -98,20 +100,20 @@ class VideoEffect:
 
     adjust_params: List[EffectParamInstance]
 
-    def __init__(self, effect_meta: Union[VideoSceneEffectType, VideoCharacterEffectType],
+    def __init__(self, effect_meta: "Union[VideoSceneEffectType, VideoCharacterEffectType]",
                  params: Optional[List[Optional[float]]] = None, *,
                  apply_target_type: Literal[0, 2] = 0):
         """根据给定的特效元数据及参数列表构造一个视频特效对象, params的范围是0~100"""
 
         self.name = effect_meta.value.name
-        self.global_id = uuid.uuid4().hex
+        self.global_id = new_id()
         self.effect_id = effect_meta.value.effect_id
         self.resource_id = effect_meta.value.resource_id
         self.adjust_params = []
 
-        if isinstance(effect_meta, VideoSceneEffectType):
+        if isinstance(effect_meta, metadata.VideoSceneEffectType):
             self.effect_type = "video_effect"
-        elif isinstance(effect_meta, VideoCharacterEffectType):
+        elif isinstance(effect_meta, metadata.VideoCharacterEffectType):
             self.effect_type = "face_effect"
         else:
             raise TypeError("Invalid effect meta type %s" % type(effect_meta))
@@ -162,7 +164,7 @@ class Filter:
                  apply_target_type: Literal[0, 2] = 0):
         """根据给定的滤镜元数据及强度构造滤镜素材对象"""
 
-        self.global_id = uuid.uuid4().hex
+        self.global_id = new_id()
         self.effect_meta = meta
         self.intensity = intensity
         self.apply_target_type = apply_target_type
@@ -218,10 +220,10 @@ class Transition:
     is_overlap: bool
     """是否与上一个片段重叠(?)"""
 
-    def __init__(self, effect_meta: TransitionType, duration: Optional[int] = None):
+    def __init__(self, effect_meta: "TransitionType", duration: Optional[int] = None):
         """根据给定的转场元数据及持续时间构造一个转场对象"""
         self.name = effect_meta.value.name
-        self.global_id = uuid.uuid4().hex
+        self.global_id = new_id()
         self.effect_id = effect_meta.value.effect_id
         self.resource_id = effect_meta.value.resource_id
 
@@ -256,7 +258,7 @@ class BackgroundFilling:
     """背景颜色, 格式为'#RRGGBBAA'"""
 
     def __init__(self, fill_type: Literal["canvas_blur", "canvas_color"], blur: float, color: str):
-        self.global_id = uuid.uuid4().hex
+        self.global_id = new_id()
         self.fill_type = fill_type
         self.blur = blur
         self.color = color
@@ -274,7 +276,7 @@ class VideoSegment(VisualSegment):
     """安放在轨道上的一个视频/图片片段"""
 
     material_instance: VideoMaterial
-    """素材实例"""
+    """素材实例, 与其他使用同一素材的片段共享"""
     material_size: Tuple[int, int]
     """素材尺寸"""
 
@@ -336,7 +338,7 @@ class VideoSegment(VisualSegment):
 
         super().__init__(material.material_id, source_timerange, target_timerange, speed, volume, clip_settings=clip_settings)
 
-        self.material_instance = deepcopy(material)
+        self.material_instance = material  # 素材不可修改, 故直接共享
         self.material_size = (material.width, material.height)
         self.effects = []
         self.filters = []
@@ -344,7 +346,16 @@ class VideoSegment(VisualSegment):
         self.mask = None
         self.background_filling = None
 
-    def add_animation(self, animation_type: Union[IntroType, OutroType, GroupAnimationType],
+    def set_crop(self, crop_settings: CropSettings) -> "VideoSegment":
+        """为此片段单独设置素材的裁剪, 其他使用同一素材的片段不受影响
+
+        片段将改为引用一个带有给定裁剪设置的素材副本, 该副本拥有独立的素材id.
+        """
+        self.material_instance = self.material_instance.with_crop(crop_settings)
+        self.material_id = self.material_instance.material_id
+        return self
+
+    def add_animation(self, animation_type: "Union[IntroType, OutroType, GroupAnimationType]",
                       duration: Optional[Union[int, str]] = None) -> "VideoSegment":
         """将给定的入场/出场/组合动画添加到此片段的动画列表中
 
@@ -355,13 +366,13 @@ class VideoSegment(VisualSegment):
         """
         if duration is not None:
             duration = tim(duration)
-        if isinstance(animation_type, IntroType):
+        if isinstance(animation_type, metadata.IntroType):
             start = 0
             duration = duration or animation_type.value.duration
-        elif isinstance(animation_type, OutroType):
+        elif isinstance(animation_type, metadata.OutroType):
             duration = duration or animation_type.value.duration
             start = self.target_timerange.duration - duration
-        elif isinstance(animation_type, GroupAnimationType):
+        elif isinstance(animation_type, metadata.GroupAnimationType):
             start = 0
             duration = duration or self.target_timerange.duration
         else:
@@ -375,7 +386,7 @@ class VideoSegment(VisualSegment):
 
         return self
 
-    def add_effect(self, effect_type: Union[VideoSceneEffectType, VideoCharacterEffectType],
+    def add_effect(self, effect_type: "Union[VideoSceneEffectType, VideoCharacterEffectType]",
                    params: Optional[List[Optional[float]]] = None) -> "VideoSegment":
         """为视频片段添加一个作用于整个片段的特效
 
@@ -396,7 +407,7 @@ class VideoSegment(VisualSegment):
 
         return self
 
-    def add_filter(self, filter_type: FilterType, intensity: float = 100.0) -> "VideoSegment":
+    def add_filter(self, filter_type: "FilterType", intensity: float = 100.0) -> "VideoSegment":
         """为视频片段添加一个滤镜
 
         Args:
@@ -445,7 +456,7 @@ class VideoSegment(VisualSegment):
         self.extra_material_refs.append(self.mask.global_id)
         return self
 
-    def add_transition(self, transition_type: TransitionType, *, duration: Optional[Union[int, str]] = None) -> "VideoSegment":
+    def add_transition(self, transition_type: "TransitionType", *, duration: Optional[Union[int, str]] = None) -> "VideoSegment":
         """为视频片段添加转场, 注意转场应当添加在**前面的**片段上
 
         Args:
@@ -512,7 +523,7 @@ class StickerSegment(VisualSegment):
             target_timerange (`Timerange`): 片段在轨道上的目标时间范围
             clip_settings (`ClipSettings`, optional): 图像调节设置, 默认不作任何变换
         """
-        super().__init__(uuid.uuid4().hex, None, target_timerange, 1.0, 1.0, clip_settings=clip_settings)
+        super().__init__(new_id(), None, target_timerange, 1.0, 1.0, clip_settings=clip_settings)
         self.resource_id = resource_id
 
     def export_material(self) -> Dict[str, Any]:
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+import pyJianYingDraft as draft
+from pyJianYingDraft import trange, tim, IntroType, TransitionType, KeyframeProperty
+
+ASSETS = os.path.join(os.path.dirname(__file__), "..", "readme_assets", "tutorial")
+
+def asset(name: str) -> str:
+    return os.path.abspath(os.path.join(ASSETS, name))
+
+@pytest.fixture
+def template_folder(tmp_path) -> draft.DraftFolder:
+    """含一个名为`tpl`的模板草稿的草稿文件夹, 包含音频、视频、文本及字幕轨道"""
+    folder = draft.DraftFolder(str(tmp_path))
+    script = folder.create_draft("tpl", 1920, 1080)
+    script.add_track(draft.TrackType.audio).add_track(draft.TrackType.video).add_track(draft.TrackType.text)
+
+    audio = draft.AudioSegment(asset("audio.mp3"), trange("0s", "5s"), volume=0.6)
+    audio.add_fade("1s", "0s")
+    video_material = draft.VideoMaterial(asset("video.mp4"))
+    video = draft.VideoSegment(video_material, trange("0s", "4.2s"))
+    video.add_animation(IntroType.斜切)
+    video.add_transition(TransitionType.信号故障)
+    video.add_keyframe(KeyframeProperty.position_x, "1s", 0.5)
+    gif_material = draft.VideoMaterial(asset("sticker.gif"))
+    gif = draft.VideoSegment(gif_material, trange(video.end, gif_material.duration))
+    script.add_segment(audio).add_segment(video).add_segment(gif)
+    for i in range(5):
+        script.add_segment(draft.VideoSegment(video_material, trange(gif.end + i * 100000, 100000),
+                                              source_timerange=trange(i * 1000, 100000)))
+
+    text = draft.TextSegment("据说效果还不错?", video.target_timerange, font=draft.FontType.文轩体,
+                             style=draft.TextStyle(color=(1.0, 1.0, 0.0)))
+    text.add_animation(draft.TextOutro.故障闪动, duration=tim("1s"))
+    script.add_segment(text)
+    script.import_srt(asset("subtitles.srt"), "subs", style_reference=text)
+    script.save()
+    return folder
@@ -0,0 +1,73 @@
+"""原子写入、历史版本及跳过未变化内容"""
+
+import os
+
+import pytest
+
+from pyJianYingDraft.util import atomic_write
+
+def _read(path) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def test_writes_chunks_and_keeps_no_temp_files(tmp_path):
+    target = tmp_path / "draft_content.json"
+    assert atomic_write(str(target), ["{", '"a": "中文"', "}"])
+    assert _read(target) == '{"a": "中文"}'
+    assert sorted(os.listdir(tmp_path)) == ["draft_content.json"]
+
+def test_failed_write_leaves_target_untouched(tmp_path):
+    target = tmp_path / "draft_content.json"
+    atomic_write(str(target), ["old"])
+
+    def chunks():
+        yield "new"
+        raise RuntimeError("中断")
+    with pytest.raises(RuntimeError):
+        atomic_write(str(target), chunks())
+    assert _read(target) == "old"
+    assert sorted(os.listdir(tmp_path)) == ["draft_content.json"]
+
+def test_backups_rotate(tmp_path):
+    target = str(tmp_path / "draft_content.json")
+    for version in range(4):
+        atomic_write(target, [str(version)], backups=2)
+    assert _read(target) == "3"
+    assert _read(target + ".bak1") == "2"
+    assert _read(target + ".bak2") == "1"
+    assert not os.path.exists(target + ".bak3")
+
+def test_skip_unchanged(tmp_path):
+    target = str(tmp_path / "draft_content.json")
+    assert atomic_write(target, ["same"], skip_unchanged=True)
+    mtime = os.stat(target).st_mtime_ns
+    assert not atomic_write(target, ["same"], skip_unchanged=True)
+    assert os.stat(target).st_mtime_ns == mtime
+    assert atomic_write(target, ["diff"], skip_unchanged=True)
+    assert _read(target) == "diff"
+
+def test_plain_write_does_not_leave_stale_sidecar(tmp_path):
+    target = str(tmp_path / "draft_content.json")
+    atomic_write(target, ["aaaa"], skip_unchanged=True)
+    stat = os.stat(target)
+
+    atomic_write(target, ["bbbb"])  # 大小相同
+    assert not os.path.exists(target + ".hash")
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))  # 模拟修改时间精度较低的文件系统
+
+    assert atomic_write(target, ["aaaa"], skip_unchanged=True)
+    assert _read(target) == "aaaa"
+
+@pytest.mark.skipif(os.name == "nt", reason="Windows不支持POSIX权限")
+def test_new_file_respects_umask_and_existing_mode_is_kept(tmp_path):
+    target = tmp_path / "draft_content.json"
+    previous = os.umask(0o027)
+    try:
+        atomic_write(str(target), ["new"])
+    finally:
+        os.umask(previous)
+    assert os.stat(target).st_mode & 0o777 == 0o640
+
+    os.chmod(target, 0o600)
+    atomic_write(str(target), ["changed"])
+    assert os.stat(target).st_mode & 0o777 == 0o600
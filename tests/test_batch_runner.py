@@ -0,0 +1,65 @@
+"""批量生成草稿: 清单读取、续跑及错误处理"""
+
+import os
+import json
+
+import pytest
+
+import pyJianYingDraft as draft
+from pyJianYingDraft.batch_runner import run_batch, load_manifest
+
+from conftest import asset
+
+def _rows(count: int):
+    return [{"draft_name": "v%d" % i, "text:0:0": "文本%d" % i, "text:subs:2": "字幕%d" % i,
+             "material:audio.mp3": asset("audio.mp3")} for i in range(count)]
+
+def _read(folder: draft.DraftFolder, name: str) -> str:
+    with open(os.path.join(folder.folder_path, name, "draft_content.json"), "r", encoding="utf-8") as f:
+        return f.read()
+
+def test_output_matches_template_mode(template_folder):
+    result = run_batch(template_folder.folder_path, _rows(3), template="tpl", workers=1)
+    assert sorted(result.completed) == ["v0", "v1", "v2"] and result.errors == {}
+
+    script = template_folder.duplicate_as_template("tpl", "expected")
+    script.replace_text(script.get_imported_track(draft.TrackType.text, index=0), 0, "文本1")
+    script.replace_text(script.get_imported_track(draft.TrackType.text, name="subs"), 2, "字幕1")
+    script.replace_material_by_name("audio.mp3", draft.AudioMaterial(asset("audio.mp3")))
+    script.save()
+    assert _read(template_folder, "v1") == _read(template_folder, "expected")
+
+def test_resume_from_completion_log(template_folder, tmp_path):
+    log = str(tmp_path / "done.log")
+    rows = _rows(4) + [{"draft_name": "bad", "material:missing.mp3": asset("audio.mp3")}, {"text:0:0": "x"}]
+    first = run_batch(template_folder.folder_path, rows[:2], template="tpl", workers=2, completion_log=log)
+    assert sorted(first.completed) == ["v0", "v1"]
+
+    progress = []
+    second = run_batch(template_folder.folder_path, rows, template="tpl", workers=2, completion_log=log,
+                       progress=progress.append)
+    assert sorted(second.skipped) == ["v0", "v1"]
+    assert sorted(second.completed) == ["v2", "v3"]
+    assert set(second.errors) == {"bad", "<第6行>"}
+    assert "Traceback" in second.errors["bad"]
+    assert progress[-1].done == 2 and progress[-1].failed == 1 and progress[-1].total == 3
+
+    with open(log, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert sorted(r["draft_name"] for r in records if r["ok"]) == ["v0", "v1", "v2", "v3"]
+
+def test_duplicate_draft_names_are_rejected(template_folder, tmp_path):
+    rows = _rows(2) + [{"draft_name": "v0", "text:0:0": "again"}]
+    with pytest.raises(ValueError, match="v0"):
+        run_batch(template_folder.folder_path, rows, template="tpl", workers=1)
+    assert not template_folder.has_draft("v1")
+
+    manifest = tmp_path / "m.jsonl"
+    manifest.write_text("\n".join(json.dumps(row, ensure_ascii=False) for row in rows), encoding="utf-8")
+    with pytest.raises(ValueError, match="v0"):
+        load_manifest(str(manifest))
+
+def test_load_csv_manifest(tmp_path):
+    manifest = tmp_path / "m.csv"
+    manifest.write_text("draft_name,text:0:0\nc1,CSV\n", encoding="utf-8")
+    assert load_manifest(str(manifest)) == [{"draft_name": "c1", "text:0:0": "CSV"}]
@@ -0,0 +1,101 @@
+"""从编译模板生成的草稿与复制模板后逐个替换的结果一致"""
+
+import os
+import pickle
+
+import pytest
+
+import pyJianYingDraft as draft
+from pyJianYingDraft import exceptions
+
+from conftest import asset
+
+def _read(folder: draft.DraftFolder, name: str) -> str:
+    with open(os.path.join(folder.folder_path, name, "draft_content.json"), "r", encoding="utf-8") as f:
+        return f.read()
+
+def _edit(target, i: int, video: draft.VideoMaterial, audio: draft.AudioMaterial) -> None:
+    """对`ScriptFile`或`TemplateVariant`进行同样的替换"""
+    get_track = target.get_imported_track if isinstance(target, draft.ScriptFile) else target._template.get_imported_track
+    target.replace_text(get_track(draft.TrackType.text, index=0), 0, "文本%d" % i)
+    target.replace_text(get_track(draft.TrackType.text, name="subs"), 2, "字幕%d" % i)
+    if i % 2:
+        target.replace_material_by_seg(get_track(draft.TrackType.video, index=0), 1, video,
+                                       handle_shrink=draft.ShrinkMode.cut_tail_align)
+    target.replace_material_by_name("audio.mp3", audio)
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_emit_matches_duplicate_and_replace(template_folder, compact):
+    video = draft.VideoMaterial(asset("video.mp4"), "other.mp4")
+    audio = draft.AudioMaterial(asset("audio.mp3"), "other.mp3")
+    compiled = template_folder.compile_template("tpl")
+
+    variants = []
+    for i in range(4):
+        variant = compiled.variant()
+        _edit(variant, i, video, audio)
+        if i == 3:
+            variant = pickle.loads(pickle.dumps(variant))
+            variant._template = compiled
+        variants.append(("new%d" % i, variant))
+    report = compiled.emit_many(variants, compact=compact)
+    assert len(report.draft_paths) == 4
+
+    for i in range(4):
+        script = template_folder.duplicate_as_template("tpl", "old%d" % i)
+        _edit(script, i, video, audio)
+        script.save(compact)
+        assert _read(template_folder, "new%d" % i) == _read(template_folder, "old%d" % i)
+        assert sorted(os.listdir(os.path.join(template_folder.folder_path, "new%d" % i))) == \
+            sorted(os.listdir(os.path.join(template_folder.folder_path, "old%d" % i)))
+
+def test_template_is_restored_after_emit(template_folder):
+    compiled = template_folder.compile_template("tpl")
+    original = template_folder.load_template("tpl").dumps()
+    variant = compiled.variant()
+    _edit(variant, 1, draft.VideoMaterial(asset("sticker.gif")), draft.AudioMaterial(asset("audio.mp3"), "x.mp3"))
+    compiled.emit("a", variant)
+
+    compiled.emit("plain")
+    assert _read(template_folder, "plain") == original
+    assert compiled.script.get_imported_materials_by_name("audios", "audio.mp3")
+
+def test_failed_variant_writes_nothing(template_folder):
+    compiled = template_folder.compile_template("tpl")
+    variant = compiled.variant()
+    variant.replace_material_by_name("missing.mp3", draft.AudioMaterial(asset("audio.mp3")))
+    with pytest.raises(exceptions.MaterialNotFound):
+        compiled.emit("bad", variant)
+    assert not template_folder.has_draft("bad")
+
+def test_failed_replace_keeps_existing_draft(template_folder, monkeypatch):
+    compiled = template_folder.compile_template("tpl")
+    variant = compiled.variant()
+    variant.replace_text(compiled.get_imported_track(draft.TrackType.text, name="subs"), 0, "新字幕")
+    compiled.emit("old")
+    before = _read(template_folder, "old")
+    files = sorted(os.listdir(os.path.join(template_folder.folder_path, "old")))
+    listing = sorted(os.listdir(template_folder.folder_path))
+
+    def fail(*args, **kwargs):
+        raise OSError("磁盘已满")
+    monkeypatch.setattr(draft.compiled_template.util, "atomic_write", fail)
+    with pytest.raises(OSError):
+        compiled.emit("old", variant, allow_replace=True)
+    assert _read(template_folder, "old") == before
+    assert sorted(os.listdir(os.path.join(template_folder.folder_path, "old"))) == files
+    assert sorted(os.listdir(template_folder.folder_path)) == listing
+
+    monkeypatch.undo()
+    compiled.emit("old", variant, allow_replace=True)
+    assert "新字幕" in _read(template_folder, "old")
+    assert sorted(os.listdir(template_folder.folder_path)) == listing
+
+def test_skeleton_slots_are_keyed_by_fragment(template_folder):
+    compiled = template_folder.compile_template("tpl")
+    pieces, slots = compiled._skeleton(False)
+    cache = compiled.script._fragment_cache
+    assert slots
+    for key, slot in slots.items():
+        assert pieces[slot] == cache.get(key)
+    assert "".join(pieces) == compiled.script.dumps()
@@ -0,0 +1,142 @@
+"""模板模式下导入素材的索引、批量文本替换及按名称替换素材"""
+
+import os
+import json
+
+import pytest
+
+import pyJianYingDraft as draft
+from pyJianYingDraft import exceptions
+from pyJianYingDraft.script_file import ScriptFile
+
+from conftest import asset
+
+def _with_text_templates(folder: draft.DraftFolder) -> str:
+    """将字幕轨道的各片段改为引用文本模板, 每个文本模板包含原文本及主文本两段, 返回修改后的草稿文件路径"""
+    path = os.path.join(folder.folder_path, "tpl", "draft_content.json")
+    with open(path, "r", encoding="utf-8") as f:
+        content = json.load(f)
+    subs = next(track for track in content["tracks"] if track["name"] == "subs")
+    main_text = content["materials"]["texts"][0]
+    templates = []
+    for i, segment in enumerate(subs["segments"]):
+        sub_ids = [segment["material_id"], main_text["id"]]
+        templates.append({"id": "tt%d" % i, "name": "模板%d" % i,
+                          "text_info_resources": [{"text_material_id": sub_id} for sub_id in sub_ids]})
+        segment["material_id"] = "tt%d" % i
+    content["materials"]["text_templates"] = templates
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(content, f, ensure_ascii=False)
+    return path
+
+def test_replace_texts_matches_replace_text(template_folder):
+    path = os.path.join(template_folder.folder_path, "tpl", "draft_content.json")
+    batch, single = ScriptFile.load_template(path), ScriptFile.load_template(path)
+    texts = {0: "第一", 1: ["第二"], 2: "第三句比较长"}
+    batch.replace_texts(batch.get_imported_track(draft.TrackType.text, name="subs"), texts)
+    track = single.get_imported_track(draft.TrackType.text, name="subs")
+    for index, text in texts.items():
+        single.replace_text(track, index, text)
+    assert batch.dumps() == single.dumps()
+
+def test_replace_texts_is_all_or_nothing(template_folder):
+    script = template_folder.load_template("tpl")
+    before = script.dumps()
+    with pytest.raises(IndexError):
+        script.replace_texts(script.get_imported_track(draft.TrackType.text, name="subs"), {0: "新", 999: "越界"})
+    assert script.dumps() == before
+
+def test_text_template_batch_does_not_rebuild_index(template_folder, monkeypatch):
+    script = ScriptFile.load_template(_with_text_templates(template_folder))
+    track = script.get_imported_track(draft.TrackType.text, name="subs")
+    calls = []
+    original = ScriptFile._index_imported
+    monkeypatch.setattr(ScriptFile, "_index_imported", lambda self, category: calls.append(category) or original(self, category))
+
+    script.replace_texts(track, {i: ["甲%d" % i, "乙%d" % i] for i in range(len(track))})
+    assert calls == []
+    template = script.get_imported_material("text_templates", "tt0")
+    first = script.get_imported_material("texts", template["text_info_resources"][0]["text_material_id"])
+    assert json.loads(first["content"])["text"] == "甲0"
+
+def test_id_index_follows_direct_edits(template_folder):
+    script = template_folder.load_template("tpl")
+    assert script.get_imported_material("texts", "added") is None
+    script.imported_materials["texts"].append({"id": "added", "content": "{}"})
+    assert script.get_imported_material("texts", "added") is not None
+    script.imported_materials["texts"] = []
+    assert script.get_imported_material("texts", "added") is None
+
+def _count_name_index(monkeypatch):
+    calls = []
+    original = ScriptFile._index_imported_names
+    monkeypatch.setattr(ScriptFile, "_index_imported_names",
+                        lambda self, category: calls.append(category) or original(self, category))
+    return calls
+
+def test_name_lookup_misses_do_not_rebuild_index(template_folder, monkeypatch):
+    script = template_folder.load_template("tpl")
+    script.get_imported_materials_by_name("videos", "video.mp4")
+    script.get_imported_materials_by_name("audios", "audio.mp3")
+    calls = _count_name_index(monkeypatch)
+
+    for _ in range(10):
+        assert script.get_imported_materials_by_name("videos", "audio.mp3") == []
+        assert script.get_imported_materials_by_name("audios", "video.mp4") == []
+    script.replace_materials_by_name({"video.mp4": asset("video.mp4"), "audio.mp3": asset("audio.mp3")})
+    assert calls == []
+
+def test_name_index_follows_direct_edits(template_folder):
+    script = template_folder.load_template("tpl")
+    assert script.get_imported_materials_by_name("audios", "added.mp3") == []
+    script.imported_materials["audios"].append({"id": "added", "name": "added.mp3"})
+    assert len(script.get_imported_materials_by_name("audios", "added.mp3")) == 1
+    script.imported_materials["audios"] = []
+    assert script.get_imported_materials_by_name("audios", "added.mp3") == []
+
+def test_replace_materials_by_name_matches_sequential(template_folder):
+    path = os.path.join(template_folder.folder_path, "tpl", "draft_content.json")
+    batch, single = ScriptFile.load_template(path), ScriptFile.load_template(path)
+    batch.replace_materials_by_name({"sticker.gif": asset("video.mp4"), "audio.mp3": asset("audio.mp3")})
+    single.replace_material_by_name("sticker.gif", draft.VideoMaterial(asset("video.mp4")))
+    single.replace_material_by_name("audio.mp3", draft.AudioMaterial(asset("audio.mp3")))
+    assert batch.dumps() == single.dumps()
+
+def test_replace_materials_by_name_probes_once_inline(template_folder, monkeypatch):
+    from pyJianYingDraft import local_materials
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("不应启动进程池")
+    monkeypatch.setattr(local_materials, "ProcessPoolExecutor", no_pool)
+    script = template_folder.load_template("tpl")
+    script.replace_materials_by_name({"audio.mp3": asset("audio.mp3")})
+
+    batches = []
+    original = local_materials.probe_materials
+    monkeypatch.setattr("pyJianYingDraft.script_file.probe_materials",
+                        lambda paths, kind, **kwargs: batches.append(list(zip(paths, kind))) or original(paths, kind, workers=1))
+    script.replace_materials_by_name({"sticker.gif": asset("video.mp4"), "audio.mp3": asset("audio.mp3")})
+    assert batches == [[(asset("video.mp4"), "video"), (asset("audio.mp3"), "audio")]]
+
+def test_replace_materials_by_name_is_all_or_nothing(template_folder):
+    script = template_folder.load_template("tpl")
+    before = script.dumps()
+    with pytest.raises(exceptions.MaterialNotFound):
+        script.replace_materials_by_name({"audio.mp3": asset("audio.mp3"), "missing.mp4": asset("video.mp4")})
+    with pytest.raises(Exception):
+        script.replace_materials_by_name({"audio.mp3": asset("audio.mp3"), "sticker.gif": asset("missing.mp4")},
+                                         workers=1)
+    assert script.dumps() == before
+
+def test_replace_materials_by_name_rejects_chained_names(template_folder):
+    script = template_folder.load_template("tpl")
+    before = script.dumps()
+    with pytest.raises(ValueError):
+        script.replace_materials_by_name({"sticker.gif": asset("video.mp4"), "video.mp4": asset("sticker.gif")})
+    with pytest.raises(ValueError):
+        script.replace_materials_by_name({"sticker.gif": draft.VideoMaterial(asset("video.mp4"), "audio.mp3"),
+                                          "audio.mp3": asset("audio.mp3")})
+    assert script.dumps() == before
+
+    # 新名称与自身相同不受影响
+    script.replace_materials_by_name({"video.mp4": asset("video.mp4"), "audio.mp3": asset("audio.mp3")})
@@ -0,0 +1,75 @@
+"""增量导出与完整导出的等价性"""
+
+import os
+
+import pyJianYingDraft as draft
+from pyJianYingDraft import trange, tim, KeyframeProperty
+from pyJianYingDraft import util
+
+ASSETS = os.path.join(os.path.dirname(__file__), "..", "readme_assets", "tutorial")
+
+def _full_dumps(script: draft.ScriptFile, compact: bool) -> str:
+    script.incremental_export = False
+    try:
+        return script.dumps(compact)
+    finally:
+        script.incremental_export = True
+
+def _check(script: draft.ScriptFile) -> None:
+    for compact in (False, True):
+        assert script.dumps(compact) == _full_dumps(script, compact)
+
+def _build() -> draft.ScriptFile:
+    script = draft.ScriptFile(1920, 1080)
+    script.incremental_export = True
+    script.add_track(draft.TrackType.audio).add_track(draft.TrackType.video).add_track(draft.TrackType.text)
+    audio = draft.AudioSegment(os.path.join(ASSETS, "audio.mp3"), trange("0s", "5s"), volume=0.6)
+    audio.add_fade("1s", "0s")
+    video = draft.VideoSegment(os.path.join(ASSETS, "video.mp4"), trange("0s", "4.2s"))
+    video.add_keyframe(KeyframeProperty.alpha, 0, 1.0)
+    script.add_segment(audio).add_segment(video)
+    return script
+
+def test_repeated_dumps_match_full_export():
+    script = _build()
+    _check(script)
+    _check(script)  # 全部命中缓存
+
+    for i in range(5):
+        script.add_segment(draft.TextSegment("text %d" % i, trange(tim("%ds" % i), "1s")))
+        _check(script)
+
+def test_track_attribute_changes_are_detected():
+    script = _build()
+    _check(script)
+    script.tracks["audio"].mute = True
+    script.tracks["video"].name = "renamed"
+    _check(script)
+
+def test_in_place_segment_edits_are_detected():
+    script = _build()
+    _check(script)
+    audio = script.tracks["audio"].segments[0]
+    video = script.tracks["video"].segments[0]
+
+    video.add_keyframe(KeyframeProperty.alpha, tim("1s"), 0.5)
+    _check(script)
+    assert '"time_offset": 1000000' in script.dumps()
+    video.add_animation(draft.IntroType.斜切)
+    video.clip_settings.alpha = 0.3
+    _check(script)
+    audio.volume = 0.2
+    audio.add_keyframe(tim("1s"), 0.8)
+    _check(script)
+
+def test_unchanged_segments_are_not_encoded_again(monkeypatch):
+    script = _build()
+    script.dumps()
+    calls = []
+    original = util.encode_json_fragment
+    monkeypatch.setattr(util, "encode_json_fragment", lambda value, **kwargs: calls.append(value) or original(value, **kwargs))
+    script.dumps()
+    assert calls == []
+    script.tracks["video"].segments[0].add_keyframe(KeyframeProperty.alpha, tim("1s"), 0.5)
+    script.dumps()
+    assert len(calls) == 1 and calls[0]["id"] == script.tracks["video"].segments[0].segment_id
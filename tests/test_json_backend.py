@@ -0,0 +1,29 @@
+"""各JSON后端与标准库输出一致"""
+
+import json
+import math
+
+import pytest
+
+from pyJianYingDraft import json_backend
+
+SAMPLES = [float("nan"), float("inf"), -float("inf"), 1e-7, -2.5e-12, 1e16, 1e20, 1.5e300, 0.1, 10 ** 22,
+           {"text": "中文/line-height", "values": [1e-5, float("nan")], "ok": None}]
+
+@pytest.fixture(params=["orjson", "ujson", "json"])
+def backend(request):
+    previous = json_backend.get_backend()
+    try:
+        json_backend.set_backend(request.param)
+    except ImportError:
+        pytest.skip("%s 未安装" % request.param)
+    yield request.param
+    json_backend.set_backend(previous)
+
+def test_dumps_matches_stdlib(backend):
+    for sample in SAMPLES:
+        assert json_backend.dumps_compact(sample) == json.dumps(sample, ensure_ascii=False, separators=(",", ":"))
+
+def test_loads_non_finite_floats(backend):
+    values = json_backend.loads(b'{"a":[NaN,Infinity,-Infinity,1e-07]}')["a"]
+    assert math.isnan(values[0]) and values[1:] == [math.inf, -math.inf, 1e-7]
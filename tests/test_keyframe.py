@@ -0,0 +1,79 @@
+"""关键帧列表的插入、简化及求值"""
+
+import random
+
+import numpy as np
+import pytest
+
+from pyJianYingDraft.keyframe import KeyframeList, KeyframeProperty, Keyframe
+
+def _pairs(kf_list: KeyframeList):
+    return [(kf.time_offset, kf.values[0]) for kf in kf_list.keyframes]
+
+def test_add_keyframe_matches_stable_sort():
+    rng = random.Random(1)
+    added = [(rng.randrange(0, 50) * 1000, rng.random()) for _ in range(300)]
+    kf_list = KeyframeList(KeyframeProperty.alpha)
+    for time_offset, value in added:
+        kf_list.add_keyframe(time_offset, value)
+    assert _pairs(kf_list) == sorted(added, key=lambda pair: pair[0])
+
+def test_add_keyframes_matches_add_keyframe():
+    rng = random.Random(2)
+    existing = [(rng.randrange(0, 10**6), rng.random()) for _ in range(50)]
+    batch = [(rng.randrange(0, 10**6), rng.random()) for _ in range(200)]
+    single, bulk = KeyframeList(KeyframeProperty.alpha), KeyframeList(KeyframeProperty.alpha)
+    for time_offset, value in existing + batch:
+        single.add_keyframe(time_offset, value)
+    for time_offset, value in existing:
+        bulk.add_keyframe(time_offset, value)
+    bulk.add_keyframes(np.array([t for t, _ in batch]), [v for _, v in batch])
+    assert _pairs(bulk) == _pairs(single)
+
+def test_float_time_offsets_are_rounded():
+    kf_list = KeyframeList(KeyframeProperty.volume)
+    kf_list.add_keyframe(1.5e6 + 0.6, 1.0)
+    kf_list.add_keyframes([2.4, 0.2], np.array([0.0, 0.5]))
+    kf_list.add_keyframes(np.array([3.7]), [0.3])
+    assert list(kf_list.times) == [0, 2, 4, 1500001]
+    assert kf_list.export_json()["keyframe_list"][-1]["time_offset"] == 1500001
+
+def test_keyframes_view_is_list_compatible():
+    kf_list = KeyframeList(KeyframeProperty.alpha)
+    kf_list.add_keyframe(0, 1.0)
+    kf_list.keyframes.append(Keyframe(30, 0.0, "c"))
+    kf_list.keyframes.insert(0, Keyframe(10, 0.5, "b"))  # 按时间插入
+    assert _pairs(kf_list) == [(0, 1.0), (10, 0.5), (30, 0.0)]
+    assert len(kf_list.keyframes) == 3 and kf_list.keyframes[-1].kf_id == "c"
+
+    kf_list.keyframes[2] = Keyframe(5, 0.25, "d")
+    del kf_list.keyframes[0]
+    assert _pairs(kf_list) == [(5, 0.25), (10, 0.5)]
+    kf_list.keyframes.extend([Keyframe(20, 0.75)])
+    kf_list.keyframes.pop(0)
+    assert _pairs(kf_list) == [(10, 0.5), (20, 0.75)]
+    assert [kf.time_offset for kf in kf_list.keyframes[::-1]] == [20, 10]
+
+    kf_list.keyframes = [Keyframe(20, 0.5, "b"), Keyframe(10, 0.0, "a")]
+    assert _pairs(kf_list) == [(10, 0.0), (20, 0.5)]
+    assert [kf["id"] for kf in kf_list.export_json()["keyframe_list"]] == ["a", "b"]
+    kf_list.keyframes.clear()
+    assert len(kf_list) == 0
+
+def test_simplify_respects_tolerance():
+    times = np.arange(0, 2000) * 33333
+    values = np.sin(times / 1e6)
+    kf_list = KeyframeList(KeyframeProperty.position_x)
+    kf_list.add_keyframes(times, values)
+
+    ratio = kf_list.simplify(1e-2)
+    assert ratio > 5
+    assert kf_list.times[0] == times[0] and kf_list.times[-1] == times[-1]
+    assert np.max(np.abs(kf_list.evaluate(times) - values)) <= 1e-2 + 1e-12
+
+def test_evaluate_clamps_and_interpolates():
+    kf_list = KeyframeList(KeyframeProperty.alpha)
+    kf_list.add_keyframes([0, 100], [0.0, 1.0])
+    assert list(kf_list.evaluate([-10, 0, 25, 100, 200])) == [0.0, 0.0, 0.25, 1.0, 1.0]
+    with pytest.raises(ValueError):
+        KeyframeList(KeyframeProperty.alpha).evaluate([0])
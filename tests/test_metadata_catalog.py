@@ -0,0 +1,58 @@
+"""元数据目录与枚举类的一致性及过期检查"""
+
+import shutil
+import sqlite3
+import warnings
+
+import pytest
+
+from pyJianYingDraft import metadata
+from pyJianYingDraft.metadata import catalog
+from pyJianYingDraft.metadata.catalog import MetadataCatalog
+
+def test_shipped_catalog_is_current():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        shipped = MetadataCatalog()
+    assert shipped.path == catalog.DEFAULT_PATH
+    # 运行时不校验随包分发的数据文件, 故须保证其与源码一致, 否则应重新生成
+    conn = sqlite3.connect(catalog.DEFAULT_PATH)
+    stored = dict(conn.execute("SELECT key, value FROM info").fetchall())
+    conn.close()
+    assert stored["source_digest"] == catalog.source_digest()
+
+def test_shipped_catalog_skips_source_check(monkeypatch):
+    def fail(*args):
+        raise AssertionError("不应读取元数据源文件")
+    monkeypatch.setattr(catalog, "source_stats", fail)
+    monkeypatch.setattr(catalog, "_source_digest", fail)
+    assert MetadataCatalog().path == catalog.DEFAULT_PATH
+
+def test_lookups_match_enums():
+    shipped = MetadataCatalog()
+    member = metadata.FilterType.from_name("冷蓝")
+    entries = shipped.by_name("冷 蓝", "FilterType")
+    assert [entry.member for entry in entries] == [member]
+    assert member in [entry.member for entry in shipped.by_resource_id(member.value.resource_id)]
+    assert member in [entry.member for entry in shipped.by_effect_id(member.value.effect_id, "FilterType")]
+    assert len(shipped) == sum(len(getattr(metadata, name)) for name in catalog.ENUM_NAMES)
+
+def test_stale_catalog_warns_and_rebuilds(tmp_path):
+    stale = str(tmp_path / "catalog.sqlite3")
+    shutil.copy(catalog.DEFAULT_PATH, stale)
+    conn = sqlite3.connect(stale)
+    with conn:
+        conn.execute("UPDATE info SET value = 'stale'")
+        conn.execute("DELETE FROM entries WHERE enum_name = 'FilterType'")
+    conn.close()
+
+    with pytest.warns(UserWarning):
+        rebuilt = MetadataCatalog(stale)
+    assert rebuilt.path is None
+    assert len(rebuilt.by_name("冷蓝", "FilterType")) == 1
+
+    assert MetadataCatalog(stale, check_source=False).path == stale
+
+def test_missing_catalog_warns(tmp_path):
+    with pytest.warns(UserWarning):
+        assert MetadataCatalog(str(tmp_path / "missing.sqlite3")).path is None
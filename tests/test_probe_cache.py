@@ -0,0 +1,66 @@
+"""素材探测缓存的失效、淘汰及文件键复用"""
+
+import os
+import itertools
+
+from types import SimpleNamespace
+
+from pyJianYingDraft import local_materials, probe_cache
+from pyJianYingDraft.probe_cache import ProbeCache, ProbeResult
+
+ASSETS = os.path.join(os.path.dirname(__file__), "..", "readme_assets", "tutorial")
+
+def _write(path, data: bytes, mtime_ns: int) -> str:
+    with open(path, "wb") as f:
+        f.write(data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+def test_hit_and_invalidation_on_change(tmp_path):
+    cache = ProbeCache(str(tmp_path / "cache"))
+    media = _write(tmp_path / "a.mp4", b"0123", 10**18)
+    result = ProbeResult("video", 1000, 16, 9)
+
+    assert cache.get(media, "video") is None
+    cache.put(media, "video", result)
+    assert cache.get(media, "video") == result
+    assert cache.get(media, "audio") is None  # 按探测类型区分
+
+    _write(media, b"01234", 10**18)  # 大小变化
+    assert cache.get(media, "video") is None
+    assert len(cache) == 0
+
+def test_content_hash_detects_same_size_and_mtime(tmp_path):
+    cache = ProbeCache(str(tmp_path / "cache"), use_content_hash=True)
+    media = _write(tmp_path / "a.mp4", b"aaaa", 10**18)
+    cache.put(media, "video", ProbeResult("video", 1, 1, 1))
+    _write(media, b"bbbb", 10**18)
+    assert cache.get(media, "video") is None
+
+def test_eviction_keeps_recently_used(tmp_path, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(probe_cache, "time", SimpleNamespace(time=lambda: next(clock)))
+    cache = ProbeCache(str(tmp_path / "cache"), max_entries=2)
+    paths = [_write(tmp_path / ("%d.mp4" % i), b"x", 10**18) for i in range(3)]
+    cache.put(paths[0], "video", ProbeResult("video", 0, 1, 1))
+    cache.put(paths[1], "video", ProbeResult("video", 1, 1, 1))
+    assert cache.get(paths[0], "video") is not None  # 刷新访问时间
+    cache.put(paths[2], "video", ProbeResult("video", 2, 1, 1))
+
+    assert len(cache) == 2
+    assert cache.get(paths[0], "video") is not None
+    assert cache.get(paths[1], "video") is None
+
+def test_miss_computes_file_key_once(tmp_path, monkeypatch):
+    cache = ProbeCache(str(tmp_path / "cache"), use_content_hash=True)
+    calls = []
+    original = ProbeCache._file_key
+    monkeypatch.setattr(ProbeCache, "_file_key", lambda self, path: calls.append(path) or original(self, path))
+    monkeypatch.setattr(local_materials, "_probe_cache", local_materials.get_probe_cache())
+    local_materials.set_probe_cache(cache)
+
+    media = os.path.join(ASSETS, "audio.mp3")
+    first = local_materials.probe_media(media, "audio")
+    assert len(calls) == 1
+    assert local_materials.probe_media(media, "audio") == first
+    assert len(calls) == 2
@@ -0,0 +1,55 @@
+"""并发构造素材对象"""
+
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from pyJianYingDraft import local_materials
+from pyJianYingDraft.local_materials import VideoMaterial, AudioMaterial, probe_materials
+
+ASSETS = os.path.join(os.path.dirname(__file__), "..", "readme_assets", "tutorial")
+VIDEO = os.path.join(ASSETS, "video.mp4")
+GIF = os.path.join(ASSETS, "sticker.gif")
+MISSING = os.path.join(ASSETS, "missing.mp4")
+
+@pytest.fixture
+def no_pool(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("不应创建进程池")
+    monkeypatch.setattr(local_materials, "ProcessPoolExecutor", fail)
+
+def test_single_path_probes_inline(no_pool):
+    materials, errors = probe_materials([VIDEO])
+    assert errors == {}
+    assert isinstance(materials[0], VideoMaterial)
+    assert materials[0].duration == VideoMaterial(VIDEO).duration
+
+def test_single_worker_probes_inline(no_pool):
+    materials, errors = probe_materials([VIDEO, MISSING, GIF], workers=1)
+    assert materials[1] is None and set(errors) == {MISSING}
+    assert [m.path for m in (materials[0], materials[2])] == [os.path.abspath(VIDEO), os.path.abspath(GIF)]
+
+def test_duplicates_probed_once_and_mapped_by_position():
+    materials, errors = probe_materials([VIDEO, MISSING, VIDEO, MISSING, GIF], workers=2)
+    assert materials[0] is materials[2]
+    assert materials[1] is None and materials[3] is None
+    assert materials[4].path == os.path.abspath(GIF)
+    assert list(errors) == [MISSING]
+
+def test_reuses_given_executor():
+    with ProcessPoolExecutor(1) as executor:
+        for _ in range(2):
+            materials, errors = probe_materials([VIDEO, GIF], executor=executor)
+            assert errors == {} and len(materials) == 2
+        assert executor.submit(abs, -1).result() == 1  # 进程池未被关闭
+
+def test_mixed_kinds_in_one_batch(no_pool):
+    audio = os.path.join(ASSETS, "audio.mp3")
+    materials, errors = probe_materials([VIDEO, audio, audio], ["video", "audio", "audio"], workers=1)
+    assert errors == {}
+    assert isinstance(materials[0], VideoMaterial) and isinstance(materials[1], AudioMaterial)
+    assert materials[1] is materials[2]
+    with pytest.raises(ValueError):
+        probe_materials([VIDEO, audio], ["video"])
@@ -0,0 +1,60 @@
+"""轨道中片段的有序插入及重叠检查"""
+
+import random
+
+import pytest
+
+from pyJianYingDraft import TextSegment, Timerange, TrackType
+from pyJianYingDraft.exceptions import SegmentOverlap
+from pyJianYingDraft.track import Track
+
+def _text(start: int, duration: int) -> TextSegment:
+    return TextSegment("t", Timerange(start, duration))
+
+def _overlaps_any(segments, segment) -> bool:
+    """基线实现: 与所有已有片段逐一比较"""
+    return any(seg.overlaps(segment) for seg in segments)
+
+def test_add_segment_matches_linear_scan():
+    rng = random.Random(0)
+    track = Track(TrackType.text, "text", 0, False)
+    accepted = []
+    for _ in range(500):
+        segment = _text(rng.randrange(0, 100000), rng.randrange(1, 800))
+        if _overlaps_any(accepted, segment):
+            with pytest.raises(SegmentOverlap):
+                track.add_segment(segment)
+        else:
+            track.add_segment(segment)
+            accepted.append(segment)
+
+    starts = [seg.target_timerange.start for seg in track.segments]
+    assert starts == sorted(starts)
+    assert sorted(map(id, track.segments)) == sorted(map(id, accepted))
+    assert track.end_time == max(seg.target_timerange.end for seg in accepted)
+
+def test_add_segment_out_of_order():
+    track = Track(TrackType.text, "text", 0, False)
+    track.add_segment(_text(200, 100)).add_segment(_text(0, 100)).add_segment(_text(100, 100))
+    assert [seg.target_timerange.start for seg in track.segments] == [0, 100, 200]
+    with pytest.raises(SegmentOverlap):
+        track.add_segment(_text(50, 10))
+    with pytest.raises(SegmentOverlap):
+        track.add_segment(_text(250, 100))
+
+def test_get_segment_at():
+    track = Track(TrackType.text, "text", 0, False)
+    first, second = _text(0, 100), _text(200, 100)
+    track.add_segments([second, first])
+    assert track.get_segment_at(0) is first
+    assert track.get_segment_at(99) is first
+    assert track.get_segment_at(150) is None
+    assert track.get_segment_at(250) is second
+    assert track.get_segment_at(300) is None
+
+def test_add_segments_reports_all_overlaps():
+    track = Track(TrackType.text, "text", 0, False)
+    track.add_segment(_text(0, 100))
+    with pytest.raises(SegmentOverlap):
+        track.add_segments([_text(50, 100), _text(300, 100), _text(350, 10)])
+    assert len(track.segments) == 1